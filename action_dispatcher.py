@@ -0,0 +1,286 @@
+import re
+import threading
+from config import Config
+from intent_matcher import AhoCorasick
+from utils.logger import logger
+
+# 预编译的命令正则
+ACTION_PATTERN = re.compile(r"/action\s+(\w+)(?:\s+(.*))?")
+SWITCH_PATTERN = re.compile(
+    r"/(enable_program|disable_program|enable_website|disable_website|list_status)\s*(\w*)"
+)
+
+# 流式识别的命令关键字
+COMMAND_KEYWORDS = (
+    "/action", "/enable_program", "/disable_program", "/enable_website", "/disable_website", "/list_status"
+)
+# 命令从关键字开始到行尾都不属于可见回复
+COMMAND_TEXT_PATTERN = re.compile(r"(?:%s)\b.*" % "|".join(map(re.escape, COMMAND_KEYWORDS)))
+
+
+def strip_commands(text: str) -> str:
+    """去掉回复中的命令文本，保留模型的自然语言部分"""
+    lines = []
+    for line in text.split("\n"):
+        stripped = COMMAND_TEXT_PATTERN.sub("", line).rstrip()
+        # 只含命令的行整行去掉
+        if stripped or stripped == line:
+            lines.append(stripped)
+    return "\n".join(lines).strip()
+
+
+class ActionDispatcher:
+    """
+    动作分发器：由配置一次性构建，包含按 casefold 名称索引的字典、
+    用于"打开xx"兜底匹配的 Aho-Corasick 扫描器，以及替代 if/elif 链的分发表。
+    映射变化后通过 get_action_dispatcher() 自动重建。
+    """
+    def __init__(self, program_mappings: dict, website_mappings: dict):
+        from action_manager import ActionManager
+
+        self.program_mappings = dict(program_mappings)
+        self.website_mappings = dict(website_mappings)
+
+        # casefold 名称 -> 配置中的原始名称
+        self._programs = {name.casefold().strip(): name for name in self.program_mappings}
+        self._websites = {name.casefold().strip(): name for name in self.website_mappings}
+
+        # 兜底匹配：回复中包含的名称（区分大小写，按配置顺序取第一个）
+        self._program_order = {name: i for i, name in enumerate(self.program_mappings)}
+        self._website_order = {name: i for i, name in enumerate(self.website_mappings)}
+        names = list(self.program_mappings) + list(self.website_mappings)
+        self._name_scanner = AhoCorasick({name: name for name in names})
+
+        # 分发表
+        self._handlers = {
+            "open_browser": ActionManager.open_browser,
+            "open_calculator": lambda target: ActionManager.open_calculator(),
+            "open_program": self._open_program,
+            "open_file": ActionManager.open_file,
+            "open_folder": ActionManager.open_folder,
+            "enable_program": lambda target: ActionManager.toggle_program(target, True),
+            "disable_program": lambda target: ActionManager.toggle_program(target, False),
+            "enable_website": lambda target: ActionManager.toggle_website(target, True),
+            "disable_website": lambda target: ActionManager.toggle_website(target, False),
+            "list_status": lambda target: ActionManager.list_status(),
+        }
+
+    # ---------- 名称查找 ----------
+    def lookup_program(self, target: str):
+        """按不区分大小写的名称查找已配置程序，返回原始名称"""
+        return self._programs.get((target or "").casefold().strip())
+
+    def lookup_website(self, target: str):
+        """按不区分大小写的名称查找已配置网站，返回原始名称"""
+        return self._websites.get((target or "").casefold().strip())
+
+    @staticmethod
+    def _first_contained(found: set, order: dict):
+        candidates = [name for name in found if name in order]
+        if not candidates:
+            return None
+        return min(candidates, key=order.__getitem__)
+
+    # ---------- 执行 ----------
+    def _open_program(self, target: str) -> str:
+        from action_manager import ActionManager
+        name = self.lookup_program(target)
+        if name and not Config.PROGRAM_SWITCHES.get(name, True):
+            return f"程序 '{name}' 已禁用"
+        return ActionManager.open_program(target)
+
+    def execute(self, action: str, target: str = "") -> str:
+        """按分发表执行动作（不做开关/白名单检查）"""
+        handler = self._handlers.get(action)
+        if handler is None:
+            return f"未知操作: {action}"
+        return handler(target)
+
+    def plan_reply(self, response: str):
+        """
+        解析回复中的动作命令，返回 (动作名, 目标, 执行函数)；没有动作时返回 None。
+        解析只做查表，所有可能阻塞的操作都放在执行函数里。
+        """
+        from action_manager import ActionManager
+
+        # 动作命令
+        action_match = ACTION_PATTERN.search(response)
+        if action_match:
+            action = action_match.group(1)
+            target = action_match.group(2) or ""
+
+            def run_action():
+                try:
+                    # 检查预配置映射
+                    if action == "open_browser":
+                        name = self.lookup_website(target)
+                        if name:
+                            if not Config.WEBSITE_SWITCHES.get(name, True):
+                                return f"网站 '{name}' 已禁用"
+                            return ActionManager.open_browser(self.website_mappings[name])
+
+                    if action == "open_program":
+                        name = self.lookup_program(target)
+                        if name:
+                            if not Config.PROGRAM_SWITCHES.get(name, True):
+                                return f"程序 '{name}' 已禁用"
+                            return ActionManager.open_program(name)
+
+                    action_result = ActionManager.execute_action(action, target)
+                    logger.info(f"执行动作: {action} {target} -> {action_result}")
+                    return action_result
+                except Exception as e:
+                    logger.error(f"动作解析失败: {response} - {str(e)}")
+                    return f"动作执行失败: {str(e)}"
+
+            return action, target, run_action
+
+        # 开关控制命令
+        switch_match = SWITCH_PATTERN.search(response)
+        if switch_match:
+            action = switch_match.group(1)
+            target = switch_match.group(2) or ""
+
+            def run_switch():
+                try:
+                    return self.execute(action, target)
+                except Exception as e:
+                    logger.error(f"开关命令解析失败: {response} - {str(e)}")
+                    return f"开关操作失败: {str(e)}"
+
+            return action, target, run_switch
+
+        # 智能处理打开请求：只认分发器已知的程序/网站名称
+        if "打开" in response:
+            logger.debug(f"智能打开处理: 响应内容='{response}'")
+            return self._plan_open_fallback(response)
+
+        return None
+
+    def _plan_open_fallback(self, response: str):
+        from action_manager import ActionManager
+
+        def guarded(func, *args):
+            def run():
+                try:
+                    return func(*args)
+                except Exception as e:
+                    logger.error(f"智能打开处理失败: {str(e)}")
+                    return f"操作失败: {str(e)}"
+            return run
+
+        # 一次扫描找出回复中包含的所有已配置名称
+        found = {m[3] for m in self._name_scanner.find_all(response)}
+
+        # 优先检查预配置程序
+        name = self._first_contained(found, self._program_order)
+        if name:
+            if Config.PROGRAM_SWITCHES.get(name, True):
+                return "open_program", name, guarded(ActionManager.open_program, name)
+            return "open_program", name, lambda: f"程序 '{name}' 已禁用"
+
+        # 其次检查预配置网站
+        name = self._first_contained(found, self._website_order)
+        if name:
+            if Config.WEBSITE_SWITCHES.get(name, True):
+                return "open_browser", name, guarded(ActionManager.open_browser, self.website_mappings[name])
+            return "open_browser", name, lambda: f"网站 '{name}' 已禁用"
+
+        return None
+
+
+class StreamActionParser:
+    """
+    流式命令识别：逐段接收模型输出，命令行（/action、/enable_* 等）一结束就回调执行，
+    命令文本本身不进入可见输出。on_command(line) 返回 None 表示不是有效命令，按普通文本输出。
+    """
+    def __init__(self, on_command):
+        self.on_command = on_command
+        self.results = []
+        self._pending = ""       # 可能是命令的缓冲
+        self._in_command = False
+        self._visible = []
+
+    def feed(self, delta: str) -> str:
+        """输入增量文本，返回可以立即显示的文本"""
+        out = []
+        for ch in delta:
+            if self._in_command:
+                if ch == "\n":
+                    out.append(self._complete_command())
+                else:
+                    self._pending += ch
+                continue
+
+            if self._pending:
+                if ch == "\n":
+                    # 不带参数的命令（如 /list_status）在换行时结束
+                    if self._pending in COMMAND_KEYWORDS:
+                        out.append(self._complete_command())
+                    else:
+                        out.append(self._pending + ch)
+                        self._pending = ""
+                    continue
+                candidate = self._pending + ch
+                if any(keyword.startswith(candidate) for keyword in COMMAND_KEYWORDS):
+                    self._pending = candidate
+                elif self._pending in COMMAND_KEYWORDS and ch.isspace():
+                    self._pending = candidate
+                    self._in_command = True
+                else:
+                    out.append(candidate)
+                    self._pending = ""
+                continue
+
+            if ch == "/":
+                self._pending = ch
+            else:
+                out.append(ch)
+
+        text = "".join(out)
+        self._visible.append(text)
+        return text
+
+    def finish(self) -> str:
+        """输出结束，处理最后一行"""
+        text = ""
+        if self._in_command or self._pending in COMMAND_KEYWORDS:
+            text = self._complete_command()
+        elif self._pending:
+            text = self._pending
+            self._pending = ""
+        self._visible.append(text)
+        return text
+
+    def visible_text(self) -> str:
+        return "".join(self._visible)
+
+    def _complete_command(self) -> str:
+        line = self._pending.strip()
+        self._pending = ""
+        self._in_command = False
+        result = self.on_command(line)
+        if result is None:
+            return line + "\n"
+        self.results.append(result)
+        return ""
+
+
+_dispatcher_lock = threading.Lock()
+_dispatcher_cache = (None, None)  # (状态版本号, ActionDispatcher)
+
+
+def get_action_dispatcher() -> ActionDispatcher:
+    """获取与当前映射状态对应的分发器，映射变化后自动重建"""
+    global _dispatcher_cache
+    version = Config.state_version()
+    cached_version, dispatcher = _dispatcher_cache
+    if cached_version == version:
+        return dispatcher
+    with _dispatcher_lock:
+        cached_version, dispatcher = _dispatcher_cache
+        if cached_version != version:
+            dispatcher = ActionDispatcher(Config.PROGRAM_MAPPINGS, Config.WEBSITE_MAPPINGS)
+            _dispatcher_cache = (version, dispatcher)
+            logger.debug(f"动作分发器已重建 (版本 {version})")
+    return dispatcher
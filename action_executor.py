@@ -0,0 +1,172 @@
+import time
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from utils.logger import logger
+
+# 动作的自然语言描述（用于确认语和日志）
+ACTION_LABELS = {
+    "open_browser": "打开浏览器",
+    "open_calculator": "打开计算器",
+    "open_program": "打开程序",
+    "open_file": "打开文件",
+    "open_folder": "打开文件夹",
+    "enable_program": "开启程序",
+    "disable_program": "关闭程序",
+    "enable_website": "开启网站",
+    "disable_website": "关闭网站",
+    "list_status": "查询状态",
+}
+
+# 这些动作只改内存状态，直接同步执行
+INLINE_ACTIONS = {"enable_program", "disable_program", "enable_website", "disable_website", "list_status"}
+
+
+def action_label(action: str, target: str) -> str:
+    """动作的简短描述，如：打开程序 记事本"""
+    return f"{ACTION_LABELS.get(action, action)} {target}".strip()
+
+
+class ProcessReaper:
+    """回收已启动的子进程，避免僵尸进程堆积"""
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._processes = []
+        self._thread = None
+
+    def track(self, process: subprocess.Popen):
+        with self._lock:
+            self._processes.append(process)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="process-reaper")
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                alive = []
+                for process in self._processes:
+                    if process.poll() is None:
+                        alive.append(process)
+                    else:
+                        logger.debug(f"子进程已退出: pid={process.pid}, code={process.returncode}")
+                self._processes = alive
+
+
+# 全局子进程回收器
+process_reaper = ProcessReaper()
+
+
+class ActionExecutor:
+    """
+    有界动作执行器：动作在固定大小的线程池中执行，限制排队总数和单个动作的并发数，
+    超时或完成后通过回调把自然语言结果送回控制台/字幕。
+    """
+    def __init__(self,
+                 max_workers: int = None,
+                 max_pending: int = None,
+                 max_per_action: int = None,
+                 timeout: float = None):
+        self.max_workers = max_workers or Config.ACTION_MAX_WORKERS
+        self.max_pending = max_pending or Config.ACTION_MAX_PENDING
+        self.max_per_action = max_per_action or Config.ACTION_MAX_PER_ACTION
+        self.timeout = timeout or Config.ACTION_TIMEOUT
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="action")
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        self._action_limits = {}
+        self._limits_lock = threading.Lock()
+        self._callbacks = []
+        logger.info(
+            f"动作执行器已启用: 线程数={self.max_workers}, 最大排队={self.max_pending}, "
+            f"单动作并发={self.max_per_action}, 超时={self.timeout:.1f}秒"
+        )
+
+    def add_result_callback(self, callback):
+        """注册结果回调 callback(action, target, result)"""
+        self._callbacks.append(callback)
+
+    def _notify(self, action: str, target: str, result: str):
+        for callback in self._callbacks:
+            try:
+                callback(action, target, result)
+            except Exception as e:
+                logger.error(f"动作结果回调失败: {str(e)}")
+
+    def _limit_for(self, action: str) -> threading.BoundedSemaphore:
+        with self._limits_lock:
+            limit = self._action_limits.get(action)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self.max_per_action)
+                self._action_limits[action] = limit
+            return limit
+
+    def submit(self, action: str, target: str, run):
+        """
+        提交动作：同步动作和被拒绝的动作直接返回结果；
+        已排队的动作返回 None，结果通过回调异步送达。
+        """
+        if action in INLINE_ACTIONS:
+            return run()
+
+        label = action_label(action, target)
+        limit = self._limit_for(action)
+        if not self._pending.acquire(blocking=False):
+            logger.warning(f"动作排队已满，拒绝: {label}")
+            return "操作太多啦，等前面的执行完再说吧"
+        if not limit.acquire(blocking=False):
+            self._pending.release()
+            logger.warning(f"动作并发已达上限，拒绝: {label}")
+            return f"正在{ACTION_LABELS.get(action, action)}，请稍等"
+
+        state = {"finished": False, "timed_out": False}
+        state_lock = threading.Lock()
+
+        def on_timeout():
+            with state_lock:
+                if state["finished"]:
+                    return
+                state["timed_out"] = True
+            logger.warning(f"动作执行超时 ({self.timeout:.1f}秒): {label}")
+            self._notify(action, target, f"{label} 超时了，可能还在后台启动中")
+
+        timer = threading.Timer(self.timeout, on_timeout)
+        timer.daemon = True
+
+        def task():
+            start_time = time.time()
+            try:
+                result = run()
+            except Exception as e:
+                logger.error(f"动作执行异常: {label} - {str(e)}")
+                result = f"操作失败: {str(e)}"
+            finally:
+                timer.cancel()
+                limit.release()
+                self._pending.release()
+            with state_lock:
+                state["finished"] = True
+                timed_out = state["timed_out"]
+            logger.info(f"动作完成: {label} -> {result} ({time.time() - start_time:.2f}秒)")
+            if not timed_out:
+                self._notify(action, target, result)
+            return result
+
+        try:
+            timer.start()
+            self._pool.submit(task)
+        except RuntimeError as e:
+            timer.cancel()
+            limit.release()
+            self._pending.release()
+            logger.error(f"动作提交失败: {label} - {str(e)}")
+            return f"操作失败: {str(e)}"
+        return None
+
+    def shutdown(self):
+        """停止接收新动作，不等待正在执行的动作"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("动作执行器已关闭")
@@ -7,7 +7,18 @@ from config import Config
 from utils.logger import logger
 import urllib.parse
 
+# 预编译：从URL中提取域名
+DOMAIN_PATTERN = re.compile(r"https?://([\w.-]+)")
+
 class ActionManager:
+    @staticmethod
+    def _spawn(*args, **kwargs) -> subprocess.Popen:
+        """启动子进程并交给回收器，避免僵尸进程堆积"""
+        from action_executor import process_reaper
+        process = subprocess.Popen(*args, **kwargs)
+        process_reaper.track(process)
+        return process
+
     @staticmethod
     def execute_action(action: str, target: str = "") -> str:
         """执行外部操作并返回结果消息"""
@@ -18,52 +29,8 @@ class ActionManager:
             return f"操作 '{action}' 未被允许"
         
         try:
-            if action == "open_browser":
-                # 检查网站是否启用
-                if hasattr(Config, 'WEBSITE_SWITCHES'):
-                    normalized_target = target.lower().strip()
-                    for name in Config.WEBSITE_SWITCHES.keys():
-                        if name.lower() == normalized_target:
-                            if not Config.WEBSITE_SWITCHES.get(name, True):
-                                return f"网站 '{name}' 已禁用"
-                            # 使用映射的URL
-                            return ActionManager.open_browser(Config.WEBSITE_MAPPINGS[name])
-                
-                return ActionManager.open_browser(target)
-            
-            elif action == "open_calculator":
-                return ActionManager.open_calculator()
-            
-            elif action == "open_program":
-                # 检查程序是否启用
-                if hasattr(Config, 'PROGRAM_SWITCHES'):
-                    normalized_target = target.lower().strip()
-                    for name in Config.PROGRAM_SWITCHES.keys():
-                        if name.lower() == normalized_target:
-                            if not Config.PROGRAM_SWITCHES.get(name, True):
-                                return f"程序 '{name}' 已禁用"
-                
-                return ActionManager.open_program(target)
-            
-            elif action == "open_file":
-                return ActionManager.open_file(target)
-            
-            elif action == "open_folder":
-                return ActionManager.open_folder(target)
-            
-            # 添加开关控制命令
-            elif action == "enable_program":
-                return ActionManager.toggle_program(target, True)
-            elif action == "disable_program":
-                return ActionManager.toggle_program(target, False)
-            elif action == "enable_website":
-                return ActionManager.toggle_website(target, True)
-            elif action == "disable_website":
-                return ActionManager.toggle_website(target, False)
-            elif action == "list_status":
-                return ActionManager.list_status()
-            else:
-                return f"未知操作: {action}"
+            from action_dispatcher import get_action_dispatcher
+            return get_action_dispatcher().execute(action, target)
         except Exception as e:
             logger.error(f"执行操作失败: {action} {target} - {str(e)}")
             return f"操作失败: {str(e)}"
@@ -71,15 +38,13 @@ class ActionManager:
     @staticmethod
     def open_browser(target: str = "https://cn.bing.com") -> str:
         """打开浏览器并清理 URL，支持搜索功能"""
-        # 首先检查预配置网站
-        if hasattr(Config, 'WEBSITE_SWITCHES'):
-            normalized_target = target.lower().strip()
-            for name in Config.WEBSITE_SWITCHES.keys():
-                if name.lower() == normalized_target:
-                    if not Config.WEBSITE_SWITCHES.get(name, True):
-                        return f"网站 '{name}' 已禁用"
-                    # 使用映射的URL
-                    return ActionManager.open_browser(Config.WEBSITE_MAPPINGS[name])
+        # 首先检查预配置网站（使用映射的URL）
+        from action_dispatcher import get_action_dispatcher
+        name = get_action_dispatcher().lookup_website(target)
+        if name:
+            if not Config.WEBSITE_SWITCHES.get(name, True):
+                return f"网站 '{name}' 已禁用"
+            target = Config.WEBSITE_MAPPINGS[name]
         
         # 清理 target 格式
         target = target.replace("[", "").replace("]", "").strip()
@@ -111,7 +76,7 @@ class ActionManager:
             url = "http://" + url[len("http://http://"):]
         
         # 提取域名用于自然语言显示
-        domain_match = re.search(r"https?://([\w.-]+)", url)
+        domain_match = DOMAIN_PATTERN.search(url)
         domain = domain_match.group(1) if domain_match else "网页"
         
         try:
@@ -121,9 +86,9 @@ class ActionManager:
         except:
             # 回退到直接调用浏览器程序
             if Config.BROWSER_PATH:
-                subprocess.Popen([Config.BROWSER_PATH, url])
+                ActionManager._spawn([Config.BROWSER_PATH, url])
             else:
-                subprocess.Popen(f"start {url}", shell=True)
+                ActionManager._spawn(f"start {url}", shell=True)
             return f"正在搜索: {target}" if is_search_query else f"已启动浏览器访问 {domain}"
 
     @staticmethod
@@ -131,10 +96,10 @@ class ActionManager:
         """打开计算器程序"""
         try:
             if os.name == 'nt':  # Windows
-                subprocess.Popen('calc.exe')
+                ActionManager._spawn('calc.exe')
                 return "已打开计算器"
             else:  # Linux/Mac
-                subprocess.Popen(['gnome-calculator'])  # Linux GNOME
+                ActionManager._spawn(['gnome-calculator'])  # Linux GNOME
                 return "已打开计算器"
         except Exception as e:
             logger.error(f"打开计算器失败: {str(e)}")
@@ -143,24 +108,30 @@ class ActionManager:
     @staticmethod
     def open_program(program_name: str) -> str:
         """打开指定名称的程序"""
-        # 修复：使用 PROGRAM_MAPPINGS 而不是 ALLOWED_PROGRAMS
-        program_path = Config.PROGRAM_MAPPINGS.get(program_name.lower())
-        
-        if not program_path:
-            # 尝试在程序映射中查找（使用原始名称）
-            program_path = Config.PROGRAM_MAPPINGS.get(program_name)
-            if not program_path:
-                return f"未配置程序 '{program_name}'"
+        # 按不区分大小写的名称查找程序映射
+        from action_dispatcher import get_action_dispatcher
+        name = get_action_dispatcher().lookup_program(program_name)
+        if not name:
+            return f"未配置程序 '{program_name}'"
+        program_path = Config.PROGRAM_MAPPINGS[name]
         
         try:
-            # 检查路径是否有效
-            if os.path.exists(program_path):
-                # 使用 shell=True 确保可以打开带空格路径的程序
-                subprocess.Popen(program_path, shell=True)
+            # 使用缓存的解析结果，避免每次检查路径和搜索 PATH
+            from program_resolver import program_resolver
+            resolved_path = program_resolver.resolve(name, program_path)
+            if resolved_path:
+                if os.name == 'nt' and not resolved_path.lower().endswith((".exe", ".com", ".bat", ".cmd")):
+                    # 快捷方式等非可执行文件交给系统关联程序
+                    os.startfile(resolved_path)
+                else:
+                    ActionManager._spawn([resolved_path])
                 return f"已打开程序: {program_name}"
+            elif program_resolver.is_bare_name(program_path.strip().strip('"')):
+                # 无法解析的裸命令名（如URI协议），按原样交给系统 shell
+                ActionManager._spawn(program_path, shell=True)
+                return f"正在尝试打开: {program_name}"
             else:
-                # 尝试使用系统路径查找
-                subprocess.Popen(program_name, shell=True)
+                ActionManager._spawn([program_path])
                 return f"正在尝试打开: {program_name}"
         except Exception as e:
             logger.error(f"打开程序失败: {program_name} - {str(e)}")
@@ -178,7 +149,7 @@ class ActionManager:
             if os.name == 'nt':  # Windows
                 os.startfile(file_path)
             else:  # Mac/Linux
-                subprocess.Popen(['xdg-open', file_path])
+                ActionManager._spawn(['xdg-open', file_path])
             
             return f"已打开文件: {os.path.basename(file_path)}"
         except Exception as e:
@@ -195,9 +166,9 @@ class ActionManager:
             
             # 打开文件夹
             if os.name == 'nt':  # Windows
-                subprocess.Popen(f'explorer "{folder_path}"', shell=True)
+                ActionManager._spawn(f'explorer "{folder_path}"', shell=True)
             elif os.name == 'posix':  # Mac/Linux
-                subprocess.Popen(['xdg-open', folder_path])
+                ActionManager._spawn(['xdg-open', folder_path])
             
             return f"已打开文件夹: {os.path.basename(folder_path)}"
         except Exception as e:
@@ -210,7 +181,10 @@ class ActionManager:
         if program_name not in Config.PROGRAM_MAPPINGS:
             return f"未配置程序: {program_name}"
         
-        Config.PROGRAM_SWITCHES[program_name] = enable
+        if Config.PROGRAM_SWITCHES.get(program_name, True) != enable:
+            Config.PROGRAM_SWITCHES[program_name] = enable
+            Config.bump_state_version()
+            ActionManager._persist_switches()
         status = "开启" if enable else "关闭"
         return f"已{status}程序: {program_name}"
     
@@ -220,10 +194,21 @@ class ActionManager:
         if website_name not in Config.WEBSITE_MAPPINGS:
             return f"未配置网站: {website_name}"
         
-        Config.WEBSITE_SWITCHES[website_name] = enable
+        if Config.WEBSITE_SWITCHES.get(website_name, True) != enable:
+            Config.WEBSITE_SWITCHES[website_name] = enable
+            Config.bump_state_version()
+            ActionManager._persist_switches()
         status = "开启" if enable else "关闭"
         return f"已{status}网站: {website_name}"
     
+    @staticmethod
+    def _persist_switches():
+        """开关状态写回运行时配置文件"""
+        try:
+            Config.persist_switches()
+        except Exception as e:
+            logger.error(f"保存开关状态失败: {str(e)}")
+    
     @staticmethod
     def list_status() -> str:
         """列出所有程序/网站状态"""
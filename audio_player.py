@@ -0,0 +1,305 @@
+import io
+import time
+import threading
+import pygame
+from utils.logger import logger
+
+
+# MPEG Layer III 比特率表 (kbps)，按版本区分
+MP3_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MP3_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+# 采样率表，键为版本位：3=MPEG1, 2=MPEG2, 0=MPEG2.5
+MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_duration(data: bytes, total_size: int):
+    """解析MP3首帧头计算时长：优先读取 Xing/Info/VBRI 帧数，否则按恒定比特率估算"""
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        offset = 10 + tag_size + (10 if data[5] & 0x10 else 0)
+
+    # 寻找帧同步
+    while offset + 4 <= len(data):
+        if data[offset] == 0xFF and (data[offset + 1] & 0xE0) == 0xE0:
+            version = (data[offset + 1] >> 3) & 0x03
+            layer = (data[offset + 1] >> 1) & 0x03
+            bitrate_index = data[offset + 2] >> 4
+            rate_index = (data[offset + 2] >> 2) & 0x03
+            if version != 1 and layer == 1 and 0 < bitrate_index < 15 and rate_index < 3:
+                break
+        offset += 1
+    else:
+        return None
+
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    mono = (data[offset + 3] >> 6) == 3
+    if version == 3:
+        bitrate = MP3_BITRATES_V1[bitrate_index]
+        samples_per_frame = 1152
+        side_info = 17 if mono else 32
+    else:
+        bitrate = MP3_BITRATES_V2[bitrate_index]
+        samples_per_frame = 576
+        side_info = 9 if mono else 17
+
+    # VBR 头中的总帧数
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info") and len(data) >= xing + 12:
+        if int.from_bytes(data[xing + 4:xing + 8], "big") & 0x01:
+            frames = int.from_bytes(data[xing + 8:xing + 12], "big")
+            return frames * samples_per_frame / sample_rate
+    vbri = offset + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI" and len(data) >= vbri + 18:
+        frames = int.from_bytes(data[vbri + 14:vbri + 18], "big")
+        return frames * samples_per_frame / sample_rate
+
+    if not total_size:
+        return None
+    return (total_size - offset) * 8 / (bitrate * 1000)
+
+
+def _wav_duration(data: bytes, total_size: int):
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE" or len(data) < 44:
+        return None
+    byte_rate = int.from_bytes(data[28:32], "little")
+    if not byte_rate or not total_size:
+        return None
+    return (total_size - 44) / byte_rate
+
+
+def audio_duration(data: bytes, total_size: int = None, fmt: str = "mp3"):
+    """根据音频头部计算播放时长（秒）；total_size 为完整音频的字节数，未知时仅能解析VBR头；无法计算返回 None"""
+    try:
+        if fmt == "wav":
+            return _wav_duration(data, total_size)
+        return _mp3_duration(data, total_size)
+    except (IndexError, KeyError, ZeroDivisionError):
+        return None
+
+
+# 解码器打开音频时会探测文件尾部的标签（ID3v1/APE/Lyrics3 等），尾部尚未下载时以零填充应答
+TAIL_PROBE_BYTES = 4096
+
+
+class StreamBuffer(io.RawIOBase):
+    """
+    边下载边播放的音频缓冲：下载线程 write() 追加数据，播放器 read() 读取，
+    数据不足时阻塞等待，下载结束后返回 EOF。
+    SDL_mixer 打开音频时会 seek 到末尾取长度并读取尾部标签：已知总长度（Content-Length）时
+    直接按总长度定位、尾部探测返回零，无需等待下载完成；总长度未知时只能等下载完再播放。
+    读取最多等待 read_timeout 秒，超时或被 abort() 中断时按 EOF 处理，避免播放线程永久阻塞。
+    """
+    def __init__(self, read_timeout: float = 10.0):
+        super().__init__()
+        self.read_timeout = read_timeout
+        self._data = bytearray()
+        self._pos = 0
+        self._done = False
+        self._aborted = False
+        self._cond = threading.Condition()
+        self.error = None
+        self.expected_size = None  # 完整音频的字节数（来自 Content-Length），未知为 None
+        self._tail_probe = False   # 当前读取位置是尚未下载的尾部探测
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StreamBuffer":
+        buffer = cls()
+        buffer.write(data)
+        buffer.finish()
+        return buffer
+
+    # ---------- 写入端 ----------
+    def write(self, data: bytes) -> int:
+        with self._cond:
+            self._data.extend(data)
+            self._cond.notify_all()
+        return len(data)
+
+    def finish(self):
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    def fail(self, error: str):
+        with self._cond:
+            self.error = error
+            self._done = True
+            self._cond.notify_all()
+
+    def abort(self):
+        """中断读取端：阻塞中的和之后的读取都立即返回 EOF"""
+        with self._cond:
+            self._aborted = True
+            self._cond.notify_all()
+
+    # ---------- 状态 ----------
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    def wait_ready(self, min_bytes: int, timeout: float = None) -> bool:
+        """
+        等待可以开始播放：已知总长度时缓冲到 min_bytes 字节即可，否则需要下载结束；
+        失败或超时返回 False
+        """
+        def ready():
+            return self._done or (self.expected_size is not None and len(self._data) >= min_bytes)
+
+        with self._cond:
+            reached = self._cond.wait_for(ready, timeout)
+            return reached and self.error is None and len(self._data) > 0
+
+    def wait_done(self, timeout: float = None) -> bool:
+        with self._cond:
+            self._cond.wait_for(lambda: self._done, timeout)
+            return self._done and self.error is None
+
+    def getvalue(self) -> bytes:
+        with self._cond:
+            return bytes(self._data)
+
+    # ---------- 读取端（供 pygame 使用） ----------
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        with self._cond:
+            if self._aborted:
+                return 0
+            if self._tail_probe and not self._done and self._pos >= len(self._data):
+                size = max(0, min(len(b), self.expected_size - self._pos))
+                b[:size] = bytes(size)
+                self._pos += size
+                return size
+            ready = self._cond.wait_for(
+                lambda: self._done or self._aborted or len(self._data) > self._pos, self.read_timeout
+            )
+            if self._aborted:
+                return 0
+            if not ready:
+                logger.warning(f"音频数据等待超时 ({self.read_timeout:.1f}秒)，按结束处理")
+                return 0
+            chunk = self._data[self._pos:self._pos + len(b)]
+            b[:len(chunk)] = chunk
+            self._pos += len(chunk)
+            return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        with self._cond:
+            if whence == io.SEEK_END:
+                if self.expected_size is None or self._done:
+                    # 总长度未知时等待下载结束（超时或中断时按已下载的长度）
+                    self._cond.wait_for(lambda: self._done or self._aborted, self.read_timeout)
+                    pos = len(self._data) + offset
+                else:
+                    pos = self.expected_size + offset
+            elif whence == io.SEEK_CUR:
+                pos = self._pos + offset
+            else:
+                pos = offset
+            self._pos = max(pos, 0)
+            self._tail_probe = (not self._done and self.expected_size is not None and
+                                self._pos >= len(self._data) and
+                                self._pos >= self.expected_size - TAIL_PROBE_BYTES)
+            return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class AudioPlayer:
+    """基于 pygame.mixer 的内存音频播放器：同一时刻只播放一段，阻塞到真正播放结束"""
+    def __init__(self, poll_interval: float = 0.02):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._source = None  # 正在加载/播放的数据流，stop() 时中断其读取
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """注册播放事件回调 callback(event, text, duration)，event 为 "start" 或 "end" """
+        self._listeners.append(callback)
+
+    def _emit(self, event: str, text: str, duration: float):
+        for callback in self._listeners:
+            try:
+                callback(event, text, duration)
+            except Exception as e:
+                logger.error(f"播放事件回调失败: {str(e)}")
+
+    @staticmethod
+    def _ensure_mixer():
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+            logger.info(f"音频设备已初始化: {pygame.mixer.get_init()}")
+
+    def _start(self, source, namehint: str, cancelled) -> bool:
+        """加载并开始播放，加载前后都检查取消"""
+        if cancelled():
+            return False
+        try:
+            self._ensure_mixer()
+            pygame.mixer.music.load(source, namehint)
+            if cancelled():
+                pygame.mixer.music.unload()
+                return False
+            pygame.mixer.music.play()
+            return True
+        except Exception as e:
+            logger.error(f"播放音频失败: {str(e)}")
+            return False
+
+    def play(self, source, namehint: str = "mp3", text: str = "", duration: float = 0.0,
+             cancel_event: threading.Event = None) -> bool:
+        """
+        播放音频数据流，阻塞到播放结束；正常播完返回 True，被中断或失败返回 False。
+        duration 为预先算出的时长，随 start 事件发布；end 事件携带实际播放时长。
+        cancel_event 为调用方的取消标记，早于本次播放发生的 stop() 不会因清除停止标记而丢失。
+        """
+        def cancelled():
+            return self._stop_event.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+        with self._lock:
+            # 先登记数据流再清除停止标记：之后的 stop() 能中断它的读取，之前的取消由 cancel_event 看到
+            self._source = source
+            self._stop_event.clear()
+            if not self._start(source, namehint, cancelled):
+                self._source = None
+                return False
+
+            start_time = time.time()
+            self._emit("start", text, duration)
+            interrupted = False
+            while pygame.mixer.music.get_busy():
+                if self._stop_event.wait(self.poll_interval) or cancelled():
+                    pygame.mixer.music.stop()
+                    interrupted = True
+                    break
+            try:
+                pygame.mixer.music.unload()
+            except Exception:
+                pass
+            self._source = None
+            elapsed = time.time() - start_time
+            logger.debug(f"播放{'中断' if interrupted else '结束'}: {elapsed:.2f}秒 (预计 {duration:.2f}秒)")
+            self._emit("end", text, elapsed)
+            return not interrupted
+
+    def stop(self):
+        """中断当前播放；仍在等待数据的流式音频立即结束读取"""
+        self._stop_event.set()
+        source = self._source
+        if isinstance(source, StreamBuffer):
+            source.abort()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
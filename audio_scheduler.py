@@ -0,0 +1,109 @@
+import time
+import heapq
+import itertools
+import threading
+from utils.logger import logger
+
+# 入队策略
+POLICY_APPEND = "append"              # 排在队尾
+POLICY_INTERRUPT = "interrupt"        # 打断当前播放并清空队列
+POLICY_DROP_IF_BUSY = "drop_if_busy"  # 正在播放或有排队时直接丢弃
+POLICIES = (POLICY_APPEND, POLICY_INTERRUPT, POLICY_DROP_IF_BUSY)
+
+# 优先级：数值越小越先播放
+PRIORITY_NOTICE = 0  # 简短的系统提示
+PRIORITY_NORMAL = 1  # 对话回复
+
+
+class PlaybackJob:
+    """一次待播放的语音（通常是一条回复的全部分句）"""
+    def __init__(self, chunks: list, priority: int = PRIORITY_NORMAL):
+        self.chunks = chunks
+        self.priority = priority
+        self.created = time.time()
+        self.cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+class AudioScheduler(threading.Thread):
+    """
+    单线程音频调度器：所有语音经同一个有界优先队列串行播放，保证不重叠，
+    线程数恒定；入队时可选择追加、打断替换或忙时丢弃。
+    """
+    def __init__(self, play_job, max_queue: int = 8, on_interrupt=None):
+        super().__init__(daemon=True, name="audio-scheduler")
+        self._play_job = play_job          # play_job(job) 在调度线程中阻塞播放
+        self._on_interrupt = on_interrupt  # 打断当前播放时调用（如停止播放器）
+        self.max_queue = max_queue
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._stopped = False
+
+    def submit(self, job: PlaybackJob, policy: str = POLICY_APPEND) -> bool:
+        """提交播放任务；被丢弃时返回 False"""
+        with self._cond:
+            if self._stopped:
+                return False
+            if policy == POLICY_DROP_IF_BUSY and (self._current or self._queue):
+                logger.info("语音忙，丢弃新语音")
+                return False
+            if policy == POLICY_INTERRUPT:
+                self._cancel_all_locked()
+            elif len(self._queue) >= self.max_queue:
+                logger.warning(f"语音队列已满 ({self.max_queue})，丢弃新语音")
+                return False
+            heapq.heappush(self._queue, (job.priority, next(self._seq), job))
+            self._cond.notify()
+        return True
+
+    def _cancel_all_locked(self):
+        for _, _, queued in self._queue:
+            queued.cancel_event.set()
+        self._queue.clear()
+        if self._current:
+            self._current.cancel_event.set()
+            if self._on_interrupt:
+                self._on_interrupt()
+            logger.info("打断当前语音")
+
+    def interrupt(self):
+        """打断当前播放并清空队列"""
+        with self._cond:
+            self._cancel_all_locked()
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return bool(self._current or self._queue)
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._queue)
+                if self._stopped:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                self._current = job
+            try:
+                if not job.cancelled:
+                    self._play_job(job)
+            except Exception as e:
+                logger.error(f"播放语音出错: {str(e)}", exc_info=True)
+            finally:
+                with self._cond:
+                    self._current = None
+
+    def shutdown(self, timeout: float = 2.0):
+        """停止调度：打断当前播放，丢弃排队的语音并等待线程退出"""
+        with self._cond:
+            self._stopped = True
+            self._cancel_all_locked()
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+        logger.info("音频调度器已关闭")
@@ -0,0 +1,95 @@
+"""
+动作分发微基准：对比逐项线性扫描（旧实现）与 ActionDispatcher 的名称查找和兜底匹配耗时。
+用法: python bench_action_dispatch.py [程序/网站数量]
+"""
+import re
+import sys
+import timeit
+from config import Config
+from action_manager import ActionManager
+from action_dispatcher import get_action_dispatcher
+
+
+def _setup(count: int):
+    Config.ENABLE_EXTERNAL_ACTIONS = True
+    Config.PROGRAM_MAPPINGS = {f"程序{i}": f"C:\\Programs\\app{i}.exe" for i in range(count)}
+    Config.WEBSITE_MAPPINGS = {f"网站{i}": f"https://site{i}.example.com" for i in range(count)}
+    Config.PROGRAM_SWITCHES = {name: True for name in Config.PROGRAM_MAPPINGS}
+    Config.WEBSITE_SWITCHES = {name: True for name in Config.WEBSITE_MAPPINGS}
+    Config.bump_state_version()
+
+
+def _legacy_lookup(mapping: dict, target: str):
+    normalized_target = target.lower().strip()
+    for name in mapping.keys():
+        if name.lower() == normalized_target:
+            return name
+    return None
+
+
+def _legacy_contained(mapping: dict, response: str):
+    for name in mapping.keys():
+        if name in response:
+            return name
+    return None
+
+
+def _plan_and_run(dispatcher, reply: str):
+    """与 llm._handle_action_command 相同的路径：plan_reply 解析后执行"""
+    plan = dispatcher.plan_reply(reply)
+    if plan is None:
+        return reply
+    _, _, run = plan
+    return run()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    _setup(count)
+
+    # 只测分发开销，不真正启动程序；结束后恢复
+    original = ActionManager.__dict__["open_program"], ActionManager.__dict__["open_browser"]
+    ActionManager.open_program = staticmethod(lambda name: f"已打开程序: {name}")
+    ActionManager.open_browser = staticmethod(lambda target="": f"已打开浏览器访问 {target}")
+    try:
+        _run(count)
+    finally:
+        ActionManager.open_program, ActionManager.open_browser = original
+
+
+def _run(count: int):
+    dispatcher = get_action_dispatcher()
+
+    last_program = f"程序{count - 1}"
+    last_site = f"网站{count - 1}"
+    reply = f"好吧好吧，这就帮你打开{last_site}，别催了(>_<)"
+    number = 2000
+
+    cases = [
+        ("精确查找(最后一项)",
+         lambda: _legacy_lookup(Config.PROGRAM_MAPPINGS, last_program),
+         lambda: dispatcher.lookup_program(last_program)),
+        ("未命中查找",
+         lambda: _legacy_lookup(Config.WEBSITE_MAPPINGS, "不存在"),
+         lambda: dispatcher.lookup_website("不存在")),
+        ("'打开'兜底匹配",
+         lambda: _legacy_contained(Config.PROGRAM_MAPPINGS, reply) or _legacy_contained(Config.WEBSITE_MAPPINGS, reply),
+         lambda: _plan_and_run(dispatcher, reply)),
+        ("/action 命令",
+         lambda: (re.compile(r"/action\s+(\w+)(?:\s+(.*))?").search(f"/action open_program {last_program}"),
+                  _legacy_lookup(Config.PROGRAM_MAPPINGS, last_program)),
+         lambda: _plan_and_run(dispatcher, f"/action open_program {last_program}")),
+    ]
+
+    rebuild = timeit.timeit(lambda: type(dispatcher)(Config.PROGRAM_MAPPINGS, Config.WEBSITE_MAPPINGS), number=20) / 20
+    print(f"配置数量: {count} 个程序 + {count} 个网站, 每项 {number} 次")
+    print(f"分发器构建: {rebuild * 1000:.2f}ms")
+    print(f"{'场景':<20}{'线性扫描(us)':>14}{'分发器(us)':>14}{'加速比':>10}")
+    for label, legacy, compiled in cases:
+        legacy_t = timeit.timeit(legacy, number=number) / number * 1e6
+        compiled_t = timeit.timeit(compiled, number=number) / number * 1e6
+        print(f"{label:<20}{legacy_t:>14.2f}{compiled_t:>14.2f}{legacy_t / compiled_t:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
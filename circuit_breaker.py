@@ -0,0 +1,203 @@
+import time
+import threading
+from collections import deque
+from config import Config
+from utils.logger import logger
+
+# 熔断器状态
+STATE_CLOSED = "closed"        # 正常放行
+STATE_OPEN = "open"            # 快速失败
+STATE_HALF_OPEN = "half_open"  # 放行少量探测请求
+
+STATE_LABELS = {STATE_CLOSED: "正常", STATE_OPEN: "熔断", STATE_HALF_OPEN: "探测中"}
+
+
+class CircuitOpenError(Exception):
+    """熔断器打开，请求被快速拒绝"""
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 已熔断，{retry_after:.0f}秒后重试")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    单个接口的熔断器：在滚动窗口（最近 N 次、最近 T 秒）内统计失败率和慢调用率，
+    超过阈值即打开并快速失败；冷却后进入半开状态放行探测请求，探测成功则恢复。
+    """
+    def __init__(self,
+                 name: str,
+                 slow_call_seconds: float,
+                 window_size: int = None,
+                 window_seconds: float = None,
+                 min_calls: int = None,
+                 failure_rate: float = None,
+                 slow_call_rate: float = None,
+                 open_seconds: float = None,
+                 half_open_probes: int = None):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.window_seconds = window_seconds or Config.CIRCUIT_WINDOW_SECONDS
+        self.min_calls = min_calls or Config.CIRCUIT_MIN_CALLS
+        self.failure_rate = failure_rate or Config.CIRCUIT_FAILURE_RATE
+        self.slow_call_rate = slow_call_rate or Config.CIRCUIT_SLOW_CALL_RATE
+        self.open_seconds = open_seconds or Config.CIRCUIT_OPEN_SECONDS
+        self.half_open_probes = half_open_probes or Config.CIRCUIT_HALF_OPEN_PROBES
+
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window_size or Config.CIRCUIT_WINDOW_SIZE)  # (时间, 是否成功, 耗时)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.trips = 0
+
+    # ---------- 状态 ----------
+    def _refresh_locked(self, now: float):
+        if self._state == STATE_OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = STATE_HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"[熔断] {self.name} 冷却结束，进入半开状态")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_locked(time.time())
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """是否处于熔断（冷却中），不占用探测名额"""
+        return self.state == STATE_OPEN
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.time() - self._opened_at))
+
+    def allow(self) -> bool:
+        """请求前调用：是否放行；半开状态下只放行有限个探测请求"""
+        with self._lock:
+            self._refresh_locked(time.time())
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def check(self):
+        """不放行时抛出 CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    # ---------- 记录结果 ----------
+    def record(self, success: bool, latency: float):
+        now = time.time()
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if success and latency < self.slow_call_seconds:
+                    self._state = STATE_CLOSED
+                    self._calls.clear()
+                    logger.info(f"[熔断] {self.name} 探测成功，恢复服务")
+                else:
+                    self._trip_locked(now, "探测失败")
+                return
+            if self._state == STATE_OPEN:
+                return
+
+            self._calls.append((now, success, latency))
+            # 丢弃超出时间窗口的记录
+            while self._calls and now - self._calls[0][0] > self.window_seconds:
+                self._calls.popleft()
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            slow = sum(1 for _, ok, cost in self._calls if ok and cost >= self.slow_call_seconds)
+            if failures / len(self._calls) >= self.failure_rate:
+                self._trip_locked(now, f"失败率 {failures}/{len(self._calls)}")
+            elif slow / len(self._calls) >= self.slow_call_rate:
+                self._trip_locked(now, f"慢调用 {slow}/{len(self._calls)} (>{self.slow_call_seconds:.0f}秒)")
+
+    def record_status(self, status_code: int, latency: float):
+        """按HTTP状态码记录：5xx 和 429 视为接口故障，其余视为接口可用"""
+        self.record(status_code < 500 and status_code != 429, latency)
+
+    def _trip_locked(self, now: float, reason: str):
+        self._state = STATE_OPEN
+        self._opened_at = now
+        self._probes_in_flight = 0
+        self._calls.clear()
+        self.trips += 1
+        logger.warning(f"[熔断] {self.name} 已熔断 ({reason})，{self.open_seconds:.0f}秒内快速失败")
+
+    def status(self) -> str:
+        state = self.state
+        with self._lock:
+            calls = list(self._calls)
+        failures = sum(1 for _, ok, _ in calls if not ok)
+        avg_latency = sum(cost for _, _, cost in calls) / len(calls) if calls else 0.0
+        line = (
+            f"  {self.name}: {STATE_LABELS[state]}, 窗口 {len(calls)} 次/失败 {failures} 次, "
+            f"平均耗时 {avg_latency:.2f}秒, 累计熔断 {self.trips} 次, 拒绝 {self.rejected} 次"
+        )
+        if state == STATE_OPEN:
+            line += f", {self.retry_after():.0f}秒后探测"
+        return line
+
+
+class CircuitBreakerRegistry:
+    """按接口名称管理熔断器"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                slow_call_seconds = Config.CIRCUIT_SLOW_CALL_SECONDS.get(name, 30.0)
+                breaker = CircuitBreaker(name, slow_call_seconds)
+                self._breakers[name] = breaker
+            return breaker
+
+    def report(self) -> str:
+        if not Config.ENABLE_CIRCUIT_BREAKER:
+            return "熔断器: 已禁用"
+        with self._lock:
+            breakers = list(self._breakers.values())
+        if not breakers:
+            return "熔断器: 暂无数据"
+        return "\n".join(["熔断器状态:"] + [breaker.status() for breaker in breakers])
+
+
+class _NoopBreaker:
+    """禁用熔断时使用，总是放行"""
+    is_open = False
+
+    def allow(self) -> bool:
+        return True
+
+    def check(self):
+        pass
+
+    def record(self, success: bool, latency: float):
+        pass
+
+    def record_status(self, status_code: int, latency: float):
+        pass
+
+
+# 全局熔断器注册表
+circuit_breakers = CircuitBreakerRegistry()
+_noop_breaker = _NoopBreaker()
+
+
+def get_breaker(name: str):
+    """获取接口熔断器；禁用熔断时返回总是放行的空实现"""
+    if not Config.ENABLE_CIRCUIT_BREAKER:
+        return _noop_breaker
+    return circuit_breakers.get(name)
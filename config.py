@@ -1,9 +1,77 @@
 import os
 import json
-from dotenv import load_dotenv
+import threading
+from types import MappingProxyType
+from collections import namedtuple
+from dotenv import load_dotenv, dotenv_values, find_dotenv
+from utils.logger import logger
 
+# 进程环境变量优先于 .env（与 load_dotenv 一致），记录加载 .env 之前已存在的键
+PROCESS_ENV_KEYS = frozenset(os.environ)
 load_dotenv()
 
+# .env 文件路径（热重载时重新解析）
+ENV_FILE_PATH = find_dotenv()
+
+# ---------- 可热重载的配置项 ----------
+def _to_str_tuple(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"应为列表或逗号分隔字符串: {value!r}")
+    return tuple(str(v).strip() for v in value if str(v).strip())
+
+def _to_mapping(value_type):
+    def parse(value):
+        if isinstance(value, str):
+            value = json.loads(value or "{}")
+        if not isinstance(value, dict):
+            raise ValueError(f"应为JSON对象: {value!r}")
+        for k, v in value.items():
+            if not isinstance(k, str) or not isinstance(v, value_type):
+                raise ValueError(f"无效条目: {k!r}: {v!r}")
+        return MappingProxyType(dict(value))
+    return parse
+
+def _to_color(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    color = tuple(int(c) for c in value)
+    if len(color) != 3 or not all(0 <= c <= 255 for c in color):
+        raise ValueError(f"无效颜色: {value!r}")
+    return color
+
+def _to_non_negative(cast):
+    def parse(value):
+        number = cast(value)
+        if number < 0:
+            raise ValueError(f"不能为负数: {value!r}")
+        return number
+    return parse
+
+HOT_RELOAD_PARSERS = {
+    "ALLOWED_ACTIONS": _to_str_tuple,
+    "DEFAULT_SEARCH_ENGINE": str,
+    "PROGRAM_MAPPINGS": _to_mapping(str),
+    "WEBSITE_MAPPINGS": _to_mapping(str),
+    "PROGRAM_SWITCHES": _to_mapping(bool),
+    "WEBSITE_SWITCHES": _to_mapping(bool),
+    "BROWSER_PATH": str,
+    "PET_NAME": str,
+    "PET_ROLE": str,
+    "SUBTITLE_COLOR": _to_color,
+    "SUBTITLE_OUTLINE_COLOR": _to_color,
+    "SUBTITLE_OUTLINE_SIZE": _to_non_negative(int),
+    "SUBTITLE_TYPING_SPEED": _to_non_negative(float),
+    "SUBTITLE_EXTRA_DISPLAY_TIME": _to_non_negative(float),
+}
+
+# 运行时配置文件只保存开关状态，其余配置项以 .env 为准
+RUNTIME_OVERLAY_KEYS = ("PROGRAM_SWITCHES", "WEBSITE_SWITCHES")
+
+# 不可变配置快照
+ConfigSnapshot = namedtuple("ConfigSnapshot", list(HOT_RELOAD_PARSERS))
+
 class Config:
     # 外部操作功能开关
     ENABLE_EXTERNAL_ACTIONS = os.getenv("ENABLE_EXTERNAL_ACTIONS", "false").lower() == "true"
@@ -42,6 +110,24 @@ class Config:
     except json.JSONDecodeError:
         pass
 
+    # 动作异步执行：在有界线程池中执行，结果通过回调显示
+    ENABLE_ASYNC_ACTIONS = os.getenv("ENABLE_ASYNC_ACTIONS", "true").lower() == "true"
+    ACTION_MAX_WORKERS = int(os.getenv("ACTION_MAX_WORKERS", "2"))  # 执行线程数
+    ACTION_MAX_PENDING = int(os.getenv("ACTION_MAX_PENDING", "6"))  # 最大排队+执行中的动作数
+    ACTION_MAX_PER_ACTION = int(os.getenv("ACTION_MAX_PER_ACTION", "2"))  # 单个动作的最大并发数
+    ACTION_TIMEOUT = float(os.getenv("ACTION_TIMEOUT", "15"))  # 单个动作超时（秒）
+
+    # 本地意图快速通道：简单的打开/搜索命令不经过LLM直接执行
+    ENABLE_LOCAL_INTENT = os.getenv("ENABLE_LOCAL_INTENT", "true").lower() == "true"
+
+    # 程序路径解析缓存的检查间隔（秒），到期后按目录 mtime 判断是否重新解析
+    PROGRAM_RESOLVE_CHECK_INTERVAL = float(os.getenv("PROGRAM_RESOLVE_CHECK_INTERVAL", "30"))
+
+    # 配置热重载：监视 .env 与运行时配置文件（JSON，开关状态覆盖 .env），变化后原子替换
+    ENABLE_CONFIG_WATCH = os.getenv("ENABLE_CONFIG_WATCH", "false").lower() == "true"
+    RUNTIME_CONFIG_PATH = os.getenv("RUNTIME_CONFIG_PATH", os.path.join(os.path.dirname(__file__), "runtime_config.json"))
+    CONFIG_WATCH_INTERVAL = float(os.getenv("CONFIG_WATCH_INTERVAL", "1.0"))  # 检查间隔（秒）
+
     # 浏览器路径
     BROWSER_PATH = os.getenv("BROWSER_PATH", "")
 
@@ -51,11 +137,182 @@ class Config:
     DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
     DEEPSEEK_MAX_TOKENS = int(os.getenv("DEEPSEEK_MAX_TOKENS", "2048"))
     DEEPSEEK_TEMPERATURE = float(os.getenv("DEEPSEEK_TEMPERATURE", "0.7"))
+    ENABLE_STREAMING = os.getenv("ENABLE_STREAMING", "true").lower() == "true"  # 流式输出，命令在生成过程中即执行
+    # 提示词布局: cache_friendly（稳定内容在前，利于前缀缓存）或 legacy
+    PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "cache_friendly").lower()
+    DEEPSEEK_CONNECT_TIMEOUT = float(os.getenv("DEEPSEEK_CONNECT_TIMEOUT", "5"))  # 连接超时（秒）
+    DEEPSEEK_READ_TIMEOUT = float(os.getenv("DEEPSEEK_READ_TIMEOUT", "60"))  # 读取超时（秒）
+    
+    # 对冲请求：主接口迟迟不返回首字节时向备用接口（或备用模型）发出相同请求，先到者胜出
+    ENABLE_HEDGING = os.getenv("ENABLE_HEDGING", "false").lower() == "true"
+    # 地址与模型至少配置一项且与主接口不同，否则不发出对冲请求
+    HEDGE_BASE_URL = os.getenv("HEDGE_BASE_URL", "")  # 备用接口地址，留空使用 DEEPSEEK_BASE_URL
+    HEDGE_API_KEY = os.getenv("HEDGE_API_KEY", "")  # 留空使用 DEEPSEEK_API_KEY
+    HEDGE_MODEL_NAME = os.getenv("HEDGE_MODEL_NAME", "")  # 留空使用 DEEPSEEK_MODEL_NAME
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))  # 按主接口首字节耗时的该百分位决定何时对冲
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))  # 样本不足时使用初始等待时间
+    HEDGE_INITIAL_DELAY = float(os.getenv("HEDGE_INITIAL_DELAY", "3.0"))  # 初始等待时间（秒）
+    HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.5"))  # 等待时间下限（秒）
+    HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))  # 对冲请求最多占总请求的比例
+    HEDGE_BUDGET_BURST = float(os.getenv("HEDGE_BUDGET_BURST", "3"))  # 预算最多累积几次对冲
+    
+    # 接口熔断：滚动窗口内失败率或慢调用率过高时快速失败，冷却后放行探测请求
+    ENABLE_CIRCUIT_BREAKER = os.getenv("ENABLE_CIRCUIT_BREAKER", "true").lower() == "true"
+    CIRCUIT_WINDOW_SIZE = int(os.getenv("CIRCUIT_WINDOW_SIZE", "20"))  # 统计最近多少次调用
+    CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "120"))  # 统计最近多少秒
+    CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "4"))  # 窗口内至少多少次调用才判断
+    CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))  # 失败率阈值
+    CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))  # 慢调用率阈值
+    CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))  # 熔断后冷却时间（秒）
+    CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))  # 半开状态放行的探测请求数
+    CIRCUIT_SLOW_CALL_SECONDS = {  # 各接口的慢调用阈值（秒）
+        "deepseek": float(os.getenv("DEEPSEEK_SLOW_CALL_SECONDS", "15")),
+        "deepseek_hedge": float(os.getenv("DEEPSEEK_SLOW_CALL_SECONDS", "15")),
+        "hewoyi": float(os.getenv("HEWOYI_SLOW_CALL_SECONDS", "8")),
+    }
     
     # 角色设定
     PET_NAME = os.getenv("PET_NAME", "AiChat")  # 名字
     PET_ROLE = os.getenv("PET_ROLE", "AI助手")  # 角色
     
+    # 开关/映射状态版本号：开关切换或映射变化时递增，提示词按版本缓存
+    _state_version = 0
+    _state_lock = threading.Lock()
+    _prompt_cache = (None, None)  # (版本号, 提示词)
+
+    @classmethod
+    def state_version(cls) -> int:
+        return cls._state_version
+
+    @classmethod
+    def bump_state_version(cls) -> int:
+        """开关或映射变化后调用，使依赖状态的缓存失效"""
+        with cls._state_lock:
+            cls._state_version += 1
+            return cls._state_version
+
+    @classmethod
+    def get_character_prompt(cls) -> str:
+        """获取角色提示词，只有状态版本变化时才重新构建"""
+        version = cls._state_version
+        cached_version, prompt = cls._prompt_cache
+        if cached_version != version:
+            prompt = cls.build_character_prompt()
+            cls._prompt_cache = (version, prompt)
+            cls.CHARACTER_PROMPT = prompt
+        return prompt
+
+    # ---------- 热重载 ----------
+    _snapshot = None
+    _subscribers = []
+    _defaults = {}  # 导入时的配置值，配置项从 .env 删除后恢复为它
+
+    @classmethod
+    def snapshot(cls):
+        """当前生效的不可变配置快照"""
+        return cls._snapshot
+
+    @classmethod
+    def subscribe(cls, callback):
+        """注册配置变更回调 callback(snapshot, changed_keys)"""
+        cls._subscribers.append(callback)
+
+    @classmethod
+    def unsubscribe(cls, callback):
+        if callback in cls._subscribers:
+            cls._subscribers.remove(callback)
+
+    @classmethod
+    def build_snapshot(cls, strict: bool = True) -> ConfigSnapshot:
+        """
+        重新解析 .env 与运行时配置文件并校验。
+        进程环境变量始终优先，.env 只提供进程环境中没有的配置项，运行时配置文件只覆盖开关状态。
+        strict=True 时任一配置项无效即抛出 ValueError；否则记录错误并对该项使用默认值。
+        """
+        raw = {key: os.environ[key] for key in HOT_RELOAD_PARSERS if key in os.environ}
+        if ENV_FILE_PATH and os.path.exists(ENV_FILE_PATH):
+            raw.update({k: v for k, v in dotenv_values(ENV_FILE_PATH).items()
+                        if k in HOT_RELOAD_PARSERS and k not in PROCESS_ENV_KEYS})
+        try:
+            overlay = cls._read_runtime_overlay()
+        except ValueError as e:
+            if strict:
+                raise
+            logger.error(f"{e}，已忽略")
+            overlay = {}
+        raw.update({k: v for k, v in overlay.items() if k in RUNTIME_OVERLAY_KEYS})
+
+        values = {}
+        for key, parse in HOT_RELOAD_PARSERS.items():
+            default = cls._defaults.get(key, getattr(cls, key))
+            try:
+                values[key] = parse(raw[key]) if key in raw else parse(default)
+            except (ValueError, TypeError) as e:
+                if strict or key not in raw:
+                    raise ValueError(f"配置项 {key} 无效: {e}")
+                logger.error(f"配置项 {key} 无效，使用默认值: {e}")
+                values[key] = parse(default)
+        return ConfigSnapshot(**values)
+
+    @classmethod
+    def apply_snapshot(cls, snapshot: ConfigSnapshot) -> set:
+        """原子替换当前配置并通知订阅者，返回发生变化的配置项"""
+        with cls._state_lock:
+            old = cls._snapshot
+            changed = {key for key in snapshot._fields if old is None or getattr(old, key) != getattr(snapshot, key)}
+            for key in changed:
+                value = getattr(snapshot, key)
+                # 映射与开关保留可变副本，兼容运行时开关切换
+                if isinstance(value, MappingProxyType):
+                    value = dict(value)
+                elif key == "ALLOWED_ACTIONS":
+                    value = list(value)
+                setattr(cls, key, value)
+            cls._snapshot = snapshot
+            if changed:
+                cls._state_version += 1
+        if changed and old is not None:
+            for callback in list(cls._subscribers):
+                try:
+                    callback(snapshot, changed)
+                except Exception as e:
+                    logger.error(f"配置变更回调失败: {e}")
+        return changed
+
+    @classmethod
+    def _read_runtime_overlay(cls) -> dict:
+        if not os.path.exists(cls.RUNTIME_CONFIG_PATH):
+            return {}
+        with open(cls.RUNTIME_CONFIG_PATH, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"运行时配置文件解析失败: {e}")
+        if not isinstance(data, dict):
+            raise ValueError("运行时配置文件应为JSON对象")
+        return data
+
+    @classmethod
+    def persist_switches(cls):
+        """把运行时开关写回运行时配置文件，重启后仍然生效"""
+        try:
+            overlay = cls._read_runtime_overlay()
+        except ValueError:
+            overlay = {}
+        overlay["PROGRAM_SWITCHES"] = dict(cls.PROGRAM_SWITCHES)
+        overlay["WEBSITE_SWITCHES"] = dict(cls.WEBSITE_SWITCHES)
+        temp_path = f"{cls.RUNTIME_CONFIG_PATH}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(overlay, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, cls.RUNTIME_CONFIG_PATH)
+        # 让快照与写回的开关保持一致，避免监视器把自己的写入当成外部修改
+        with cls._state_lock:
+            if cls._snapshot:
+                cls._snapshot = cls._snapshot._replace(
+                    PROGRAM_SWITCHES=MappingProxyType(overlay["PROGRAM_SWITCHES"]),
+                    WEBSITE_SWITCHES=MappingProxyType(overlay["WEBSITE_SWITCHES"])
+                )
+
     # 角色设定 - 动态生成提示
     @classmethod
     def build_character_prompt(cls):
@@ -129,7 +386,14 @@ class Config:
     
     # 对话历史限制
     MAX_HISTORY_LENGTH = 10  # 保留最近10轮对话
-    
+
+    # 滚动对话摘要：移出窗口的旧对话在后台折叠进摘要
+    ENABLE_HISTORY_SUMMARY = os.getenv("ENABLE_HISTORY_SUMMARY", "false").lower() == "true"
+    HISTORY_SUMMARY_PATH = os.path.join(os.path.dirname(__file__), "memory_db", "history_summary.json")
+    HISTORY_SUMMARY_MAX_CHARS = int(os.getenv("HISTORY_SUMMARY_MAX_CHARS", "400"))  # 摘要最大字数
+    HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "512"))
+    HISTORY_SUMMARY_MAX_SESSIONS = int(os.getenv("HISTORY_SUMMARY_MAX_SESSIONS", "20"))  # 保留的会话数
+
     # 合我意 TTS 配置
     ENABLE_TTS = os.getenv("ENABLE_TTS", "false").lower() == "true"
     HEWOYI_API_KEY = os.getenv("HEWOYI_API_KEY", "Flg6c0gtkhk1KInva0uzrcs2Gf")
@@ -137,6 +401,29 @@ class Config:
     HEWOYI_SPEED = float(os.getenv("HEWOYI_SPEED", "1.0"))  # 默认语速1.0
     HEWOYI_TONE = int(os.getenv("HEWOYI_TONE", "5"))  # 默认音调5
     HEWOYI_FORMAT = os.getenv("HEWOYI_FORMAT", "mp3")  # 音频格式
+    # 分句流水线合成
+    TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "3"))  # 并发合成的句子数
+    TTS_PLAY_AHEAD = int(os.getenv("TTS_PLAY_AHEAD", "2"))  # 最多领先正在播放的句子几句
+    TTS_MIN_CHUNK_CHARS = int(os.getenv("TTS_MIN_CHUNK_CHARS", "6"))  # 过短的句子与后一句合并
+    TTS_MAX_CHUNK_CHARS = int(os.getenv("TTS_MAX_CHUNK_CHARS", "80"))  # 过长的句子在逗号处再切
+    TTS_REQUEST_TIMEOUT = float(os.getenv("TTS_REQUEST_TIMEOUT", "10"))  # 合成与下载请求超时（秒）
+    TTS_STREAM_START_BYTES = int(os.getenv("TTS_STREAM_START_BYTES", "16384"))  # 缓冲到多少字节开始播放（需服务端返回 Content-Length，否则下载完再播放）
+    TTS_QUEUE_SIZE = int(os.getenv("TTS_QUEUE_SIZE", "8"))  # 排队等待播放的语音条数上限
+    TTS_QUEUE_POLICY = os.getenv("TTS_QUEUE_POLICY", "append")  # 新回复入队策略: append / interrupt / drop_if_busy
+    # 内容寻址音频缓存（按 文本+语音+语速+音调+格式 的哈希复用已合成的音频）
+    ENABLE_TTS_CACHE = os.getenv("ENABLE_TTS_CACHE", "true").lower() == "true"
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(__file__), "tts_cache"))
+    TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "200"))  # 缓存总大小上限，超出按最近使用淘汰
+    # 启动后在后台低优先级预热常用语句到音频缓存
+    ENABLE_TTS_PREWARM = os.getenv("ENABLE_TTS_PREWARM", "false").lower() == "true"
+    TTS_PREWARM_PHRASES = [p for p in os.getenv(
+        "TTS_PREWARM_PHRASES",
+        "API调用失败，请稍后再试|操作太多啦，等前面的执行完再说吧|已打开计算器|无法打开计算器"
+    ).split("|") if p.strip()]  # 用 | 分隔
+    TTS_PREWARM_TOP_N = int(os.getenv("TTS_PREWARM_TOP_N", "20"))  # 从历史回复中挖掘的高频句数
+    TTS_PREWARM_MIN_COUNT = int(os.getenv("TTS_PREWARM_MIN_COUNT", "2"))  # 至少出现几次才预热
+    TTS_PREWARM_DELAY = float(os.getenv("TTS_PREWARM_DELAY", "5"))  # 启动后延迟开始（秒）
+    TTS_PREWARM_INTERVAL = float(os.getenv("TTS_PREWARM_INTERVAL", "1.0"))  # 两次合成之间的间隔（秒）
 
     # 长期记忆配置
     ENABLE_LONG_TERM_MEMORY = os.getenv("ENABLE_LONG_TERM_MEMORY", "true").lower() == "true"
@@ -144,6 +431,13 @@ class Config:
     MEMORY_RETRIEVAL_TOP_K = int(os.getenv("MEMORY_RETRIEVAL_TOP_K", "3"))  # 检索最相关的K条记忆
     MEMORY_EMBEDDING_MODEL = os.getenv("MEMORY_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")  # 嵌入模型
 
+    # 语义响应缓存（复用记忆模块的嵌入模型，需启用长期记忆）
+    ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "false").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))  # 最大条目数（LRU淘汰）
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # 过期时间（秒）
+    RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95"))  # 余弦相似度阈值
+    RESPONSE_CACHE_ACTIONS_ONLY = os.getenv("RESPONSE_CACHE_ACTIONS_ONLY", "true").lower() == "true"  # 仅缓存动作回复
+
     # 字幕配置
     ENABLE_SUBTITLES = os.getenv("ENABLE_SUBTITLES", "true").lower() == "true"
 
@@ -168,17 +462,27 @@ class Config:
     SUBTITLE_WIDTH = int(os.getenv("SUBTITLE_WIDTH", "800"))         # 窗口宽度
     SUBTITLE_HEIGHT = int(os.getenv("SUBTITLE_HEIGHT", "200"))       # 窗口高度
     SUBTITLE_FPS = int(os.getenv("SUBTITLE_FPS", "120"))             # 刷新帧率
+    SUBTITLE_LINE_CACHE_SIZE = int(os.getenv("SUBTITLE_LINE_CACHE_SIZE", "128"))  # 缓存的行表面数量
     
     # 字幕效果设置
     SUBTITLE_TYPING_SPEED = float(os.getenv("SUBTITLE_TYPING_SPEED", "0.15"))  # 每个字的打字时间（秒）
     SUBTITLE_AUDIO_CHAR_TIME = float(os.getenv("SUBTITLE_AUDIO_CHAR_TIME", "0.2"))  # 估算语音每个字的时间
     SUBTITLE_EXTRA_DISPLAY_TIME = float(os.getenv("SUBTITLE_EXTRA_DISPLAY_TIME", "4.0"))  # 打完字后额外显示时间（秒）
+    SUBTITLE_SPEECH_HOLD_TIME = float(os.getenv("SUBTITLE_SPEECH_HOLD_TIME", "0.8"))  # 语音驱动时一句播完后保留时间（秒）
+    SUBTITLE_PAGINATION = os.getenv("SUBTITLE_PAGINATION", "true").lower() == "true"  # 长字幕按句分页显示（关闭时缩小字号放下全文）
     
     # 字幕调试设置
     SUBTITLE_DEBUG_VERBOSE = os.getenv("SUBTITLE_DEBUG_VERBOSE", "false").lower() == "true"
     SUBTITLE_LOG_EVERY_N_FRAMES = int(os.getenv("SUBTITLE_LOG_EVERY_N_FRAMES", "60"))
     SUBTITLE_WATCHDOG_TIMEOUT = float(os.getenv("SUBTITLE_WATCHDOG_TIMEOUT", "3.0"))  # 看门狗超时时间（秒）
-    SUBTITLE_IDLE_FPS = int(os.getenv("SUBTITLE_IDLE_FPS", "30"))  # 空闲时帧率
+    SUBTITLE_IDLE_WAIT = float(os.getenv("SUBTITLE_IDLE_WAIT", "0.25"))  # 空闲时处理窗口事件的间隔（秒）
     
+# 记录导入时的配置值，再应用运行时配置文件（包含上次保存的开关状态），无效的配置项逐项跳过
+Config._defaults = {key: getattr(Config, key) for key in HOT_RELOAD_PARSERS}
+try:
+    Config.apply_snapshot(Config.build_snapshot(strict=False))
+except ValueError as e:
+    logger.error(f"运行时配置无效，已忽略: {e}")
+
 # 在类定义完成后设置 CHARACTER_PROMPT
-Config.CHARACTER_PROMPT = Config.build_character_prompt()
\ No newline at end of file
+Config.CHARACTER_PROMPT = Config.get_character_prompt()
\ No newline at end of file
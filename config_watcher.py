@@ -0,0 +1,52 @@
+import os
+import time
+import threading
+from config import Config, ENV_FILE_PATH
+from utils.logger import logger
+
+
+class ConfigWatcher(threading.Thread):
+    """配置文件监视线程：.env 或运行时配置文件变化后重新解析、校验并原子替换"""
+    def __init__(self, interval: float = None):
+        super().__init__(daemon=True, name="config-watcher")
+        self.interval = interval or Config.CONFIG_WATCH_INTERVAL
+        self._stop_event = threading.Event()
+        self._paths = [p for p in (ENV_FILE_PATH, Config.RUNTIME_CONFIG_PATH) if p]
+        self._mtimes = self._read_mtimes()
+
+    def _read_mtimes(self) -> tuple:
+        mtimes = []
+        for path in self._paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def run(self):
+        logger.info(f"配置监视已启动: {', '.join(self._paths)}")
+        while not self._stop_event.wait(self.interval):
+            mtimes = self._read_mtimes()
+            if mtimes == self._mtimes:
+                continue
+            self._mtimes = mtimes
+            self.reload()
+
+    def reload(self) -> set:
+        """重新加载配置，校验失败时保留当前配置"""
+        start_time = time.time()
+        try:
+            snapshot = Config.build_snapshot()
+        except ValueError as e:
+            logger.error(f"配置重载失败，保留当前配置: {e}")
+            return set()
+        changed = Config.apply_snapshot(snapshot)
+        if changed:
+            logger.info(
+                f"配置已热重载: {', '.join(sorted(changed))}，"
+                f"耗时 {(time.time() - start_time) * 1000:.1f}ms"
+            )
+        return changed
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,16 +1,69 @@
 import requests
 import re
-import json
-import os
-import tempfile
 import time
-import subprocess
-import threading
 import urllib.parse
-import logging
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from tts_cache import AudioCache
+from circuit_breaker import get_breaker
+from audio_player import AudioPlayer, StreamBuffer, audio_duration
+from audio_scheduler import AudioScheduler, PlaybackJob, POLICIES, POLICY_APPEND, PRIORITY_NORMAL
 from utils.logger import logger
 
+# 音频地址解析
+AUDIO_URL_PATTERN = re.compile(r'src=["\'](https?://[^"\']+tjit\.net[^"\']+)["\']')
+
+# 句末标点（中文与西文），西文句点后需跟空白以免切开小数
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[。！？!?；;…~～])|(?<=\.)(?=\s)|\n+")
+# 超长句的次级切分点
+CLAUSE_BOUNDARY_PATTERN = re.compile(r"(?<=[，,、：:])")
+
+
+# 不参与合成的表情符号
+EMOJI_CHARS = {"😊", "😂", "😢", "🤔", "😠", "🎉", "❤️", "✨", "😮", "😍"}
+
+
+def clean_text(text: str) -> str:
+    """清理文本（移除表情符号等非语音字符）"""
+    return ''.join(char for char in text if char.isprintable() and char not in EMOJI_CHARS)
+
+
+def split_sentences(text: str, min_chars: int = 6, max_chars: int = 80) -> list:
+    """按句切分文本：过短的句子与后一句合并，过长的句子在逗号处再切"""
+    pieces = []
+    for sentence in SENTENCE_BOUNDARY_PATTERN.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        clause = ""
+        for part in CLAUSE_BOUNDARY_PATTERN.split(sentence):
+            if clause and len(clause) + len(part) > max_chars:
+                pieces.append(clause)
+                clause = ""
+            clause += part
+            while len(clause) > max_chars:
+                pieces.append(clause[:max_chars])
+                clause = clause[max_chars:]
+        if clause:
+            pieces.append(clause)
+
+    chunks = []
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= min_chars:
+            chunks.append(buffer)
+            buffer = ""
+    if buffer:
+        if chunks and len(chunks[-1]) + len(buffer) <= max_chars:
+            chunks[-1] += buffer
+        else:
+            chunks.append(buffer)
+    return chunks
+
 class HeWoYiTTS:
     def __init__(self):
         self.api_key = Config.HEWOYI_API_KEY
@@ -20,10 +73,27 @@ class HeWoYiTTS:
         self.format = Config.HEWOYI_FORMAT
         self.url = "https://api.hewoyi.com/api/ai/audio/speech"
         
-        # 设置临时音频保存路径
-        self.temp_audio_dir = r"D:\AI_Table_Pet_Programme\qwen_chat_project\temp_audio"
-        os.makedirs(self.temp_audio_dir, exist_ok=True)
-        logger.info(f"临时音频文件将保存在: {self.temp_audio_dir}")
+        # 分句流水线：有界线程池并发下载，按顺序播放
+        self.max_concurrency = Config.TTS_MAX_CONCURRENCY
+        self.play_ahead = Config.TTS_PLAY_AHEAD
+        self.min_chunk_chars = Config.TTS_MIN_CHUNK_CHARS
+        self.max_chunk_chars = Config.TTS_MAX_CHUNK_CHARS
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="tts")
+        
+        # 内存播放：下载数据直接送入 pygame.mixer，不写临时文件
+        self.player = AudioPlayer()
+        self._listeners = []
+        
+        # 单线程调度：所有语音经有界队列串行播放，不会重叠
+        self.scheduler = AudioScheduler(
+            self._play_job,
+            max_queue=Config.TTS_QUEUE_SIZE,
+            on_interrupt=self.player.stop
+        )
+        self.scheduler.start()
+        
+        # 音频缓存：命中时跳过网络请求
+        self.cache = AudioCache() if Config.ENABLE_TTS_CACHE else None
         
         # 验证配置
         if not self.api_key:
@@ -34,23 +104,196 @@ class HeWoYiTTS:
             logger.info(f"合我意TTS已初始化，使用语音: {self.voice}")
             logger.info("API密钥验证成功")
 
-    def speak(self, text: str):
+    def speak(self, text: str, policy: str = None, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        合成并排队播放文本，立即返回。
+        policy: append 追加 / interrupt 打断替换 / drop_if_busy 忙时丢弃，默认取 TTS_QUEUE_POLICY；
+        priority: PRIORITY_NOTICE 的系统提示排在普通回复之前。
+        """
         if not self.enabled:
             logger.error("TTS 功能未启用或初始化失败")
-            return
+            return False
             
         # 清理文本（移除表情符号等非语音字符）
-        clean_text = ''.join(char for char in text if char.isprintable() and not char in ["😊", "😂", "😢", "🤔", "😠", "🎉", "❤️", "✨", "😮", "😍"])
+        cleaned = clean_text(text)
         
         # 如果文本为空，则不处理
-        if not clean_text.strip():
+        if not cleaned.strip():
             logger.warning("传入文本为空，不进行语音合成")
+            return False
+        
+        # 接口熔断期间只显示文字
+        if get_breaker("hewoyi").is_open:
+            logger.info("合我意TTS熔断中，跳过语音")
+            return False
+        
+        policy = policy or Config.TTS_QUEUE_POLICY
+        if policy not in POLICIES:
+            logger.warning(f"未知的语音入队策略 '{policy}'，按 {POLICY_APPEND} 处理")
+            policy = POLICY_APPEND
+        
+        # 按句切分，交给调度线程逐句合成并按顺序播放
+        chunks = self.split(cleaned)
+        logger.info(f"TTS 分句: {len(chunks)} 句, 总长度 {len(cleaned)}, 策略: {policy}")
+        return self.scheduler.submit(PlaybackJob(chunks, priority), policy)
+
+    def split(self, text: str) -> list:
+        """按当前分句参数切分文本（预热与播放使用同样的切分，保证缓存键一致）"""
+        return split_sentences(text, self.min_chunk_chars, self.max_chunk_chars)
+
+    @property
+    def busy(self) -> bool:
+        """是否正在播放或有排队的语音"""
+        return self.scheduler.busy
+
+    def add_listener(self, callback):
+        """
+        注册播放事件回调 callback(event, text, duration)，在调度线程中调用：
+        start - 一句开始播放，duration 为解析出的真实时长；
+        end   - 一句播放结束，duration 为实际播放时长；
+        skip  - 一句合成失败未播放，duration 为按字数估算的时长。
+        """
+        self._listeners.append(callback)
+        self.player.add_listener(callback)
+
+    def _emit_skip(self, text: str):
+        for callback in self._listeners:
+            try:
+                callback("skip", text, len(text) * Config.SUBTITLE_AUDIO_CHAR_TIME)
+            except Exception as e:
+                logger.error(f"播放事件回调失败: {str(e)}")
+
+    def interrupt(self):
+        """打断当前语音并清空队列"""
+        self.scheduler.interrupt()
+
+    def shutdown(self):
+        """停止播放与调度，取消尚未开始的下载"""
+        self.scheduler.shutdown()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def is_cached(self, text: str) -> bool:
+        return bool(self.cache) and self.cache.contains(self._cache_key(text), self.format)
+
+    def warm(self, text: str) -> bool:
+        """只合成并写入缓存，不播放；已缓存或合成成功返回 True（预热不计入缓存命中统计）"""
+        if not self.cache or self.is_cached(text):
+            return bool(self.cache)
+        return self._start_download(text).wait_done()
+
+    def _play_job(self, job: PlaybackJob):
+        """流水线（在调度线程中执行）：线程池并发下载（最多领先 play_ahead 句），按原顺序逐句边下边播"""
+        chunks = job.chunks
+        buffers = {}
+        for i, chunk in enumerate(chunks):
+            if job.cancelled:
+                return
+            # 补齐预取窗口
+            for j in range(i, min(i + self.play_ahead + 1, len(chunks))):
+                if j not in buffers:
+                    buffers[j] = self._prepare(chunks[j])
+            buffer = buffers.pop(i)
+            # 缓冲到足够起播的数据量即开始播放，等待期间响应打断
+            deadline = time.time() + Config.TTS_REQUEST_TIMEOUT * 2
+            ready = False
+            while not job.cancelled and time.time() < deadline:
+                ready = buffer.wait_ready(Config.TTS_STREAM_START_BYTES, timeout=0.1)
+                if ready or buffer.done:
+                    break
+            if job.cancelled:
+                return
+            if not ready:
+                logger.error(f"第 {i + 1} 句语音不可用: {buffer.error or '等待超时'}")
+                self._emit_skip(chunk)
+                continue
+            if i == 0:
+                logger.info(f"首句可播放延迟: {time.time() - job.created:.2f}秒")
+            self.player.play(buffer, self.format or "mp3", chunk, self._duration_of(buffer, chunk),
+                             cancel_event=job.cancel_event)
+
+    def _duration_of(self, buffer: StreamBuffer, text: str) -> float:
+        """从已缓冲的音频头部解析真实时长，无法解析时按字数估算"""
+        total_size = buffer.size if buffer.done else buffer.expected_size
+        duration = audio_duration(buffer.getvalue(), total_size, self.format or "mp3")
+        if not duration:
+            duration = len(text) * Config.SUBTITLE_AUDIO_CHAR_TIME
+            logger.debug(f"无法解析音频时长，按字数估算: {duration:.2f}秒")
+        return duration
+
+    def _cache_key(self, text: str) -> str:
+        return AudioCache.make_key(text, self.voice, self.speed, self.tone, self.format)
+
+    def _prepare(self, text: str) -> StreamBuffer:
+        """返回一句语音的音频缓冲：缓存命中时为完整数据，否则在线程池中边下载边填充"""
+        if self.cache:
+            audio = self.cache.get(self._cache_key(text), self.format)
+            if audio:
+                logger.info(f"TTS缓存命中: {text[:50]}")
+                return StreamBuffer.from_bytes(audio)
+        return self._start_download(text)
+
+    def _start_download(self, text: str) -> StreamBuffer:
+        buffer = StreamBuffer()
+        try:
+            self._pool.submit(self._download, text, buffer)
+        except RuntimeError as e:
+            buffer.fail(str(e))
+        return buffer
+
+    def _download(self, text: str, buffer: StreamBuffer):
+        """请求合成并把音频流式写入缓冲；完整下载后写入缓存"""
+        # 熔断中直接失败；耗时按收到首段音频计
+        breaker = get_breaker("hewoyi")
+        if not breaker.allow():
+            buffer.fail("合我意TTS熔断中")
             return
+        start_time = time.time()
+        first_byte_latency = None
+        try:
+            audio_url = self._request_audio_url(text)
+            if not audio_url:
+                buffer.fail("未获取到音频地址")
+                return
+            
+            # 流式下载真实音频，边收边交给播放器
+            with requests.get(audio_url, timeout=Config.TTS_REQUEST_TIMEOUT, stream=True) as audio_response:
+                if audio_response.status_code != 200:
+                    logger.error(f"音频下载失败: 状态码={audio_response.status_code}")
+                    buffer.fail(f"状态码={audio_response.status_code}")
+                    return
+                # 已知总长度才能在下载完成前起播；压缩传输时 Content-Length 不是音频长度
+                content_length = audio_response.headers.get("Content-Length")
+                if (content_length and content_length.isdigit() and
+                        not audio_response.headers.get("Content-Encoding")):
+                    buffer.expected_size = int(content_length)
+                for data in audio_response.iter_content(chunk_size=8192):
+                    if data:
+                        if first_byte_latency is None:
+                            first_byte_latency = time.time() - start_time
+                        buffer.write(data)
             
+            # 检查音频内容是否有效
+            if buffer.size < 1024:
+                logger.error(f"音频内容过小，可能是错误响应: 大小={buffer.size}字节")
+                buffer.fail("音频内容过小")
+                return
+            buffer.finish()
+            
+            if self.cache:
+                self.cache.put(self._cache_key(text), self.format, buffer.getvalue())
+        except Exception as e:
+            logger.error(f"合我意TTS请求异常: {str(e)}", exc_info=True)
+            buffer.fail(str(e))
+        finally:
+            success = buffer.done and buffer.error is None
+            breaker.record(success, first_byte_latency if success else time.time() - start_time)
+
+    def _request_audio_url(self, text: str):
+        """请求合我意API合成一句语音，返回真实音频地址；失败返回 None"""
         # 构建查询参数 - 使用GET请求
         params = {
             "key": self.api_key,
-            "text": clean_text,
+            "text": text,
             "type": "speech"  # 必需参数
         }
         
@@ -68,82 +311,28 @@ class HeWoYiTTS:
         query_string = urllib.parse.urlencode(params)
         request_url = f"{self.url}?{query_string}"
         
-        try:
-            logger.info(f"请求合我意TTS: {clean_text[:50]}...")
-            logger.debug(f"请求URL: {request_url}")
-            
-            # 第一步：请求API获取HTML页面
-            response = requests.get(request_url, timeout=10)
-            
-            # 检查响应状态
-            if response.status_code != 200:
-                logger.error(f"API请求失败: 状态码={response.status_code}")
-                return
-                
-            # 设置正确的编码
-            response.encoding = "utf-8"
-            html_content = response.text
-            logger.debug(f"API返回HTML内容: {html_content[:200]}...")
-            
-            # 第二步：从HTML中解析真实音频URL
-            match = re.search(r'src=["\'](https?://[^"\']+tjit\.net[^"\']+)["\']', html_content)
-            if not match:
-                logger.error("未找到音频地址，请检查HTML结构")
-                return
-                
-            audio_url = match.group(1).replace("&amp;", "&")
-            logger.info(f"真实音频地址: {audio_url}")
-            
-            # 第三步：下载真实音频
-            audio_response = requests.get(audio_url, timeout=10)
-            if audio_response.status_code != 200:
-                logger.error(f"音频下载失败: 状态码={audio_response.status_code}")
-                return
-                
-            # 检查音频内容是否有效
-            if len(audio_response.content) < 1024:
-                logger.error(f"音频内容过小，可能是错误响应: 大小={len(audio_response.content)}字节")
-                return
-                
-            # 根据音频格式设置文件后缀（默认为mp3）
-            suffix = f".{self.format}" if self.format else ".mp3"
-            
-            # 创建文件名（使用时间戳确保唯一性）
-            timestamp = int(time.time() * 1000)
-            filename = f"hewoyi_tts_{timestamp}{suffix}"
-            temp_file_path = os.path.join(self.temp_audio_dir, filename)
-            
-            # 保存音频文件到指定目录
-            with open(temp_file_path, "wb") as temp_file:
-                temp_file.write(audio_response.content)
-                logger.info(f"音频文件保存到: {temp_file_path}")
-
-            # 使用系统默认播放器播放（异步）
-            threading.Thread(target=self.play_audio, args=(temp_file_path,)).start()
-
-        except Exception as e:
-            logger.error(f"合我意TTS请求异常: {str(e)}", exc_info=True)
-
-    def play_audio(self, file_path):
-        """播放音频文件"""
-        try:
-            logger.info(f"尝试播放音频: {file_path}")
+        logger.info(f"请求合我意TTS: {text[:50]}...")
+        logger.debug(f"请求URL: {request_url}")
+        
+        # 第一步：请求API获取HTML页面
+        response = requests.get(request_url, timeout=Config.TTS_REQUEST_TIMEOUT)
+        
+        # 检查响应状态
+        if response.status_code != 200:
+            logger.error(f"API请求失败: 状态码={response.status_code}")
+            return None
             
-            # 根据操作系统选择播放命令
-            if os.name == 'nt':  # Windows
-                # 使用系统默认播放器
-                os.startfile(file_path)
-                logger.info("使用默认播放器打开音频文件")
+        # 设置正确的编码
+        response.encoding = "utf-8"
+        html_content = response.text
+        logger.debug(f"API返回HTML内容: {html_content[:200]}...")
+        
+        # 第二步：从HTML中解析真实音频URL
+        match = AUDIO_URL_PATTERN.search(html_content)
+        if not match:
+            logger.error("未找到音频地址，请检查HTML结构")
+            return None
             
-            # 等待播放完成（简单实现）
-            time.sleep(3)  # 假设最短播放时间3秒
-        except Exception as e:
-            logger.error(f"播放音频失败: {str(e)}", exc_info=True)
-        finally:
-            # 延迟删除临时文件
-            time.sleep(5)  # 确保播放完成
-            try:
-                os.unlink(file_path)
-                logger.info(f"已删除临时文件: {file_path}")
-            except Exception as e:
-                logger.error(f"删除临时文件失败: {str(e)}")
\ No newline at end of file
+        audio_url = match.group(1).replace("&amp;", "&")
+        logger.info(f"真实音频地址: {audio_url}")
+        return audio_url
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import threading
+import requests
+from config import Config
+from circuit_breaker import get_breaker
+from utils.logger import logger
+
+
+class HistorySummarizer:
+    """
+    滚动对话摘要：把移出历史窗口的旧对话在后台折叠进一段摘要，
+    摘要按会话缓存并持久化，重启后仍然可用。
+    """
+    def __init__(self, summary_path: str = None):
+        self.summary_path = os.path.abspath(summary_path or Config.HISTORY_SUMMARY_PATH)
+        os.makedirs(os.path.dirname(self.summary_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._sessions = {}  # session_id -> {"summary": str, "updated_at": float}
+        self.session_id = None
+
+        self._load()
+        if self.session_id is None:
+            self.session_id = str(uuid.uuid4())
+            self._sessions[self.session_id] = {"summary": "", "updated_at": 0.0}
+
+        # 单个后台线程，摘要生成不占用对话主流程
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"对话摘要器初始化完成，会话: {self.session_id[:8]}，摘要长度: {len(self.get_summary())}")
+
+    # ---------- 对外接口 ----------
+    def get_summary(self) -> str:
+        """获取当前会话的摘要"""
+        with self._lock:
+            return self._sessions.get(self.session_id, {}).get("summary", "")
+
+    def submit(self, turns: list):
+        """提交移出窗口的对话（异步折叠）"""
+        if not turns:
+            return
+        self._queue.put((self.session_id, list(turns)))
+
+    def reset_session(self):
+        """开启新会话（清空对话历史时调用）"""
+        with self._lock:
+            self.session_id = str(uuid.uuid4())
+            self._sessions[self.session_id] = {"summary": "", "updated_at": time.time()}
+            # 只保留最近的若干个会话
+            if len(self._sessions) > Config.HISTORY_SUMMARY_MAX_SESSIONS:
+                ordered = sorted(self._sessions.items(), key=lambda kv: kv[1].get("updated_at", 0.0))
+                for old_id, _ in ordered[:len(self._sessions) - Config.HISTORY_SUMMARY_MAX_SESSIONS]:
+                    self._sessions.pop(old_id, None)
+        self._save()
+        logger.info(f"对话摘要已重置，新会话: {self.session_id[:8]}")
+
+    # ---------- 后台折叠 ----------
+    def _run(self):
+        while True:
+            session_id, turns = self._queue.get()
+            # 合并排队中的同会话对话，减少API调用次数
+            while True:
+                try:
+                    next_session, next_turns = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_session == session_id:
+                    turns.extend(next_turns)
+                else:
+                    self._fold(session_id, turns)
+                    session_id, turns = next_session, next_turns
+            self._fold(session_id, turns)
+
+    def _fold(self, session_id: str, turns: list):
+        with self._lock:
+            old_summary = self._sessions.get(session_id, {}).get("summary", "")
+        try:
+            start_time = time.time()
+            new_summary = self._request_summary(old_summary, turns)
+        except Exception as e:
+            logger.error(f"生成对话摘要失败: {str(e)}")
+            return
+        if not new_summary:
+            return
+
+        with self._lock:
+            # 会话在摘要期间已被淘汰（超出保留数量），丢弃结果；
+            # 仅被重置的旧会话仍保留在 _sessions 中，照常更新其摘要
+            if session_id not in self._sessions:
+                return
+            self._sessions[session_id] = {"summary": new_summary, "updated_at": time.time()}
+        self._save()
+        logger.info(f"对话摘要已更新 ({len(turns)} 条消息)，耗时 {time.time() - start_time:.2f}秒，摘要长度: {len(new_summary)}")
+
+    def _request_summary(self, old_summary: str, turns: list) -> str:
+        dialog = "\n".join(
+            f"{'用户' if t['role'] == 'user' else Config.PET_NAME}: {t['content']}" for t in turns
+        )
+        prompt = (
+            f"已有摘要:\n{old_summary or '(无)'}\n\n"
+            f"新的对话:\n{dialog}\n\n"
+            f"请把新的对话合并进已有摘要，保留人物、事实、偏好和未完成的事项，"
+            f"使用第三人称，不超过{Config.HISTORY_SUMMARY_MAX_CHARS}字，只输出摘要本身。"
+        )
+        headers = {
+            "Authorization": f"Bearer {Config.DEEPSEEK_API_KEY}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": Config.DEEPSEEK_MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": "你是一个对话摘要助手。"},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": Config.HISTORY_SUMMARY_MAX_TOKENS,
+            "stream": False
+        }
+        # 熔断中不占用探测名额，留给对话请求
+        breaker = get_breaker("deepseek")
+        if breaker.is_open:
+            logger.info("DeepSeek 熔断中，暂不更新对话摘要")
+            return ""
+        breaker.check()
+        start_time = time.time()
+        try:
+            response = requests.post(
+                f"{Config.DEEPSEEK_BASE_URL}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=(Config.DEEPSEEK_CONNECT_TIMEOUT, Config.DEEPSEEK_READ_TIMEOUT)
+            )
+        except Exception:
+            breaker.record(False, time.time() - start_time)
+            raise
+        breaker.record_status(response.status_code, time.time() - start_time)
+        if response.status_code != 200:
+            logger.error(f"摘要API错误: {response.status_code} - {response.text}")
+            return ""
+        data = response.json()
+        return data["choices"][0]["message"]["content"].strip()
+
+    # ---------- 持久化 ----------
+    def _load(self):
+        if not os.path.exists(self.summary_path):
+            logger.info("未找到对话摘要文件，将创建新摘要")
+            return
+        try:
+            with open(self.summary_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._sessions = data.get("sessions", {})
+            current = data.get("current_session")
+            if current in self._sessions:
+                self.session_id = current
+        except Exception as e:
+            logger.error(f"加载对话摘要失败: {str(e)}")
+            self._sessions = {}
+
+    def _save(self):
+        try:
+            with self._lock:
+                data = {"current_session": self.session_id, "sessions": dict(self._sessions)}
+            temp_path = f"{self.summary_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            shutil.move(temp_path, self.summary_path)
+        except Exception as e:
+            logger.error(f"保存对话摘要失败: {str(e)}")
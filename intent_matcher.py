@@ -0,0 +1,193 @@
+import re
+import threading
+from collections import deque
+from config import Config
+from utils.logger import logger
+
+# 打开类动词
+OPEN_VERBS = ("打开", "开启", "启动", "运行", "open", "launch", "start")
+
+# 搜索类动词（按长度优先匹配）：带"一下"的说法可直接跟搜索词，
+# "搜索"/"search" 后必须有空白或分隔符，避免"搜索引擎是什么"、"searching"误判
+SEARCH_PATTERN = re.compile(
+    r"^(?:请|帮我|给我|帮忙|麻烦)*\s*"
+    r"(?:(?:搜索一下|搜一下|搜一搜|百度一下)\s*[:：,，]?|(?:搜索|search)\b(?:\s*[:：,，]|\s))"
+    r"\s*(?P<query>.+?)[\s。！？!?.~]*$",
+    re.IGNORECASE
+)
+
+# 搜索词中出现连接词或其他动词时说明是复合请求，交给LLM
+SEARCH_REJECT_PATTERN = re.compile(
+    r"然后|接着|并且|顺便|同时|以及|再|和|打开|开启|启动|运行|搜索|搜一|百度|"
+    r"\b(?:and|then|open|launch|start|search)\b",
+    re.IGNORECASE
+)
+
+# 打开命令：句首只允许客套词，动词之后紧跟目标，目标之后只允许语气词和标点
+OPEN_PREFIX_PATTERN = re.compile(r"(?:请|帮我|给我|帮忙|麻烦)*\s*")
+OPEN_GAP_PATTERN = re.compile(r"(?:一下)?\s*[:：]?\s*")
+OPEN_TAIL_PATTERN = re.compile(r"(?:一下|吧|呗|啊|呀|哦|嘛|好吗|可以吗)?[\s，。！？!?,~]*$")
+
+URL_PATTERN = re.compile(
+    r"^(?P<scheme>https?://)?(?P<www>www\.)?(?P<host>[\w-]+(?:\.[\w-]+)+)(?:[/?#]\S*)?$",
+    re.IGNORECASE
+)
+
+# 没有协议头和 www. 时，只有这些顶级域名才视为网址（readme.txt、main.py 等文件名不算）
+KNOWN_TLDS = frozenset((
+    "com", "net", "org", "cn", "io", "edu", "gov", "info", "me", "tv", "cc", "co",
+    "top", "xyz", "app", "dev", "ai", "jp", "uk", "de", "hk", "tw", "us",
+))
+
+
+def _is_url(text: str) -> bool:
+    match = URL_PATTERN.match(text)
+    if not match:
+        return False
+    if match.group("scheme") or match.group("www"):
+        return True
+    return match.group("host").rsplit(".", 1)[-1].casefold() in KNOWN_TLDS
+
+
+class AhoCorasick:
+    """多模式串匹配自动机，一次扫描找出文本中的所有模式串"""
+    def __init__(self, patterns: dict):
+        # patterns: 模式串 -> 附加数据
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for pattern, payload in patterns.items():
+            if pattern:
+                self._insert(pattern, payload)
+        self._build()
+
+    def _insert(self, pattern: str, payload):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), pattern, payload))
+
+    def _build(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str):
+        """返回所有匹配 (起始位置, 结束位置, 模式串, 附加数据)"""
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, pattern, payload in self._out[state]:
+                matches.append((i + 1 - length, i + 1, pattern, payload))
+        return matches
+
+    def find_longest(self, text: str):
+        """返回最左最长且互不重叠的匹配"""
+        matches = sorted(self.find_all(text), key=lambda m: (m[0], m[0] - m[1]))
+        selected = []
+        last_end = 0
+        for match in matches:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+
+class IntentMatcher:
+    """
+    本地意图匹配：在调用LLM之前识别"打开xx"、"搜索xx"等简单命令。
+    本地命令会绕过LLM直接执行，因此只接受句首是动词、后面紧跟一个已配置名称（或网址）
+    且只剩语气词的句子；复合请求、陈述句等任何有歧义的输入都交给LLM。
+    """
+    def __init__(self, program_names, website_names):
+        patterns = {}
+        for verb in OPEN_VERBS:
+            patterns[verb.casefold()] = ("verb", verb)
+        for name in website_names:
+            patterns[name.casefold()] = ("website", name)
+        # 程序优先于同名网站
+        for name in program_names:
+            patterns[name.casefold()] = ("program", name)
+        self._automaton = AhoCorasick(patterns)
+
+    def match(self, text: str):
+        """返回 (类型, 目标)；类型为 program / website / url / search，无法确定时返回 None"""
+        original = (text or "").strip()
+        normalized = original.casefold()
+        if not normalized or len(normalized) > 64:
+            return None
+
+        # 搜索词保留原始大小写
+        search_match = SEARCH_PATTERN.match(original)
+        if search_match:
+            query = search_match.group("query").strip()
+            if not query or SEARCH_REJECT_PATTERN.search(query):
+                return None
+            return ("search", query)
+
+        matches = self._automaton.find_all(normalized)
+        pos = OPEN_PREFIX_PATTERN.match(normalized).end()
+        verb = self._longest_at(matches, pos, verbs=True)
+        if verb is None:
+            return None
+        pos = OPEN_GAP_PATTERN.match(normalized, verb[1]).end()
+
+        # 已配置的程序/网站名称
+        target = self._longest_at(matches, pos, verbs=False)
+        if target is not None:
+            return target[3] if OPEN_TAIL_PATTERN.match(normalized, target[1]) else None
+
+        # 网址，取自原文以保留路径的大小写
+        tail = OPEN_TAIL_PATTERN.search(normalized, pos)
+        candidate = normalized[pos:tail.start()]
+        if not candidate or not _is_url(candidate):
+            return None
+        if len(original) == len(normalized):
+            candidate = original[pos:tail.start()]
+        return ("url", candidate)
+
+    @staticmethod
+    def _longest_at(matches: list, pos: int, verbs: bool):
+        """从 pos 开始的最长匹配（动词或名称），没有返回 None"""
+        best = None
+        for match in matches:
+            if match[0] == pos and (match[3][0] == "verb") == verbs:
+                if best is None or match[1] > best[1]:
+                    best = match
+        return best
+
+_matcher_lock = threading.Lock()
+_matcher_cache = (None, None)  # (状态版本号, IntentMatcher)
+
+
+def get_intent_matcher() -> IntentMatcher:
+    """获取与当前开关/映射状态对应的匹配器，映射变化后自动重建"""
+    global _matcher_cache
+    version = Config.state_version()
+    cached_version, matcher = _matcher_cache
+    if cached_version == version:
+        return matcher
+    with _matcher_lock:
+        cached_version, matcher = _matcher_cache
+        if cached_version != version:
+            matcher = IntentMatcher(Config.PROGRAM_MAPPINGS.keys(), Config.WEBSITE_MAPPINGS.keys())
+            _matcher_cache = (version, matcher)
+            logger.debug(f"本地意图匹配器已重建 (版本 {version})")
+    return matcher
@@ -3,189 +3,507 @@ import os
 import json
 import requests
 import re
+import hashlib
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from utils.logger import logger
 from config import Config
+from circuit_breaker import get_breaker, CircuitOpenError
 from typing import Optional
 
+
+class PromptCacheStats:
+    """记录 DeepSeek 前缀缓存命中情况（usage.prompt_cache_hit_tokens / prompt_cache_miss_tokens）"""
+    def __init__(self, window: int = 50):
+        self._lock = threading.Lock()
+        self.samples = deque(maxlen=window)  # (timestamp, hit_tokens, miss_tokens)
+        self.requests = 0
+        self.total_hit = 0
+        self.total_miss = 0
+
+    def record(self, usage: dict):
+        if not usage:
+            return
+        hit = int(usage.get("prompt_cache_hit_tokens", 0) or 0)
+        miss = int(usage.get("prompt_cache_miss_tokens", 0) or 0)
+        with self._lock:
+            self.requests += 1
+            self.total_hit += hit
+            self.total_miss += miss
+            self.samples.append((time.time(), hit, miss))
+        ratio = hit / (hit + miss) if hit + miss else 0.0
+        logger.info(f"提示词缓存: 命中 {hit} tokens, 未命中 {miss} tokens, 命中率 {ratio:.1%}")
+
+    def report(self) -> str:
+        with self._lock:
+            samples = list(self.samples)
+            requests, total_hit, total_miss = self.requests, self.total_hit, self.total_miss
+        if not requests:
+            return "提示词缓存: 暂无数据"
+
+        total = total_hit + total_miss
+        recent_hit = sum(s[1] for s in samples)
+        recent_total = sum(s[1] + s[2] for s in samples)
+        lines = [
+            "提示词缓存统计:",
+            f"  请求数: {requests}",
+            f"  累计命中率: {total_hit / total if total else 0.0:.1%} ({total_hit}/{total} tokens)",
+            f"  最近{len(samples)}次命中率: {recent_hit / recent_total if recent_total else 0.0:.1%}",
+            "  最近10次:",
+        ]
+        for ts, hit, miss in samples[-10:]:
+            ratio = hit / (hit + miss) if hit + miss else 0.0
+            lines.append(f"    {time.strftime('%H:%M:%S', time.localtime(ts))}  {ratio:.1%} ({hit}/{hit + miss})")
+        return "\n".join(lines)
+
+
+# 全局缓存统计实例
+prompt_cache_stats = PromptCacheStats()
+
+
+class HedgeStats:
+    """
+    对冲请求统计与预算：记录主接口首字节耗时，按百分位给出对冲等待时间；
+    每个请求积累 HEDGE_BUDGET_RATIO 个令牌，对冲一次消耗 1 个，控制额外开销。
+    """
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.tokens = 1.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def record_latency(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def deadline(self) -> float:
+        """对冲等待时间：样本足够时取主接口首字节耗时的百分位，否则用初始值"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_INITIAL_DELAY
+        index = min(len(samples) - 1, int(len(samples) * Config.HEDGE_PERCENTILE))
+        return max(samples[index], Config.HEDGE_MIN_DELAY)
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+            self.tokens = min(Config.HEDGE_BUDGET_BURST, self.tokens + Config.HEDGE_BUDGET_RATIO)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1.0:
+                self.budget_denied += 1
+                return False
+            self.tokens -= 1.0
+            self.hedged += 1
+            return True
+
+    def record_win(self, hedge_won: bool):
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def report(self) -> str:
+        with self._lock:
+            requests, hedged, wins, denied = self.requests, self.hedged, self.hedge_wins, self.budget_denied
+            samples = len(self.latencies)
+        if not Config.ENABLE_HEDGING:
+            return "对冲请求: 已禁用"
+        return (
+            "对冲请求统计:\n"
+            f"  请求数: {requests}, 对冲: {hedged} ({hedged / requests if requests else 0.0:.1%}), "
+            f"对冲胜出: {wins}, 预算不足: {denied}\n"
+            f"  当前对冲等待: {self.deadline():.2f}秒 (样本 {samples})"
+        )
+
+
+# 全局对冲统计实例
+hedge_stats = HedgeStats()
+
+# LLM 接口：名称用于熔断器与日志
+LLMEndpoint = namedtuple("LLMEndpoint", ["name", "base_url", "api_key", "model"])
+
+
+class DeepSeekAPIError(Exception):
+    """API返回非200状态码"""
+    def __init__(self, status_code: int):
+        super().__init__(f"API错误: {status_code}")
+        self.status_code = status_code
+
 # 基类定义
 class BaseModel:
-    def __init__(self, memory_manager=None):
+    def __init__(self, memory_manager=None, summarizer=None, response_cache=None, action_executor=None):
         self.memory_manager = memory_manager
-        self.system_prompt = Config.CHARACTER_PROMPT
+        self.summarizer = summarizer
+        self.response_cache = response_cache
+        self.action_executor = action_executor
+        self._fingerprint_cache = (None, None)  # (状态版本号, 指纹)
+    
+    @property
+    def system_prompt(self) -> str:
+        # 按开关状态版本缓存，开关切换后自动反映到提示词
+        return Config.get_character_prompt()
+    
+    def _prompt_fingerprint(self) -> str:
+        """系统提示词与开关状态的指纹，用于响应缓存"""
+        version = Config.state_version()
+        cached_version, fingerprint = self._fingerprint_cache
+        if cached_version != version:
+            raw = f"{self.system_prompt}|{Config.ENABLE_EXTERNAL_ACTIONS}|{Config.PROMPT_LAYOUT}"
+            fingerprint = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+            self._fingerprint_cache = (version, fingerprint)
+        return fingerprint
     
-    def generate_response(self, user_input: str, history: list) -> str:
+    def generate_response(self, user_input: str, history: list, on_delta=None, on_notice=None) -> str:
         raise NotImplementedError("子类必须实现此方法")
     
-    def _handle_action_command(self, response: str) -> str:
-        """处理动作命令，执行但不显示命令本身"""
-        if not Config.ENABLE_EXTERNAL_ACTIONS:
-            return response
+    def _try_local_intent(self, user_input: str, on_notice=None) -> Optional[str]:
+        """本地意图快速通道：确定的打开/搜索命令直接执行，不调用LLM"""
+        if not (Config.ENABLE_EXTERNAL_ACTIONS and Config.ENABLE_LOCAL_INTENT):
+            return None
         
-        # 检查响应是否包含动作命令格式
-        action_match = re.search(r"/action\s+(\w+)(?:\s+(.*))?", response)
-        if action_match:
-            try:
-                action = action_match.group(1)
-                target = action_match.group(2) or ""
-                
-                # 动态导入以避免循环依赖
-                from action_manager import ActionManager
-                
-                # 检查预配置映射
-                if action == "open_browser" and hasattr(Config, 'WEBSITE_MAPPINGS'):
-                    normalized_target = target.lower().strip()
-                    for name, url in Config.WEBSITE_MAPPINGS.items():
-                        if name.lower() == normalized_target:
-                            # 检查网站是否启用
-                            if Config.WEBSITE_SWITCHES.get(name, True):
-                                return ActionManager.open_browser(url)
-                            else:
-                                return f"网站 '{name}' 已禁用"
-                
-                if action == "open_program" and hasattr(Config, 'PROGRAM_MAPPINGS'):
-                    normalized_target = target.lower().strip()
-                    for name, path in Config.PROGRAM_MAPPINGS.items():
-                        if name.lower() == normalized_target:
-                            # 检查程序是否启用
-                            if Config.PROGRAM_SWITCHES.get(name, True):
-                                return ActionManager.open_program(name)
-                            else:
-                                return f"程序 '{name}' 已禁用"
-                
-                # 执行动作
-                action_result = ActionManager.execute_action(action, target)
-                
-                logger.info(f"执行动作: {action} {target} -> {action_result}")
-                return action_result
-            except Exception as e:
-                logger.error(f"动作解析失败: {response} - {str(e)}")
-                return f"动作执行失败: {str(e)}"
+        from intent_matcher import get_intent_matcher
+        intent = get_intent_matcher().match(user_input)
+        if not intent:
+            return None
         
-        # 检查开关控制命令
-        switch_match = re.search(
-            r"/(enable_program|disable_program|enable_website|disable_website|list_status)\s*(\w*)", 
-            response
-        )
-        if switch_match:
-            try:
-                action = switch_match.group(1)
-                target = switch_match.group(2) or ""
-                
-                from action_manager import ActionManager
-                return getattr(ActionManager, action)(target)
-            except Exception as e:
-                logger.error(f"开关命令解析失败: {response} - {str(e)}")
-                return f"开关操作失败: {str(e)}"
-        
-        # 智能处理打开请求
-        if "打开" in response:
-            logger.debug(f"智能打开处理: 响应内容='{response}'")
-            logger.debug(f"程序映射: {Config.PROGRAM_MAPPINGS}")
-            logger.debug(f"网站映射: {Config.WEBSITE_MAPPINGS}")
-            
-            try:
-                # 优先检查预配置程序（使用更精准的中文匹配）
-                if hasattr(Config, 'PROGRAM_MAPPINGS'):
-                    for name in Config.PROGRAM_MAPPINGS.keys():
-                        # 检查响应中是否包含程序名
-                        if name in response:
-                            from action_manager import ActionManager
-                            # 检查程序是否启用
-                            if Config.PROGRAM_SWITCHES.get(name, True):
-                                # 直接返回打开程序的结果
-                                return ActionManager.open_program(name)
-                            else:
-                                return f"程序 '{name}' 已禁用"
-                
-                # 其次检查预配置网站
-                if hasattr(Config, 'WEBSITE_MAPPINGS'):
-                    for name in Config.WEBSITE_MAPPINGS.keys():
-                        if name in response:
-                            from action_manager import ActionManager
-                            if Config.WEBSITE_SWITCHES.get(name, True):
-                                return ActionManager.open_browser(Config.WEBSITE_MAPPINGS[name])
-                            else:
-                                return f"网站 '{name}' 已禁用"
-                
-                # 通用打开处理
-                if "浏览器" in response or "网站" in response:
-                    # 尝试从响应中提取 URL
-                    url_match = re.search(r"(https?://[\w\.-]+|www\.[\w\.-]+)", response)
-                    if url_match:
-                        url = url_match.group(0)
-                        from action_manager import ActionManager
-                        return ActionManager.open_browser(url)
-                
-                # 尝试识别程序名称
-                program_match = re.search(r"打开\s*(\w+)", response)
-                if program_match:
-                    program_name = program_match.group(1)
-                    from action_manager import ActionManager
-                    return ActionManager.open_program(program_name)
-                
-                # 尝试识别文件路径
-                path_match = re.search(r"打开\s*([\w:\\/.-]+)", response)
-                if path_match:
-                    path = path_match.group(1)
-                    from action_manager import ActionManager
-                    if os.path.isfile(path):
-                        return ActionManager.open_file(path)
-                    elif os.path.isdir(path):
-                        return ActionManager.open_folder(path)
-            except Exception as e:
-                logger.error(f"智能打开处理失败: {str(e)}")
+        kind, target = intent
+        action = "open_program" if kind == "program" else "open_browser"
+        if action not in Config.ALLOWED_ACTIONS:
+            return None
         
-        return response
+        from action_manager import ActionManager
+        if kind == "program":
+            if not Config.PROGRAM_SWITCHES.get(target, True):
+                return f"程序 '{target}' 已禁用"
+            run = lambda: ActionManager.open_program(target)
+        elif kind == "website":
+            if not Config.WEBSITE_SWITCHES.get(target, True):
+                return f"网站 '{target}' 已禁用"
+            url = Config.WEBSITE_MAPPINGS[target]
+            run = lambda: ActionManager.open_browser(url)
+        else:
+            run = lambda: ActionManager.open_browser(target)
+        
+        logger.info(f"本地意图命中: {kind} {target}")
+        return self._run_action(action, target, run, on_notice)
+    
+    def _run_action(self, action: str, target: str, run, on_notice=None) -> str:
+        """
+        执行动作并返回最终结果。动作交给执行器异步执行时返回空串：
+        确认语只通过 on_notice 显示，结果由执行器回调送达，不进入回复。
+        """
+        if not self.action_executor:
+            return run()
+        result = self.action_executor.submit(action, target, run)
+        if result is not None:
+            return result
+        if on_notice:
+            from action_executor import action_label
+            on_notice(f"好的，正在{action_label(action, target)}")
+        return ""
+    
+    def _handle_action_command(self, response: str, on_notice=None) -> str:
+        """处理动作命令：执行命令，保留模型回复的文字部分，去掉命令本身"""
+        if not Config.ENABLE_EXTERNAL_ACTIONS:
+            return response
+        
+        from action_dispatcher import get_action_dispatcher, strip_commands
+        plan = get_action_dispatcher().plan_reply(response)
+        if plan is None:
+            return response
+        result = self._run_action(*plan, on_notice=on_notice)
+        return "\n".join(filter(None, [strip_commands(response), result]))
 
 # DeepSeek API模型实现
 class DeepSeekAPIModel(BaseModel):
-    def __init__(self, memory_manager=None):
-        super().__init__(memory_manager)
+    def __init__(self, memory_manager=None, summarizer=None, response_cache=None, action_executor=None):
+        super().__init__(memory_manager, summarizer, response_cache, action_executor)
         if not Config.DEEPSEEK_API_KEY:
             raise ValueError("DeepSeek API密钥未配置")
+        
+        # 对冲请求需要独立的备用接口或模型，向同一接口重发只会加重它的负载
+        self.hedge_endpoint = self._hedge_endpoint() if Config.ENABLE_HEDGING else None
+        self._hedge_executor = None
+        if Config.ENABLE_HEDGING and self.hedge_endpoint is None:
+            logger.warning("已启用对冲请求但未配置 HEDGE_BASE_URL 或 HEDGE_MODEL_NAME，对冲请求已禁用")
+        elif self.hedge_endpoint:
+            # 主请求与对冲请求各一个线程；落后的请求无法中途中止，另留两个线程给它们，
+            # 避免下一次调用排在尚未超时的落后请求后面
+            self._hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-hedge")
+    
+    def shutdown(self):
+        """关闭对冲线程池，不等待落后的请求"""
+        if self._hedge_executor:
+            self._hedge_executor.shutdown(wait=False, cancel_futures=True)
     
-    def generate_response(self, user_input: str, history: list) -> str:
+    def generate_response(self, user_input: str, history: list, on_delta=None, on_notice=None) -> str:
+        """
+        生成回复；on_delta 接收流式输出中的可见文本增量，
+        on_notice 接收只用于显示的动作确认语（不计入回复、不播报）。
+        """
+        # 本地意图快速通道：常见的打开/搜索命令无需调用LLM
+        try:
+            local_result = self._try_local_intent(user_input, on_notice)
+            if local_result is not None:
+                return local_result
+        except Exception as e:
+            logger.error(f"本地意图处理失败: {str(e)}")
+        
+        # 语义响应缓存：命中则跳过API调用
+        query_embedding = None
+        if self.response_cache:
+            try:
+                cached_reply, query_embedding = self.response_cache.lookup(user_input, self._prompt_fingerprint())
+                if cached_reply is not None:
+                    return self._handle_action_command(cached_reply, on_notice)
+            except Exception as e:
+                logger.error(f"响应缓存查询失败: {str(e)}")
+        
         messages = self._build_messages(user_input, history)
         
         try:
             start_time = time.time()
-            headers = {
-                "Authorization": f"Bearer {Config.DEEPSEEK_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "model": Config.DEEPSEEK_MODEL_NAME,
-                "messages": messages,
-                "temperature": Config.DEEPSEEK_TEMPERATURE,
-                "max_tokens": Config.DEEPSEEK_MAX_TOKENS,
-                "stream": False
-            }
-            
-            response = requests.post(
-                f"{Config.DEEPSEEK_BASE_URL}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"DeepSeek API错误: {response.status_code} - {response.text}")
-                return f"API错误: {response.status_code}"
-            
-            data = response.json()
-            reply = data["choices"][0]["message"]["content"].strip()
+            if Config.ENABLE_STREAMING:
+                reply, stream_result = self._generate_streaming(messages, on_delta, on_notice)
+            else:
+                reply, stream_result = self._generate_blocking(messages), None
             
             gen_time = time.time() - start_time
             logger.info(f"DeepSeek生成响应耗时: {gen_time:.2f}秒")
             
+            if self.response_cache and query_embedding is not None:
+                self.response_cache.store(query_embedding, self._prompt_fingerprint(), reply, gen_time)
+            
+            # 流式过程中已经执行过命令
+            if stream_result is not None:
+                return stream_result
+            
             # 处理可能的动作命令，返回自然语言结果
-            return self._handle_action_command(reply)
+            return self._handle_action_command(reply, on_notice)
+        except CircuitOpenError as e:
+            logger.warning(f"DeepSeek 熔断中，跳过请求: {str(e)}")
+            return f"我的大脑暂时连不上，{e.retry_after:.0f}秒后再试试吧"
+        except DeepSeekAPIError as e:
+            return f"API错误: {e.status_code}"
         except Exception as e:
             logger.error(f"DeepSeek API调用失败: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
                 logger.error(f"API响应内容: {e.response.text}")
             return "API调用失败，请稍后再试"
     
+    @staticmethod
+    def _primary_endpoint() -> LLMEndpoint:
+        return LLMEndpoint("deepseek", Config.DEEPSEEK_BASE_URL, Config.DEEPSEEK_API_KEY, Config.DEEPSEEK_MODEL_NAME)
+
+    @staticmethod
+    def _hedge_endpoint() -> Optional[LLMEndpoint]:
+        """备用接口：未单独配置地址或模型（与主接口相同）时返回 None"""
+        endpoint = LLMEndpoint(
+            "deepseek_hedge",
+            Config.HEDGE_BASE_URL or Config.DEEPSEEK_BASE_URL,
+            Config.HEDGE_API_KEY or Config.DEEPSEEK_API_KEY,
+            Config.HEDGE_MODEL_NAME or Config.DEEPSEEK_MODEL_NAME
+        )
+        primary = DeepSeekAPIModel._primary_endpoint()
+        if (endpoint.base_url.rstrip("/"), endpoint.model) == (primary.base_url.rstrip("/"), primary.model):
+            return None
+        return endpoint
+
+    def _post_chat(self, messages: list, stream: bool):
+        if self._hedge_executor:
+            return self._post_hedged(messages, stream)
+        return self._post_endpoint(self._primary_endpoint(), messages, stream)
+
+    def _post_endpoint(self, endpoint: LLMEndpoint, messages: list, stream: bool,
+                       cancelled: threading.Event = None):
+        headers = {
+            "Authorization": f"Bearer {endpoint.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": endpoint.model,
+            "messages": messages,
+            "temperature": Config.DEEPSEEK_TEMPERATURE,
+            "max_tokens": Config.DEEPSEEK_MAX_TOKENS,
+            "stream": stream
+        }
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        
+        # 熔断中直接失败，不再等待超时
+        breaker = get_breaker(endpoint.name)
+        breaker.check()
+        start_time = time.time()
+        try:
+            response = requests.post(
+                f"{endpoint.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=(Config.DEEPSEEK_CONNECT_TIMEOUT, Config.DEEPSEEK_READ_TIMEOUT),
+                stream=stream
+            )
+        except Exception:
+            # 对冲中被主动取消的请求不计入故障
+            if not (cancelled and cancelled.is_set()):
+                breaker.record(False, time.time() - start_time)
+            raise
+        breaker.record_status(response.status_code, time.time() - start_time)
+        
+        if response.status_code != 200:
+            logger.error(f"{endpoint.name} API错误: {response.status_code} - {response.text}")
+            raise DeepSeekAPIError(response.status_code)
+        return response
+    
+    def _post_hedged(self, messages: list, stream: bool):
+        """
+        对冲请求：主接口在百分位等待时间内没有返回响应头（流式下即首字节）时，
+        向备用接口发出相同请求，先成功的一方胜出，另一方被取消。
+        """
+        primary, secondary = self._primary_endpoint(), self.hedge_endpoint
+        hedge_stats.on_request()
+        deadline = hedge_stats.deadline()
+        start_time = time.time()
+        attempts = {}  # future -> (接口, 取消标记)
+
+        def launch(endpoint: LLMEndpoint):
+            cancelled = threading.Event()
+            future = self._hedge_executor.submit(self._post_endpoint, endpoint, messages, stream, cancelled)
+            attempts[future] = (endpoint, cancelled)
+            return future
+
+        primary_future = launch(primary)
+        primary_future.add_done_callback(lambda future: self._record_primary_latency(future, start_time))
+        done, _ = wait([primary_future], timeout=deadline)
+        # 主请求超过等待时间，或很快就以超时/服务端错误/熔断失败时发出对冲请求
+        if not done or self._hedgeable(primary_future.exception()):
+            if get_breaker(secondary.name).is_open:
+                logger.info("备用接口熔断中，不发出对冲请求")
+            elif hedge_stats.try_spend():
+                logger.info(f"主接口未在 {deadline:.2f}秒内响应，发出对冲请求: {secondary.base_url} ({secondary.model})")
+                launch(secondary)
+            else:
+                logger.info("对冲预算不足，继续等待主接口")
+
+        winner, error = None, None
+        pending = set(attempts)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if winner is None:
+                    winner = (future, response)
+                else:
+                    response.close()
+
+        # 放弃落后的请求：不计入熔断统计，返回的响应立即关闭；不等待它结束
+        for future in pending:
+            endpoint, cancelled = attempts[future]
+            cancelled.set()
+            future.add_done_callback(self._close_late_response)
+            logger.info(f"已取消落后的请求: {endpoint.name}")
+
+        if winner is None:
+            raise error
+        future, response = winner
+        endpoint = attempts[future][0]
+        latency = time.time() - start_time
+        hedge_stats.record_win(endpoint is secondary)
+        if len(attempts) > 1:
+            logger.info(f"对冲请求完成，胜出: {endpoint.name}，首字节 {latency:.2f}秒")
+        return response
+    
+    @staticmethod
+    def _record_primary_latency(future, start_time: float):
+        """主请求成功返回时记录其首字节耗时（对冲胜出的耗时不是主接口的样本）"""
+        if future.exception() is None:
+            hedge_stats.record_latency(time.time() - start_time)
+
+    @staticmethod
+    def _hedgeable(error) -> bool:
+        """主请求的失败是否值得对冲：4xx 等确定性错误重发也一样失败，不消耗对冲预算"""
+        if isinstance(error, DeepSeekAPIError):
+            return error.status_code >= 500
+        return isinstance(error, (requests.Timeout, CircuitOpenError))
+
+    @staticmethod
+    def _close_late_response(future):
+        """被取消的请求若仍然返回了响应，立即关闭连接"""
+        if future.exception() is None:
+            future.result().close()
+    
+    def _generate_blocking(self, messages: list) -> str:
+        data = self._post_chat(messages, stream=False).json()
+        prompt_cache_stats.record(data.get("usage"))
+        return data["choices"][0]["message"]["content"].strip()
+    
+    def _iter_stream(self, response):
+        """解析SSE流，逐段产出增量文本"""
+        response.encoding = "utf-8"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("usage"):
+                prompt_cache_stats.record(chunk["usage"])
+            choices = chunk.get("choices") or []
+            if choices:
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+    
+    def _generate_streaming(self, messages: list, on_delta=None, on_notice=None):
+        """
+        流式生成：命令行一完成就立即执行，命令文本不进入可见输出。
+        返回 (完整原始回复, 处理后的回复)；流中没有命令时处理后的回复为 None。
+        """
+        from action_dispatcher import StreamActionParser
+        start_time = time.time()
+        parser = StreamActionParser(lambda line: self._dispatch_stream_command(line, on_notice))
+        parts = []
+        response = self._post_chat(messages, stream=True)
+        try:
+            for delta in self._iter_stream(response):
+                if not parts:
+                    logger.info(f"DeepSeek首字延迟: {time.time() - start_time:.2f}秒")
+                parts.append(delta)
+                visible = parser.feed(delta)
+                if visible and on_delta:
+                    on_delta(visible)
+            visible = parser.finish()
+            if visible and on_delta:
+                on_delta(visible)
+        finally:
+            response.close()
+        
+        reply = "".join(parts).strip()
+        if not parser.results:
+            return reply, None
+        return reply, "\n".join(filter(None, [parser.visible_text().strip()] + parser.results))
+    
+    def _dispatch_stream_command(self, line: str, on_notice=None):
+        """流式回复中出现完整命令行时立即分发；不是有效命令时返回 None"""
+        if not Config.ENABLE_EXTERNAL_ACTIONS:
+            return None
+        from action_dispatcher import get_action_dispatcher
+        plan = get_action_dispatcher().plan_reply(line)
+        if plan is None:
+            return None
+        logger.info(f"流式检测到命令: {line}")
+        return self._run_action(*plan, on_notice=on_notice)
+    
     def _build_messages(self, user_input: str, history: list) -> list:
         messages = [{"role": "system", "content": self.system_prompt}]
         
@@ -196,14 +514,27 @@ class DeepSeekAPIModel(BaseModel):
                 "content": "重要提示: 使用动作命令时，请确保只返回命令本身，不要添加额外文本。"
             })
         
+        # 旧对话摘要：窗口满后每轮都会被重写
+        summary_message = None
+        if self.summarizer:
+            summary = self.summarizer.get_summary()
+            if summary:
+                summary_message = {"role": "system", "content": f"之前的对话摘要:\n{summary}"}
+        
         # 添加上下文记忆
+        memory_message = None
         if Config.ENABLE_LONG_TERM_MEMORY and self.memory_manager:
             related_memories = self.memory_manager.retrieve_related_memories(user_input)
             if related_memories:
                 memory_text = "相关记忆:\n"
                 for i, memory in enumerate(related_memories):
                     memory_text += f"{i+1}. {memory['text']}\n"
-                messages.append({"role": "system", "content": memory_text})
+                memory_message = {"role": "system", "content": memory_text}
+        
+        # 旧布局：摘要和记忆放在历史之前（每轮都会打断可缓存前缀）
+        cache_friendly = Config.PROMPT_LAYOUT == "cache_friendly"
+        if not cache_friendly:
+            messages.extend(m for m in (summary_message, memory_message) if m)
         
         # 添加历史对话
         for msg in history:
@@ -212,14 +543,21 @@ class DeepSeekAPIModel(BaseModel):
                 "content": msg["content"]
             })
         
+        # 缓存友好布局：稳定内容在前，每轮变化的摘要和记忆放在最后
+        if cache_friendly:
+            messages.extend(m for m in (summary_message, memory_message) if m)
+        
         # 添加当前用户输入
         messages.append({"role": "user", "content": user_input})
         return messages
 
 # 模型工厂函数
-def create_model(memory_manager: Optional[object] = None) -> BaseModel:
+def create_model(memory_manager: Optional[object] = None,
+                 summarizer: Optional[object] = None,
+                 response_cache: Optional[object] = None,
+                 action_executor: Optional[object] = None) -> BaseModel:
     if not Config.DEEPSEEK_API_KEY:
         raise ValueError("DeepSeek API密钥未配置")
     
     logger.info("使用DeepSeek API模型")
-    return DeepSeekAPIModel(memory_manager)
\ No newline at end of file
+    return DeepSeekAPIModel(memory_manager, summarizer, response_cache, action_executor)
\ No newline at end of file
@@ -14,6 +14,7 @@ from utils.logger import logger
 from config import Config
 from memory_manager import MemoryManager
 from subtitles import SubtitleManager
+from history_summarizer import HistorySummarizer
 
 # 如果启用了TTS，导入TTS模块
 if Config.ENABLE_TTS:
@@ -30,6 +31,8 @@ DELETE_MEMORY_CMD = "/delmem"
 TOGGLE_PROGRAM_CMD = "/toggle_program"
 TOGGLE_WEBSITE_CMD = "/toggle_website"
 LIST_STATUS_CMD = "/list_status"
+CACHE_STATS_CMD = "/cachestats"
+BREAKERS_CMD = "/breakers"
 
 class InputThread(threading.Thread):
     """异步输入处理线程：只负责把终端输入放进队列"""
@@ -103,22 +106,72 @@ class AiChat:
         # 长期记忆
         self.memory_manager = MemoryManager() if Config.ENABLE_LONG_TERM_MEMORY else None
 
+        # 滚动对话摘要
+        self.summarizer = HistorySummarizer() if Config.ENABLE_HISTORY_SUMMARY else None
+
+        # 语义响应缓存（复用记忆模块的嵌入模型）
+        self.response_cache = None
+        if Config.ENABLE_RESPONSE_CACHE:
+            if self.memory_manager:
+                from response_cache import ResponseCache
+                self.response_cache = ResponseCache(self.memory_manager.embedding_model)
+            else:
+                logger.warning("响应缓存需要启用长期记忆（嵌入模型），已跳过")
+
         # 字幕管理器（主线程创建）
         self.subtitle_manager = None
         if Config.ENABLE_SUBTITLES:
             self._init_subtitles_mainthread()
 
+        # 动作执行器（外部操作不阻塞对话线程）
+        self.action_executor = None
+        if Config.ENABLE_EXTERNAL_ACTIONS and Config.ENABLE_ASYNC_ACTIONS:
+            from action_executor import ActionExecutor
+            self.action_executor = ActionExecutor()
+            self.action_executor.add_result_callback(self._on_action_result)
+
+        # 启动时并行解析所有程序路径，无效条目提前报告
+        if Config.ENABLE_EXTERNAL_ACTIONS and Config.PROGRAM_MAPPINGS:
+            from program_resolver import program_resolver
+            program_resolver.resolve_all(Config.PROGRAM_MAPPINGS)
+
         # LLM/TTS
         from llm import DeepSeekAPIModel
         if not Config.DEEPSEEK_API_KEY:
             raise ValueError("DeepSeek API密钥未配置")
         logger.info("使用DeepSeek API模型")
-        self.llm = DeepSeekAPIModel(memory_manager=self.memory_manager)
+        self.llm = DeepSeekAPIModel(
+            memory_manager=self.memory_manager,
+            summarizer=self.summarizer,
+            response_cache=self.response_cache,
+            action_executor=self.action_executor
+        )
         
         self.tts = HeWoYiTTS() if Config.ENABLE_TTS else None
-
-        # 对话历史
+        if self.tts:
+            # 开启TTS时字幕按语音播放事件逐句显示
+            self.tts.add_listener(self._on_speech_event)
+
+        # 后台预热常用语句的TTS缓存
+        self.tts_prewarmer = None
+        if self.tts and self.tts.enabled and self.tts.cache and Config.ENABLE_TTS_PREWARM:
+            from tts_prewarm import TTSPrewarmer
+            self.tts_prewarmer = TTSPrewarmer(self.tts)
+            self.tts_prewarmer.start()
+
+        # 对话历史；异步动作结果在执行器线程中写入，由锁保护
         self.conversation_history = []
+        self._history_lock = threading.Lock()
+        self._turn_open = False
+        self._late_results = []
+
+        # 配置热重载
+        self.config_watcher = None
+        Config.subscribe(self._on_config_changed)
+        if Config.ENABLE_CONFIG_WATCH:
+            from config_watcher import ConfigWatcher
+            self.config_watcher = ConfigWatcher()
+            self.config_watcher.start()
 
         logger.info("AiChat 实例已创建")
 
@@ -151,12 +204,62 @@ class AiChat:
         time.sleep(0.2)
         self._init_subtitles_mainthread()
 
+    # ---------------- 配置热重载 ----------------
+    def _on_config_changed(self, snapshot, changed: set):
+        """配置替换后的回调（在监视线程中执行）"""
+        # 提示词与动作分发器按状态版本号自动重建，这里只需重新解析程序路径
+        if "PROGRAM_MAPPINGS" in changed and Config.ENABLE_EXTERNAL_ACTIONS and Config.PROGRAM_MAPPINGS:
+            from program_resolver import program_resolver
+            program_resolver.resolve_all(Config.PROGRAM_MAPPINGS)
+
+    # ---------------- 动作结果 ----------------
+    def _on_action_result(self, action: str, target: str, result: str):
+        """动作执行完成（在执行器线程中回调）"""
+        print(f"\n[动作] {result}")
+        print("You: ", end='', flush=True)
+        logger.info(f"动作结果: {action} {target} -> {result}")
+        self._record_action_result(result)
+        if self.tts:
+            try:
+                from audio_scheduler import PRIORITY_NOTICE
+                if self.tts.speak(result, priority=PRIORITY_NOTICE):
+                    return
+            except Exception as e:
+                logger.error(f"播报动作结果失败: {e}")
+        if self.subtitle_manager:
+            try:
+                self.subtitle_manager.show_subtitle(result)
+            except Exception as e:
+                logger.error(f"显示动作结果字幕失败: {e}")
+
+    def _on_speech_event(self, event: str, text: str, duration: float):
+        """语音播放事件（在音频调度线程中回调）：一句开始播放或合成失败时显示该句字幕"""
+        if event not in ("start", "skip") or not self.subtitle_manager:
+            return
+        try:
+            self.subtitle_manager.show_speech(text, duration)
+        except Exception as e:
+            logger.error(f"显示语音字幕失败: {e}")
+
     # ---------------- 命令/对话 ----------------
+    def _record_action_result(self, result: str):
+        """动作结果计入对话历史：本轮回复尚未记录时先暂存，记录时一并写入"""
+        with self._history_lock:
+            if self._turn_open or not self.conversation_history:
+                self._late_results.append(result)
+                return
+            last = self.conversation_history[-1]
+            last["content"] = "\n".join(filter(None, [last["content"], result]))
+
     def _trim_history(self):
         max_length = Config.MAX_HISTORY_LENGTH * 2
         if len(self.conversation_history) > max_length:
+            dropped = self.conversation_history[:-max_length]
             self.conversation_history = self.conversation_history[-max_length:]
             logger.info(f"已修剪对话历史至{max_length}条")
+            # 移出窗口的对话交给后台摘要器折叠
+            if self.summarizer:
+                self.summarizer.submit(dropped)
 
     def handle_command(self, cmd: str):
         if cmd is None:
@@ -170,6 +273,8 @@ class AiChat:
 
         if cmd == CLEAR_HISTORY_CMD:
             self.conversation_history = []
+            if self.summarizer:
+                self.summarizer.reset_session()
             print("对话历史已清空")
             logger.info("用户清空对话历史")
             return True
@@ -268,28 +373,65 @@ class AiChat:
             print(ActionManager.list_status())
             return True
         
+        if cmd == BREAKERS_CMD:
+            from circuit_breaker import circuit_breakers
+            from llm import hedge_stats
+            print(circuit_breakers.report())
+            print(hedge_stats.report())
+            return True
+        
+        if cmd == CACHE_STATS_CMD:
+            from llm import prompt_cache_stats
+            print(prompt_cache_stats.report())
+            if self.response_cache:
+                print(self.response_cache.report())
+            if self.tts and self.tts.cache:
+                print(self.tts.cache.report())
+            return True
+        
         return None
 
     def process_user_input(self, user_input: str):
         try:
             logger.info(f"用户输入: {user_input}")
-            response = self.llm.generate_response(user_input, self.conversation_history)
-
-            print(f"Neuro-Sama: {response}")
+            with self._history_lock:
+                self._turn_open = True
+            # 不播放语音时字幕跟随流式输出边生成边显示
+            subtitle_stream = None
+            if self.subtitle_manager and not (self.tts and self.tts.enabled):
+                subtitle_stream = self.subtitle_manager.open_stream()
+            response = None
+            notices = []
+            try:
+                response = self.llm.generate_response(
+                    user_input, self.conversation_history,
+                    on_delta=subtitle_stream.append if subtitle_stream else None,
+                    on_notice=notices.append
+                )
+            finally:
+                # 补上流中没有的部分（命令执行结果、缓存命中的回复）
+                if subtitle_stream:
+                    subtitle_stream.close(response)
+
+            # 动作确认语只显示在控制台，播报和历史只用最终结果
+            display = "\n".join(filter(None, [response] + notices))
+            print(f"Neuro-Sama: {display}")
             logger.info(f"Neuro-Sama 响应: {response}")
 
             # 并行处理TTS和字幕
             tts_success = False
             subtitle_success = False
             
-            if self.tts:
+            if self.tts and response:
                 try:
-                    self.tts.speak(response)
-                    tts_success = True
+                    tts_success = self.tts.speak(response)
                 except Exception as e:
                     logger.error(f"TTS 播放失败: {e}")
 
-            if self.subtitle_manager:
+            # 语音已排队时字幕由播放事件逐句驱动
+            if tts_success or subtitle_stream:
+                subtitle_success = bool(self.subtitle_manager)
+            elif self.subtitle_manager and response:
                 try:
                     self.subtitle_manager.show_subtitle(response)
                     subtitle_success = True
@@ -297,8 +439,12 @@ class AiChat:
                     logger.error(f"显示字幕失败: {e}")
 
             # 记录对话
-            self.conversation_history.append({"role": "user", "content": user_input})
-            self.conversation_history.append({"role": "assistant", "content": response})
+            with self._history_lock:
+                content = "\n".join(filter(None, [response] + self._late_results))
+                self._late_results = []
+                self._turn_open = False
+                self.conversation_history.append({"role": "user", "content": user_input})
+                self.conversation_history.append({"role": "assistant", "content": content})
 
             # 长期记忆
             if self.memory_manager:
@@ -313,6 +459,8 @@ class AiChat:
             return tts_success and subtitle_success
         except Exception as e:
             logger.error(f"处理用户输入出错: {e}", exc_info=True)
+            with self._history_lock:
+                self._turn_open = False
             print(f"处理用户输入出错: {e}")
             return False
 
@@ -329,6 +477,8 @@ class AiChat:
             print("="*50)
             print(f"输入 '{EXIT_CMD}' 退出程序")
             print(f"输入 '{CLEAR_HISTORY_CMD}' 清空对话历史")
+            print(f"输入 '{CACHE_STATS_CMD}' 查看缓存统计")
+            print(f"输入 '{BREAKERS_CMD}' 查看接口熔断状态")
             if Config.ENABLE_LONG_TERM_MEMORY:
                 print(f"输入 '{FORGET_MEMORY_CMD}' 清空长期记忆")
                 print(f"输入 '{LIST_MEMORIES_CMD} [数量]' 列出最近的记忆")
@@ -369,8 +519,11 @@ class AiChat:
 
                     self._request_subtitle_reset = False
                 
-                # 控制循环频率
-                time.sleep(0.02 if self.subtitle_manager else 0.1)
+                # 等待下一次需要重绘（新字幕会立即唤醒）
+                if self.subtitle_manager and self.subtitle_manager.active:
+                    self.subtitle_manager.wait_for_next_frame()
+                else:
+                    time.sleep(0.1)
 
         except KeyboardInterrupt:
             logger.warning("程序被键盘中断")
@@ -427,6 +580,21 @@ def main():
         if input_thread:
             input_thread.stop()
         
+        if bot and bot.action_executor:
+            bot.action_executor.shutdown()
+        
+        if bot and bot.llm:
+            bot.llm.shutdown()
+        
+        if bot and bot.config_watcher:
+            bot.config_watcher.stop()
+        
+        if bot and bot.tts_prewarmer:
+            bot.tts_prewarmer.stop()
+        
+        if bot and bot.tts:
+            bot.tts.shutdown()
+        
         # 等待线程结束
         if worker and worker.is_alive():
             worker.join(timeout=1.0)
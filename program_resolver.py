@@ -0,0 +1,97 @@
+import os
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from utils.logger import logger
+
+
+class ProgramResolver:
+    """
+    程序路径解析缓存：启动时并行解析所有程序映射（裸命令名用 shutil.which，
+    其余校验为存在的绝对路径），结果按所在目录的 mtime 失效。
+    """
+    def __init__(self, check_interval: float = None):
+        self.check_interval = check_interval if check_interval is not None else Config.PROGRAM_RESOLVE_CHECK_INTERVAL
+        self._lock = threading.Lock()
+        self._cache = {}  # (名称, 配置值) -> {"path", "stamp", "checked"}
+
+    # ---------- 解析 ----------
+    @staticmethod
+    def is_bare_name(value: str) -> bool:
+        return not (os.path.isabs(value) or os.sep in value or (os.altsep and os.altsep in value))
+
+    @staticmethod
+    def _stamp(path: str):
+        """失效依据：路径所在目录的 mtime（文件增删改名都会改变它）"""
+        try:
+            return os.stat(os.path.dirname(path) or ".").st_mtime
+        except OSError:
+            return None
+
+    def _resolve_uncached(self, value: str):
+        value = os.path.expandvars(os.path.expanduser(value.strip().strip('"')))
+        if not value:
+            return None, None
+        if self.is_bare_name(value):
+            path = shutil.which(value)
+            if path:
+                return path, self._stamp(path)
+            # 未找到时以 PATH 变量作为失效依据
+            return None, os.environ.get("PATH", "")
+        path = os.path.abspath(value)
+        if os.path.exists(path):
+            return path, self._stamp(path)
+        return None, self._stamp(path)
+
+    def _current_stamp(self, entry: dict, value: str):
+        if entry["path"]:
+            return self._stamp(entry["path"])
+        if self.is_bare_name(value.strip().strip('"')):
+            return os.environ.get("PATH", "")
+        return self._stamp(os.path.abspath(os.path.expandvars(os.path.expanduser(value.strip().strip('"')))))
+
+    def resolve(self, name: str, value: str):
+        """返回可执行路径；无法解析时返回 None"""
+        key = (name, value)
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None:
+            if now - entry["checked"] < self.check_interval:
+                return entry["path"]
+            # 到达检查间隔，对比 mtime 决定是否重新解析
+            if self._current_stamp(entry, value) == entry["stamp"]:
+                entry["checked"] = now
+                return entry["path"]
+            logger.info(f"程序路径已变化，重新解析: {name}")
+
+        path, stamp = self._resolve_uncached(value)
+        with self._lock:
+            self._cache[key] = {"path": path, "stamp": stamp, "checked": now}
+        return path
+
+    def resolve_all(self, mappings: dict):
+        """并行解析所有程序映射，一次性报告无法解析的条目"""
+        if not mappings:
+            return {}
+        start_time = time.time()
+        items = list(mappings.items())
+        with ThreadPoolExecutor(max_workers=min(8, len(items))) as pool:
+            paths = list(pool.map(lambda kv: self.resolve(kv[0], kv[1]), items))
+
+        results = dict(zip((name for name, _ in items), paths))
+        unresolved = [name for name, path in results.items() if not path]
+        logger.info(
+            f"程序路径解析完成: {len(results) - len(unresolved)}/{len(results)} 个可用，"
+            f"耗时 {(time.time() - start_time) * 1000:.1f}ms"
+        )
+        if unresolved:
+            details = ", ".join(f"{name}={mappings[name]}" for name in unresolved)
+            logger.warning(f"以下程序无法解析为可执行路径，将按原样交给系统启动: {details}")
+        return results
+
+
+# 全局程序路径解析器
+program_resolver = ProgramResolver()
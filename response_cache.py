@@ -0,0 +1,105 @@
+import re
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from config import Config
+from utils.logger import logger
+
+# 动作类回复（确定性输出）的识别
+ACTION_REPLY_PATTERN = re.compile(
+    r"/action\s+\w+|/(?:enable_program|disable_program|enable_website|disable_website|list_status)\b"
+)
+
+
+class ResponseCache:
+    """
+    语义响应缓存：按用户输入的嵌入向量命中，同时要求系统提示词/开关状态指纹一致。
+    缓存的是模型原始回复，命中后仍会重新执行其中的动作命令。
+    """
+    def __init__(self, embedding_model,
+                 max_entries: int = None,
+                 ttl: float = None,
+                 threshold: float = None,
+                 actions_only: bool = None):
+        self.embedding_model = embedding_model
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.RESPONSE_CACHE_TTL
+        self.threshold = threshold if threshold is not None else Config.RESPONSE_CACHE_THRESHOLD
+        self.actions_only = actions_only if actions_only is not None else Config.RESPONSE_CACHE_ACTIONS_ONLY
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> {"embedding", "fingerprint", "reply", "gen_time", "created"}
+        self._next_key = 0
+
+        # 统计
+        self.lookups = 0
+        self.hits = 0
+        self.saved_seconds = 0.0
+        logger.info(
+            f"响应缓存已启用: 容量={self.max_entries}, TTL={self.ttl:.0f}秒, "
+            f"阈值={self.threshold}, 仅缓存动作回复={self.actions_only}"
+        )
+
+    def _embed(self, text: str) -> np.ndarray:
+        embedding = np.asarray(self.embedding_model.encode([text])[0], dtype="float32")
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def _purge_expired(self, now: float):
+        expired = [k for k, e in self._entries.items() if now - e["created"] > self.ttl]
+        for k in expired:
+            del self._entries[k]
+
+    def lookup(self, user_input: str, fingerprint: str):
+        """查找缓存，返回 (回复或None, 查询嵌入向量)"""
+        query = self._embed(user_input.strip())
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            self._purge_expired(now)
+
+            best_key, best_sim = None, -1.0
+            for key, entry in self._entries.items():
+                if entry["fingerprint"] != fingerprint:
+                    continue
+                sim = float(np.dot(query, entry["embedding"]))
+                if sim > best_sim:
+                    best_key, best_sim = key, sim
+
+            if best_key is None or best_sim < self.threshold:
+                return None, query
+
+            entry = self._entries[best_key]
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            self.saved_seconds += entry["gen_time"]
+        logger.info(f"响应缓存命中: 相似度={best_sim:.3f}, 节省约 {entry['gen_time']:.2f}秒")
+        return entry["reply"], query
+
+    def store(self, query_embedding: np.ndarray, fingerprint: str, reply: str, gen_time: float):
+        """写入缓存（仅缓存动作类回复，除非关闭 actions_only）"""
+        if self.actions_only and not ACTION_REPLY_PATTERN.search(reply):
+            return
+        with self._lock:
+            self._entries[self._next_key] = {
+                "embedding": query_embedding,
+                "fingerprint": fingerprint,
+                "reply": reply,
+                "gen_time": gen_time,
+                "created": time.time()
+            }
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def report(self) -> str:
+        with self._lock:
+            lookups, hits, saved, size = self.lookups, self.hits, self.saved_seconds, len(self._entries)
+        hit_rate = hits / lookups if lookups else 0.0
+        return (
+            "响应缓存统计:\n"
+            f"  条目数: {size}/{self.max_entries}\n"
+            f"  命中率: {hit_rate:.1%} ({hits}/{lookups})\n"
+            f"  累计节省: {saved:.2f}秒"
+        )
@@ -0,0 +1,163 @@
+import re
+
+# 行首禁则：不能出现在行首的标点
+NO_BREAK_BEFORE = frozenset("，。、；：！？）》」』】〕〉”’…—～·%,.;:!?)]}")
+# 行尾禁则：不能出现在行尾的标点
+NO_BREAK_AFTER = frozenset("（《「『【〔〈“‘([{")
+# 为满足禁则最多从上一行带下来的字符数
+MAX_CARRY = 3
+# 分页时的句子边界（边界字符保留在句尾）
+SENTENCE_END_PATTERN = re.compile(r"(?<=[。！？!?；;…~～\n])")
+
+
+class GlyphAdvanceCache:
+    """按字体（名称, 字号, 抗锯齿）缓存每个字符的水平步进宽度"""
+    def __init__(self):
+        self._fonts = {}
+
+    def for_font(self, font, font_key) -> "GlyphAdvances":
+        advances = self._fonts.get(font_key)
+        if advances is None or advances.font is not font:
+            advances = GlyphAdvances(font)
+            self._fonts[font_key] = advances
+        return advances
+
+    def clear(self):
+        self._fonts.clear()
+
+
+class GlyphAdvances:
+    """单个字体的字符步进宽度表"""
+    def __init__(self, font):
+        self.font = font
+        self._advances = {}
+
+    def __call__(self, ch: str) -> int:
+        advance = self._advances.get(ch)
+        if advance is None:
+            advance = self._measure(ch)
+            self._advances[ch] = advance
+        return advance
+
+    def _measure(self, ch: str) -> int:
+        try:
+            metrics = self.font.get_metrics(ch)
+            if metrics and metrics[0] is not None:
+                return int(round(metrics[0][4]))
+            return self.font.get_rect(ch).width
+        except Exception:
+            return max(int(getattr(self.font, "size", 16)) // 2, 8)
+
+    def width(self, text: str) -> int:
+        return sum(self(ch) for ch in text)
+
+
+class IncrementalWrapper:
+    """
+    增量折行：文本在原有基础上追加字符时（打字机效果）只处理新字符，
+    每个字符的宽度来自步进缓存；遵守中日文行首/行尾禁则。
+    """
+    def __init__(self):
+        self.advances = None
+        self.limit = 0
+        self._text = ""
+        self._lines = [""]
+        self._widths = [0]
+
+    def reset(self, advances: GlyphAdvances, limit: int):
+        """字体或可用宽度变化时调用"""
+        self.advances = advances
+        self.limit = limit
+        self._restart()
+
+    def _restart(self):
+        self._text = ""
+        self._lines = [""]
+        self._widths = [0]
+
+    def layout(self, text: str) -> list:
+        """返回折行结果；text 以上次的文本为前缀时只处理新增部分"""
+        if not text.startswith(self._text):
+            self._restart()
+        for ch in text[len(self._text):]:
+            self._append(ch)
+        self._text = text
+        return [line for line in self._lines if line]
+
+    def _append(self, ch: str):
+        if ch == "\n":
+            self._lines.append("")
+            self._widths.append(0)
+            return
+        advance = self.advances(ch)
+        line = self._lines[-1]
+        if not line or self._widths[-1] + advance <= self.limit:
+            self._lines[-1] = line + ch
+            self._widths[-1] += advance
+            return
+
+        # 需要换行：新行首是禁止出现在行首的标点，或当前行尾是禁止出现在行尾的标点时，
+        # 把当前行末尾的字符一起带到下一行
+        carry = 0
+        head = ch
+        while (carry < MAX_CARRY and len(line) - carry > 1 and
+               (head[0] in NO_BREAK_BEFORE or line[-1 - carry] in NO_BREAK_AFTER)):
+            carry += 1
+            head = line[-carry] + head
+        if carry:
+            moved = line[-carry:]
+            self._lines[-1] = line[:-carry]
+            self._widths[-1] -= self.advances.width(moved)
+        self._lines.append(head)
+        self._widths.append(self.advances.width(head))
+
+
+class ScaledAdvances:
+    """字号估算模型：freetype 步进宽度随字号近似线性变化，用基准字号的步进等比缩放"""
+    def __init__(self, base: GlyphAdvances, scale: float):
+        self.base = base
+        self.scale = scale
+
+    def __call__(self, ch: str) -> float:
+        return self.base(ch) * self.scale
+
+    def width(self, text: str) -> float:
+        return self.base.width(text) * self.scale
+
+
+def count_lines(text: str, advances, limit: int) -> int:
+    """按给定步进宽度折行后的行数"""
+    wrapper = IncrementalWrapper()
+    wrapper.reset(advances, limit)
+    return len(wrapper.layout(text))
+
+
+def paginate(text: str, advances, limit: int, max_lines: int) -> list:
+    """
+    按句分页：每页放入尽量多的完整句子且不超过 max_lines 行；
+    单句超过一页时按行切开。追加句子时折行是增量的。
+    """
+    pages = []
+    page = ""
+    wrapper = IncrementalWrapper()
+    wrapper.reset(advances, limit)
+    for sentence in SENTENCE_END_PATTERN.split(text):
+        if not page:
+            sentence = sentence.lstrip()
+        if not sentence:
+            continue
+        candidate = page + sentence
+        if len(wrapper.layout(candidate)) <= max_lines:
+            page = candidate
+            continue
+        if page.strip():
+            pages.append(page.strip())
+        lines = wrapper.layout(sentence.lstrip())
+        while len(lines) > max_lines:
+            pages.append("".join(lines[:max_lines]))
+            lines = lines[max_lines:]
+        page = "".join(lines)
+        wrapper.layout(page)
+    if page.strip():
+        pages.append(page.strip())
+    return pages
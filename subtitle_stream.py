@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import deque, namedtuple
+
+
+# 普通字幕条目
+SubtitleEntry = namedtuple("SubtitleEntry", ["text", "duration", "typing_speed"])
+
+
+class SpeechEntry(SubtitleEntry):
+    """语音驱动的字幕条目：新的一句只替换排队中的语音字幕，其他字幕保留"""
+    __slots__ = ()
+
+
+class SubtitleChannel:
+    """
+    工作线程与渲染线程之间的字幕通道：条件变量保护的队列。
+    入队、流式追加和样式变化都会唤醒阻塞在 wait() 中的渲染循环。
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._items = deque()  # SubtitleEntry / SpeechEntry / SubtitleStream
+        self._signaled = False
+        self._replace = False  # 替换标记：渲染线程下次取字幕时丢弃当前字幕
+
+    def put(self, item, replace: bool = False):
+        """
+        入队；replace=True 时丢弃队列中与它同类的条目，新条目排到队首并立即替换当前字幕，
+        其他排队的字幕在它之后继续显示
+        """
+        with self._cond:
+            if replace:
+                kind = type(item)
+                self._items = deque(queued for queued in self._items if type(queued) is not kind)
+                self._items.appendleft(item)
+                self._replace = True
+            else:
+                self._items.append(item)
+            self._signal_locked()
+
+    def put_front(self, items: list):
+        """按原顺序插回队首（分页、重启恢复时使用）"""
+        with self._cond:
+            self._items.extendleft(reversed(items))
+
+    def take(self, busy: bool):
+        """
+        渲染线程取字幕，返回 (是否替换当前字幕, 条目)；
+        busy 表示正在显示字幕，此时只有替换标记才会取出新条目。
+        """
+        with self._cond:
+            replace, self._replace = self._replace, False
+            if (busy and not replace) or not self._items:
+                return replace, None
+            return replace, self._items.popleft()
+
+    def drain(self) -> list:
+        """取出全部条目"""
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    # ---------- 唤醒 ----------
+    def _signal_locked(self):
+        self._signaled = True
+        self._cond.notify_all()
+
+    def notify(self):
+        """唤醒渲染循环（流式追加、样式变化）"""
+        with self._cond:
+            self._signal_locked()
+
+    def wait(self, timeout: float) -> bool:
+        """等待唤醒或超时；被唤醒返回 True"""
+        with self._cond:
+            woke = self._cond.wait_for(lambda: self._signaled, timeout)
+            self._signaled = False
+            return woke
+
+
+class SubtitleStream:
+    """
+    流式字幕句柄：工作线程 append() 追加LLM输出的文本增量，生成结束后 close()；
+    渲染线程读取 text 并在当前布局上增量折行。
+    """
+    def __init__(self, channel: SubtitleChannel, typing_speed: float):
+        self._channel = channel
+        self._lock = threading.Lock()
+        self._text = ""
+        self.typing_speed = typing_speed
+        self.revision = 0  # 文本被整体替换（不再以原文本为前缀）的次数
+        self.closed = False
+        self.closed_at = None
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def append(self, text: str):
+        if not text or self.closed:
+            return
+        with self._lock:
+            self._text += text
+        self._channel.notify()
+
+    def close(self, final_text: str = None):
+        """
+        结束字幕流；final_text 为最终回复。两者去掉首尾空白后，最终回复以已收到的文本开头时
+        （如追加了命令执行结果）只补上剩余部分；不一致时用最终回复整体替换并递增 revision。
+        """
+        with self._lock:
+            if self.closed:
+                return
+            if final_text:
+                shown, final = self._text.strip(), final_text.strip()
+                if final.startswith(shown):
+                    self._text += final[len(shown):]
+                else:
+                    self._text = final
+                    self.revision += 1
+            self.closed = True
+            self.closed_at = time.time()
+        self._channel.notify()
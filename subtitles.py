@@ -4,10 +4,13 @@ import sys
 import time
 import pygame
 import pygame.freetype
-from collections import deque
+from collections import OrderedDict
 
 from utils.logger import logger
 from config import Config
+from subtitle_layout import (GlyphAdvanceCache, IncrementalWrapper, ScaledAdvances, SENTENCE_END_PATTERN,
+                             count_lines, paginate)
+from subtitle_stream import SubtitleChannel, SubtitleStream, SubtitleEntry, SpeechEntry
 
 # ---------- Windows 常量 ----------
 IS_WIN = sys.platform.startswith("win")
@@ -29,6 +32,14 @@ if IS_WIN:
 else:
     HAVE_PYWIN32 = False
 
+# 描边膨胀使用 numpy（不可用时回退为多次偏移渲染）
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    logger.warning("numpy 未安装，字幕描边将使用偏移渲染")
+    HAVE_NUMPY = False
+
 # 使用 win32con 常量
 GWL_EXSTYLE = win32con.GWL_EXSTYLE
 WS_EX_LAYERED = win32con.WS_EX_LAYERED
@@ -55,6 +66,55 @@ def _parse_color(val, default=(255,0,255)):
             pass
     return default
 
+# ---------- 描边膨胀 ----------
+def _axis_slice(arr, axis: int, start: int, stop: int):
+    index = [slice(None)] * arr.ndim
+    index[axis] = slice(start, stop)
+    return arr[tuple(index)]
+
+def _max_filter_1d(arr, radius: int, axis: int):
+    """一维最大值滤波（窗口 [-radius, radius]），倍增法只需 O(log radius) 次数组运算"""
+    if radius <= 0:
+        return arr
+    size = arr.shape[axis]
+    window = radius * 2 + 1
+    pad = [(0, 0)] * arr.ndim
+    pad[axis] = (radius, radius)
+    m = np.pad(arr, pad)
+    span = 1
+    while span * 2 <= window:
+        m = np.maximum(_axis_slice(m, axis, 0, m.shape[axis] - span), _axis_slice(m, axis, span, m.shape[axis]))
+        span *= 2
+    # m[i] = 原数组 [i, i+span) 的最大值，两段重叠覆盖整个窗口
+    rest = window - span
+    return np.maximum(_axis_slice(m, axis, 0, size), _axis_slice(m, axis, rest, rest + size))
+
+def _dilate_disk(mask, radius: int):
+    """
+    圆盘膨胀：圆盘按行分解为水平线段，每种宽度的水平最大值滤波只算一次，
+    再按行偏移取最大值；灰度（抗锯齿）掩码同样适用。
+    """
+    if radius <= 0:
+        return mask
+    height = mask.shape[1]
+    rows = {}
+    out = np.zeros_like(mask)
+    for dy in range(-radius, radius + 1):
+        half_width = int((radius * radius - dy * dy) ** 0.5)
+        if half_width not in rows:
+            rows[half_width] = _max_filter_1d(mask, half_width, axis=0)
+        row = rows[half_width]
+        # 把第 y 行的结果贡献给第 y + dy 行
+        if dy >= 0:
+            np.maximum(out[:, dy:], row[:, :height - dy], out=out[:, dy:])
+        else:
+            np.maximum(out[:, :dy], row[:, -dy:], out=out[:, :dy])
+    return out
+
+
+# 自动缩小字号的下限
+MIN_FONT_SIZE = 12
+
 # 逐帧 DEBUG 抽样
 def _should_debug(frame_counter: int, every_n: int) -> bool:
     if every_n <= 0:
@@ -79,7 +139,7 @@ class SubtitleManager:
         self.width  = int(width)
         self.height = int(height)
         self.fps    = int(fps)
-        self.idle_fps = int(_get_cfg('SUBTITLE_IDLE_FPS', max(10, self.fps // 4)))
+        self.idle_wait = float(_get_cfg('SUBTITLE_IDLE_WAIT', 0.25))  # 空闲时处理窗口事件的间隔
         self.caption = caption
 
         self.frameless      = bool(frameless)
@@ -111,6 +171,8 @@ class SubtitleManager:
         self.typing_speed       = float(_get_cfg('SUBTITLE_TYPING_SPEED', 0.15))   # s/char
         self.audio_char_time    = float(_get_cfg('SUBTITLE_AUDIO_CHAR_TIME', 0.2)) # s/char
         self.extra_display_time = float(_get_cfg('SUBTITLE_EXTRA_DISPLAY_TIME', 4.0))
+        self.speech_hold_time   = float(_get_cfg('SUBTITLE_SPEECH_HOLD_TIME', 0.8))  # 语音结束后保留
+        self.pagination         = bool(_get_cfg('SUBTITLE_PAGINATION', True))  # 长字幕分页而不是缩小字号
 
         # 日志与 watchdog
         self.debug_verbose       = bool(_get_cfg('SUBTITLE_DEBUG_VERBOSE', False))
@@ -119,19 +181,46 @@ class SubtitleManager:
 
         # 状态
         self.active = False
-        self.queue = deque()         # (text, duration)
+        self.queue = SubtitleChannel()  # (text, duration, typing_speed) 或 SubtitleStream，跨线程入队
         self.current_subtitle = ""
         self.duration = 0.0
+        self.current_typing_speed = self.typing_speed
         self.show_time = 0.0
+        self._stream = None            # 正在显示的流式字幕
+        self._stream_revision = 0      # 已显示的流式字幕文本版本，变化时从头打字
+        self._page_start = 0           # 流式字幕当前页在全文中的起点
+        self._revealed = 0             # 流式字幕已打出的字数
+        self._reveal_at = None         # 流式字幕上一个字打出的时间，None 表示已追上、等待新文本
+        self._caught_up_at = 0.0       # 流式字幕最近一次追上已收到文本的时间
 
         # 逐帧 & 缓存
         self._frame_counter = 0
-        self._last_flip_ts  = time.time()   # 最后一次 flip 成功时间
+        self._last_flip_ts  = time.time()   # 最后一次刷新成功（或无需刷新）的时间
         self._last_render_ts= time.time()   # 最后一次 render 调用时间
         self.cached_lines = []
         self.cached_text_for_layout = None
         self.cached_width_for_layout = None
         self.cached_font_size_for_layout = None
+        # 增量折行：字符宽度按字体缓存，打字机每帧只处理新出现的字符
+        self._glyph_advances = GlyphAdvanceCache()
+        self._wrapper = IncrementalWrapper()
+        self._wrapper_key = None
+        # 行表面缓存：每行（描边+正文）只合成一次，之后每帧只做 blit
+        self._line_cache = OrderedDict()
+        self._line_cache_size = int(_get_cfg('SUBTITLE_LINE_CACHE_SIZE', 128))
+        # 字体缓存：字体文件只解析一次，实例按 (字体文件, 字号, 抗锯齿) 复用
+        self._font_face = None
+        self._font_face_for = None
+        self._font_cache = OrderedDict()
+        # 按需重绘：只在可见字数/字幕/样式变化时重绘，且只更新变化的行区域
+        self._drawn_lines = []                # 屏幕上已绘制的 (行文本, 矩形)
+        self._drawn_text = None               # 已绘制的可见文本
+        self._full_repaint = True             # 下次绘制整屏（样式/字号/新字幕）
+        self._next_frame_at = None            # 下次需要重绘的时间，None 表示空闲
+
+        # 配置热重载：样式变化在渲染线程中应用
+        self._pending_style = None
+        Config.subscribe(self._on_config_changed)
 
         # 初始化 Pygame/窗口
         self._init_pygame_and_window()
@@ -166,7 +255,6 @@ class SubtitleManager:
             # 创建窗口
             self.screen = pygame.display.set_mode((self.width, self.height), flags)
             pygame.display.set_caption(self.caption)
-            self.clock = pygame.time.Clock()
             self.font = self._safe_font_load(self.font_size)
             
             # 立即应用Windows样式
@@ -304,61 +392,122 @@ class SubtitleManager:
             logger.warning(f"[SUBTITLE][STYLE] 设置窗口样式失败: {e}")
 
     # ---------- 字体 ----------
-    def _safe_font_load(self, size: int):
+    def _resolve_font_face(self):
+        """
+        把字体名称解析为字体文件路径（系统字体查找和中文探测只在这里做一次），
+        返回 None 表示使用 pygame 默认字体。
+        """
         # 优先使用字体文件路径
-        try:
-            if isinstance(self.font_name, str) and os.path.exists(self.font_name):
-                # 使用指定抗锯齿设置
-                font = pygame.freetype.Font(self.font_name, size)
-                font.antialiased = self.antialias
-                logger.info(f"[FONT] 加载字体文件: {self.font_name}, 抗锯齿: {self.antialias}")
-                return font
-        except Exception as e:
-            logger.warning(f"[FONT] 加载字体文件失败: {self.font_name}, {e}")
+        if isinstance(self.font_name, str) and os.path.exists(self.font_name):
+            logger.info(f"[FONT] 使用字体文件: {self.font_name}")
+            return self.font_name
         
-        # 尝试系统字体
-        try:
-            ft = pygame.freetype.SysFont(self.font_name, size)
-            ft.antialiased = self.antialias
-            # 简单中文探测
-            surf, _ = ft.render("中文测试", (255,255,255))
-            if surf.get_width() > 8:
-                logger.info(f"[FONT] 使用系统字体: {self.font_name}, 抗锯齿: {self.antialias}")
-                return ft
-        except Exception as e:
-            logger.warning(f"[FONT] 加载系统字体失败: {self.font_name}, {e}")
-        
-        # 回退
-        for fallback in ("Microsoft YaHei", "SimHei", "SimSun", "Arial"):
+        # 尝试系统字体，回退到常见中文字体
+        for index, name in enumerate((self.font_name, "Microsoft YaHei", "SimHei", "SimSun", "Arial")):
             try:
-                ft = pygame.freetype.SysFont(fallback, size)
-                ft.antialiased = self.antialias
+                ft = pygame.freetype.SysFont(name, self.font_size_base)
+                # 简单中文探测
                 surf, _ = ft.render("中文测试", (255,255,255))
-                if surf.get_width() > 8:
-                    logger.warning(f"[SUBTITLE][FONT] 使用回退字体: {fallback}, 抗锯齿: {self.antialias}")
-                    return ft
+                if surf.get_width() > 8 and getattr(ft, "path", None):
+                    if index == 0:
+                        logger.info(f"[FONT] 使用系统字体: {name} ({ft.path})")
+                    else:
+                        logger.warning(f"[SUBTITLE][FONT] 使用回退字体: {name} ({ft.path})")
+                    return ft.path
             except Exception as e:
-                logger.warning(f"[FONT] 加载回退字体失败: {fallback}, {e}")
-                continue
+                logger.warning(f"[FONT] 加载系统字体失败: {name}, {e}")
         logger.warning("[SUBTITLE][FONT] 使用默认字体")
-        return pygame.freetype.Font(None, size)
+        return None
+
+    def _safe_font_load(self, size: int):
+        """按 (字体文件, 字号, 抗锯齿) 缓存字体实例"""
+        if self._font_face_for != self.font_name:
+            self._font_face = self._resolve_font_face()
+            self._font_face_for = self.font_name
+            self._font_cache.clear()
+        key = (self._font_face, size, self.antialias)
+        font = self._font_cache.get(key)
+        if font is not None:
+            self._font_cache.move_to_end(key)
+            return font
+        try:
+            font = pygame.freetype.Font(self._font_face, size)
+        except Exception as e:
+            logger.warning(f"[FONT] 加载字体失败: {self._font_face}@{size}, {e}，使用默认字体")
+            font = pygame.freetype.Font(None, size)
+        font.antialiased = self.antialias
+        self._font_cache[key] = font
+        if len(self._font_cache) > 16:
+            self._font_cache.popitem(last=False)
+        return font
 
     # ---------- 文本 API ----------
     def _clean_text(self, s: str) -> str:
         return s or ""
 
-    def show_subtitle(self, text: str, duration: float = None):
-        """入队字幕；duration=None 则按字符时长估算"""
+    def show_subtitle(self, text: str, duration: float = None, typing_speed: float = None, replace: bool = False):
+        """入队字幕；duration=None 则按字符时长估算；replace=True 时丢弃排队的普通字幕并立即替换当前字幕"""
         if not self.active:
             return
         t = self._clean_text(str(text))
+        if typing_speed is None:
+            typing_speed = self.typing_speed
         if duration is None:
-            typing_t = len(t) * max(self.typing_speed, 0.0)
+            typing_t = len(t) * max(typing_speed, 0.0)
             audio_t  = len(t) * max(self.audio_char_time, 0.0)
             duration = max(typing_t, audio_t) + max(self.extra_display_time, 0.0)
-        self.queue.append((t, float(duration)))
+        self.queue.put(SubtitleEntry(t, float(duration), float(typing_speed)), replace=replace)
         logger.info(f"[QUEUE] 入队字幕 len={len(t)} dur={duration:.2f}s; 队列={len(self.queue)}")
 
+    def show_speech(self, text: str, duration: float):
+        """
+        语音驱动的字幕：在一句语音开始播放时调用，打字速度与显示时长取自真实音频时长；
+        新的一句立即替换当前字幕，只丢弃排队中的语音字幕，动作结果等其他字幕保留
+        """
+        if not self.active:
+            return
+        t = self._clean_text(str(text))
+        typing_speed = duration / max(len(t), 1)
+        duration = duration + max(self.speech_hold_time, 0.0)
+        self.queue.put(SpeechEntry(t, float(duration), float(typing_speed)), replace=True)
+        logger.info(f"[QUEUE] 入队语音字幕 len={len(t)} dur={duration:.2f}s; 队列={len(self.queue)}")
+
+    def open_stream(self, typing_speed: float = None) -> SubtitleStream:
+        """
+        打开流式字幕：返回的句柄可在工作线程中 append() 文本增量、结束时 close()，
+        轮到它显示时边接收边打字，超出一页时按句翻页。
+        """
+        stream = SubtitleStream(self.queue, typing_speed if typing_speed is not None else self.typing_speed)
+        if self.active:
+            self.queue.put(stream)
+            logger.info(f"[QUEUE] 入队流式字幕; 队列={len(self.queue)}")
+        return stream
+
+    # ---------- 配置热重载 ----------
+    def _on_config_changed(self, snapshot, changed: set):
+        """配置监视线程回调：只记录新样式，由渲染线程应用"""
+        if any(key.startswith("SUBTITLE_") for key in changed):
+            self._pending_style = snapshot
+            self.queue.notify()
+
+    def _apply_pending_style(self):
+        snapshot, self._pending_style = self._pending_style, None
+        if snapshot is None:
+            return
+        self.text_color = _parse_color(snapshot.SUBTITLE_COLOR, self.text_color)
+        self.outline_color = _parse_color(snapshot.SUBTITLE_OUTLINE_COLOR, self.outline_color)
+        self.outline_size = int(snapshot.SUBTITLE_OUTLINE_SIZE)
+        self.typing_speed = float(snapshot.SUBTITLE_TYPING_SPEED)
+        self.extra_display_time = float(snapshot.SUBTITLE_EXTRA_DISPLAY_TIME)
+        # 清布局与行表面缓存
+        self.cached_text_for_layout = None
+        self._line_cache.clear()
+        self._full_repaint = True
+        logger.info(
+            f"[SUBTITLE] 样式已更新: color={self.text_color}, outline={self.outline_color}@{self.outline_size}, "
+            f"typing={self.typing_speed}, extra={self.extra_display_time}"
+        )
+
     # ---------- 事件处理 ----------
     def _process_events(self):
         try:
@@ -370,53 +519,125 @@ class SubtitleManager:
         except Exception as e:
             logger.warning(f"[SUBTITLE][EVENT] 事件处理异常: {e}")
 
-    # ---------- 布局 / 字体自适应 ----------
-    def _text_width(self, s: str) -> int:
+    # ---------- 行表面缓存 ----------
+    def _line_surface(self, line: str):
+        """返回合成好描边与正文的行表面（LRU缓存）"""
+        key = (line, self.font_name, self.font_size, self.antialias,
+               self.text_color, self.outline_color, self.outline_size)
+        surf = self._line_cache.get(key)
+        if surf is not None:
+            self._line_cache.move_to_end(key)
+            return surf
+
+        pad = max(self.outline_size, 0)
+        text_surf, text_rect = self.font.render(line, self.text_color)
+        surf = pygame.Surface((text_rect.width + pad * 2, text_rect.height + pad * 2), pygame.SRCALPHA)
+        if pad > 0:
+            if HAVE_NUMPY:
+                self._draw_outline_dilated(surf, text_surf, line, pad)
+            else:
+                self._draw_outline_offsets(surf, line, pad)
+        surf.blit(text_surf, (pad, pad))
+
+        self._line_cache[key] = surf
+        if len(self._line_cache) > self._line_cache_size:
+            self._line_cache.popitem(last=False)
+        return surf
+
+    def _draw_outline_dilated(self, surf, text_surf, line: str, pad: int):
+        """描边：正文只光栅化一次，取其 alpha 掩码做圆盘膨胀，作为描边色的 alpha"""
         try:
-            rect = self.font.get_rect(s)
-            return rect.width
-        except Exception:
-            return len(s) * max(self.font_size // 2, 8)
+            mask = np.zeros(surf.get_size(), dtype=np.uint8)
+            mask[pad:pad + text_surf.get_width(), pad:pad + text_surf.get_height()] = pygame.surfarray.array_alpha(text_surf)
+            surf.fill(self.outline_color + (0,))
+            alpha = pygame.surfarray.pixels_alpha(surf)
+            alpha[:] = _dilate_disk(mask, pad)
+            del alpha  # 释放表面锁
+        except Exception as e:
+            logger.warning(f"[SUBTITLE][OUTLINE] 膨胀描边失败，改用偏移渲染: {e}")
+            surf.fill((0, 0, 0, 0))
+            self._draw_outline_offsets(surf, line, pad)
+
+    def _draw_outline_offsets(self, surf, line: str, pad: int):
+        """描边（回退）：在多个偏移位置渲染文本"""
+        outline_surf, _ = self.font.render(line, self.outline_color)
+        for dx in range(-pad, pad + 1):
+            for dy in range(-pad, pad + 1):
+                if dx != 0 or dy != 0:  # 跳过中心位置
+                    surf.blit(outline_surf, (pad + dx, pad + dy))
 
+    # ---------- 布局 / 字体自适应 ----------
     def _recalc_layout_if_needed(self, text: str):
         if (text == self.cached_text_for_layout and
             self.width == self.cached_width_for_layout and
             self.font_size == self.cached_font_size_for_layout):
             return
-        lines = []
-        line = ""
-        limit = self.width - 20
-        for ch in text:
-            if self._text_width(line + ch) > limit:
-                lines.append(line)
-                line = ch
-            else:
-                line += ch
-        if line:
-            lines.append(line)
-        self.cached_lines = lines
+        # 字体或宽度变化时重新开始折行，否则只处理新增字符
+        wrapper_key = (self.width, self.font_size, id(self.font))
+        if wrapper_key != self._wrapper_key:
+            advances = self._glyph_advances.for_font(self.font, (self.font_name, self.font_size, self.antialias))
+            self._wrapper.reset(advances, self.width - 20)
+            self._wrapper_key = wrapper_key
+        self.cached_lines = self._wrapper.layout(text)
         self.cached_text_for_layout = text
         self.cached_width_for_layout = self.width
         self.cached_font_size_for_layout = self.font_size
 
-    def _adjust_font_size_if_needed(self, text: str):
-        if not text:
-            return
-        self._recalc_layout_if_needed(text)
-        line_h = self.font_size + 4
-        required_h = len(self.cached_lines) * line_h
-        if required_h <= self.height:
-            return
-        new_size = self.font_size
-        while required_h > self.height and new_size > 12:
-            new_size -= 2
-            if new_size == self.font_size:
+    def _paginate(self, text: str) -> list:
+        """按基准字号把文本切成按句对齐、每页都能放下的若干页"""
+        base = self.font_size_base
+        advances = self._glyph_advances.for_font(
+            self._safe_font_load(base), (self.font_name, base, self.antialias)
+        )
+        max_lines = max(self.height // (base + 4), 1)
+        return paginate(text, advances, self.width - 20, max_lines)
+
+    def _prerender_lines(self, text: str):
+        """一页取出时一次性折行并渲染全部行表面，打字过程中已完成的行直接命中缓存"""
+        wrapper = IncrementalWrapper()
+        wrapper.reset(self._glyph_advances.for_font(self.font, (self.font_name, self.font_size, self.antialias)),
+                      self.width - 20)
+        for line in wrapper.layout(text):
+            try:
+                self._line_surface(line)
+            except Exception as e:
+                logger.error(f"[SUBTITLE][DRAW] 预渲染行失败: {e}")
+
+    def _fit_font_size(self, text: str) -> int:
+        """
+        能完整放下 text 的最大字号：先按基准字号的字符步进等比缩放估算，
+        二分查找候选字号，再用真实字体校验（估算偏小时逐级下调）。
+        """
+        base = self.font_size_base
+        limit = self.width - 20
+
+        def fits(size: int, advances) -> bool:
+            return count_lines(text, advances, limit) * (size + 4) <= self.height
+
+        base_advances = self._glyph_advances.for_font(
+            self._safe_font_load(base), (self.font_name, base, self.antialias)
+        )
+        if fits(base, base_advances):
+            return base
+
+        low, high = MIN_FONT_SIZE, base - 1
+        best = MIN_FONT_SIZE
+        while low <= high:
+            mid = (low + high) // 2
+            if fits(mid, ScaledAdvances(base_advances, mid / base)):
+                best, low = mid, mid + 1
+            else:
+                high = mid - 1
+
+        size = best
+        while size > MIN_FONT_SIZE:
+            advances = self._glyph_advances.for_font(
+                self._safe_font_load(size), (self.font_name, size, self.antialias)
+            )
+            if fits(size, advances):
                 break
-            self.font_size = new_size
-            self.font = self._safe_font_load(self.font_size)
-            self._recalc_layout_if_needed(text)
-            line_h = self.font_size + 4
-            required_h = len(self.cached_lines) * line_h
+            size -= 1
+        return size
 
     # ---------- Watchdog ----------
     def _watchdog_check(self):
@@ -430,7 +651,7 @@ class SubtitleManager:
         """保留队列和当前字幕，重新初始化窗口/样式"""
         try:
             # 记录当前状态
-            saved_queue = deque(self.queue)
+            saved_queue = self.queue.drain()
             saved_current = self.current_subtitle
             saved_duration = self.duration
             elapsed = max(0.0, time.time() - self.show_time) if self.current_subtitle else 0.0
@@ -446,7 +667,13 @@ class SubtitleManager:
                 pass
             time.sleep(0.15)
 
-            # 重新初始化
+            # 重新初始化（旧表面和字体随显示一起失效）
+            self._line_cache.clear()
+            self._glyph_advances.clear()
+            self._wrapper_key = None
+            self._font_cache.clear()
+            self._drawn_lines = []
+            self._full_repaint = True
             self.active = False
             self._init_pygame_and_window()
             
@@ -456,7 +683,8 @@ class SubtitleManager:
 
             # 恢复状态
             if self.active:
-                self.queue = saved_queue
+                self.queue.clear()
+                self.queue.put_front(saved_queue)
                 self.current_subtitle = saved_current
                 self.duration = saved_duration
                 # show_time 重新计算：避免立刻结束
@@ -481,109 +709,258 @@ class SubtitleManager:
         # 事件
         self._process_events()
 
-        # 取新字幕
-        if not self.current_subtitle and self.queue:
-            self.current_subtitle, self.duration = self.queue.popleft()
+        # 应用热重载的样式
+        if self._pending_style is not None:
+            self._apply_pending_style()
+
+        # 取新字幕；语音驱动的新句会替换当前字幕（替换标记与出队在通道锁内一起处理）
+        replace, item = self.queue.take(busy=bool(self.current_subtitle) or self._stream is not None)
+        if replace:
+            self._finish_current()
+        if isinstance(item, SubtitleStream):
+            self._start_stream(item)
+        elif item is not None:
+            text, duration, typing_speed = item
+            if self.pagination:
+                # 分页：后续页按字数分摊显示时长，插回队首依次显示
+                pages = self._paginate(text)
+                if len(pages) > 1:
+                    total = sum(len(page) for page in pages)
+                    entries = [item._replace(text=page, duration=duration * len(page) / total) for page in pages]
+                    self.queue.put_front(entries[1:])
+                    text, duration, _ = entries[0]
+                    logger.info(f"[PLAY] 长字幕分为 {len(pages)} 页")
+            self.current_subtitle, self.duration, self.current_typing_speed = text, duration, typing_speed
             self.show_time = time.time()
-            # 恢复基础字体大小
-            if self.font_size != self.font_size_base:
-                self.font_size = self.font_size_base
+            # 按整条字幕选择字号（打字过程中不再变化）
+            fit_size = self._fit_font_size(self.current_subtitle)
+            if fit_size != self.font_size:
+                self.font_size = fit_size
                 self.font = self._safe_font_load(self.font_size)
             # 清布局缓存
             self.cached_text_for_layout = None
+            self._drawn_text = None
+            if self.pagination:
+                self._prerender_lines(self.current_subtitle)
             logger.info(f"[PLAY] 取出新字幕 len={len(self.current_subtitle)} dur={self.duration:.2f}s; 队列剩余={len(self.queue)}")
 
-        # 无字幕：清屏 + 降频
-        if not self.current_subtitle:
-            # 使用透明色填充背景
-            self.screen.fill(self.transparent_color)
-            try:
-                pygame.display.flip()
-            except Exception:
-                pass
-            self._last_flip_ts = time.time()
-            self.clock.tick(self.idle_fps)
+        # 流式字幕：读取已收到的文本
+        stream = self._stream
+        if stream is not None:
+            if stream.revision != self._stream_revision:
+                # 最终回复与流中的文本不一致，整体替换后从头打字
+                self._stream_revision = stream.revision
+                self._page_start = 0
+                self._revealed = 0
+                self._reveal_at = None
+                self.cached_text_for_layout = None
+                self._drawn_text = None
+            self.current_subtitle = stream.text
+
+        # 无字幕：屏幕上还有内容时清屏一次，之后不再绘制
+        if not self.current_subtitle and stream is None:
+            if self._drawn_lines or self._full_repaint:
+                self.screen.fill(self.transparent_color)
+                if self._present(None):
+                    self._drawn_lines = []
+                    self._full_repaint = False
+                    self._last_flip_ts = time.time()
+            else:
+                self._last_flip_ts = time.time()
+            self._next_frame_at = None
             # watchdog（空闲时也需要检测）
             self._watchdog_check()
             return
 
         # 打字机
-        elapsed = time.time() - self.show_time
-        if self.typing_speed > 0:
-            visible_chars = min(len(self.current_subtitle), int(elapsed / self.typing_speed))
+        now = time.time()
+        elapsed = now - self.show_time
+        if stream is not None:
+            visible_chars = self._advance_stream(now)
+        elif self.current_typing_speed > 0:
+            visible_chars = min(len(self.current_subtitle), int(elapsed / self.current_typing_speed))
         else:
             visible_chars = len(self.current_subtitle)
-        draw_text = self.current_subtitle[:visible_chars]
 
-        # 字体自适应（必要时）
-        self._adjust_font_size_if_needed(draw_text)
-        self._recalc_layout_if_needed(draw_text)
+        # 可见文本没变就不重绘
+        draw_text = self.current_subtitle[self._page_start:visible_chars]
+        if draw_text != self._drawn_text or self._full_repaint:
+            self._recalc_layout_if_needed(draw_text)
+            # 流式字幕超出一页时翻页
+            while stream is not None and len(self.cached_lines) > self._max_lines():
+                draw_text = self._next_stream_page(draw_text)
+                self._recalc_layout_if_needed(draw_text)
+            if self._repaint_lines():
+                self._drawn_text = draw_text
+                self._last_flip_ts = time.time()
+        else:
+            self._last_flip_ts = time.time()
 
-        # 绘制
-        # 1. 用透明色填充整个背景
-        self.screen.fill(self.transparent_color)
-        
-        # 2. 绘制不透明的字幕文本
-        total_h = len(self.cached_lines) * (self.font_size + 4)
-        y = (self.height - total_h) // 2
+        # 完成判断：文字打完 + 总时长到期；流式字幕在结束并打完后再多显示 extra_display_time
+        if stream is not None:
+            end_time = float("inf")
+            if stream.closed:
+                end_time = max(stream.closed_at, self._caught_up_at) + max(self.extra_display_time, 0.0)
+        else:
+            end_time = self.show_time + self.duration
+        if visible_chars >= len(self.current_subtitle) and now >= end_time:
+            logger.info("[PLAY] 当前字幕播放完毕")
+            self._finish_current()
+            self._next_frame_at = time.time()
+        elif visible_chars < len(self.current_subtitle):
+            # 下一个字出现的时间
+            if stream is not None:
+                self._next_frame_at = self._reveal_at + self.current_typing_speed
+            else:
+                self._next_frame_at = self.show_time + (visible_chars + 1) * self.current_typing_speed
+        elif end_time == float("inf"):
+            # 等待流式字幕的新文本
+            self._next_frame_at = None
+        else:
+            self._next_frame_at = end_time
+
+        # watchdog
+        self._watchdog_check()
+
+    def _finish_current(self):
+        self.current_subtitle = ""
+        self.cached_text_for_layout = None
+        self.cached_lines = []
+        self._stream = None
+        self._page_start = 0
+
+    def _start_stream(self, stream: SubtitleStream):
+        self._stream = stream
+        self._stream_revision = stream.revision
+        self._page_start = 0
+        self.current_subtitle = stream.text
+        self.current_typing_speed = stream.typing_speed
+        self.duration = 0.0
+        self.show_time = time.time()
+        self._revealed = 0
+        self._reveal_at = None
+        self._caught_up_at = self.show_time
+        # 总长度未知，使用基准字号，超出一页时翻页
+        if self.font_size != self.font_size_base:
+            self.font_size = self.font_size_base
+            self.font = self._safe_font_load(self.font_size)
+        self.cached_text_for_layout = None
+        self._drawn_text = None
+        logger.info(f"[PLAY] 开始显示流式字幕; 队列剩余={len(self.queue)}")
+
+    def _advance_stream(self, now: float) -> int:
+        """
+        流式字幕的打字游标：从新文本到达（或上一个字打出）时起按打字速度前进，
+        追上已收到的文本后暂停，晚到的文本同样逐字打出而不是一次性出现
+        """
+        total = len(self.current_subtitle)
+        self._revealed = min(self._revealed, total)
+        if self._revealed >= total:
+            self._reveal_at = None
+            return total
+        if self._reveal_at is None:
+            # 渲染循环在文本到达时被唤醒，从现在开始打字
+            self._reveal_at = now
+        if self.current_typing_speed <= 0:
+            self._revealed = total
+        else:
+            steps = int((now - self._reveal_at) / self.current_typing_speed)
+            if steps > 0:
+                self._revealed = min(total, self._revealed + steps)
+                self._reveal_at += steps * self.current_typing_speed
+        if self._revealed >= total:
+            self._caught_up_at = now
+        return self._revealed
+
+    def _max_lines(self) -> int:
+        return max(self.height // (self.font_size + 4), 1)
+
+    def _next_stream_page(self, draw_text: str) -> str:
+        """流式字幕翻页：新页从最后一行之前的最后一个句子边界开始，没有句子边界时从最后一行开始"""
+        last_start = len(draw_text.rstrip("\n")) - len(self.cached_lines[-1])
+        cut = 0
+        for match in SENTENCE_END_PATTERN.finditer(draw_text, 1, last_start):
+            cut = match.end()
+        if cut <= 0:
+            cut = max(last_start, 1)
+        self._page_start += cut
+        return draw_text[cut:]
+
+    def _repaint_lines(self) -> bool:
+        """重绘字幕行：只擦除并重画与上一帧不同的行，再只更新这些区域；刷新失败返回 False"""
+        line_h = self.font_size + 4
+        y = (self.height - len(self.cached_lines) * line_h) // 2
+        pad = max(self.outline_size, 0)
+        lines = []
         for line in self.cached_lines:
             try:
-                # 渲染轮廓（如果启用）
-                if self.outline_size > 0:
-                    # 创建轮廓效果 - 在多个偏移位置渲染文本
-                    for dx in range(-self.outline_size, self.outline_size + 1):
-                        for dy in range(-self.outline_size, self.outline_size + 1):
-                            if dx != 0 or dy != 0:  # 跳过中心位置
-                                outline_surf, outline_rect = self.font.render(
-                                    line,
-                                    self.outline_color
-                                )
-                                outline_rect.centerx = self.width // 2 + dx
-                                outline_rect.top = y + dy
-                                self.screen.blit(outline_surf, outline_rect)
-                # 渲染主文本
-                text_surf, text_rect = self.font.render(
-                    line,
-                    self.text_color
-                )
-                text_rect.centerx = self.width // 2
-                text_rect.top = y
-                self.screen.blit(text_surf, text_rect)
-
+                # 缓存的行表面已包含描边与正文
+                line_surf = self._line_surface(line)
+                line_rect = line_surf.get_rect(centerx=self.width // 2, top=y - pad)
+                lines.append((line, line_rect, line_surf))
             except Exception as e:
                 logger.error(f"[SUBTITLE][DRAW] 渲染行失败: {e}")
-            y += self.font_size + 4    
+            y += line_h
 
-        # 尝试翻转显示
+        if self._full_repaint:
+            self.screen.fill(self.transparent_color)
+            dirty = None
+        else:
+            dirty = []
+            for i in range(max(len(self._drawn_lines), len(lines))):
+                old = self._drawn_lines[i] if i < len(self._drawn_lines) else None
+                new = lines[i][:2] if i < len(lines) else None
+                if old == new:
+                    continue
+                if old:
+                    self.screen.fill(self.transparent_color, old[1])
+                    dirty.append(old[1])
+                if new:
+                    dirty.append(new[1])
+            if not dirty:
+                return True
+
+        # 描边可能与相邻行重叠，擦除区域内的行都要重画
+        for line, line_rect, line_surf in lines:
+            if dirty is None or line_rect.collidelist(dirty) != -1:
+                self.screen.blit(line_surf, line_rect)
+
+        if not self._present(dirty):
+            # 刷新失败：下次整屏重绘；不更新刷新时间，持续失败时由 watchdog 重启
+            self._full_repaint = True
+            return False
+        self._drawn_lines = [(line, line_rect) for line, line_rect, _ in lines]
+        self._full_repaint = False
+        return True
+
+    def _present(self, dirty) -> bool:
+        """提交到屏幕：dirty 为 None 时整屏刷新，否则只更新给定区域；失败返回 False"""
         try:
-            pygame.display.flip()
-            self._last_flip_ts = time.time()  # 更新翻转时间戳
-        except Exception as e:
-            logger.error(f"[SUBTITLE][FLIP] 翻转失败: {e}", exc_info=True)
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
         except Exception as e:
-            logger.error(f"[SUBTITLE][RENDER] 渲染失败: {e}", exc_info=True)
-            self._request_restart = True  # 标记需要重启                  
-
-        # 关键：每帧强制重新应用窗口样式（确保置顶/穿透持续生效）
+            logger.error(f"[SUBTITLE][FLIP] 刷新失败: {e}", exc_info=True)
+            return False
+        # 只在重绘时重新应用窗口样式（确保置顶/穿透持续生效）
         if IS_WIN and HAVE_PYWIN32:
             self._apply_windows_styles()
+        return True
 
-        # 正常帧率
-        self.clock.tick(self.fps)
-
-        # 完成判断：文字打完 + 总时长到期
-        total_need = self.duration
-        if visible_chars >= len(self.current_subtitle) and elapsed >= total_need:
-            logger.info("[PLAY] 当前字幕播放完毕")
-            self.current_subtitle = ""
-            self.cached_text_for_layout = None
-            self.cached_lines = []
-
-        # watchdog
-        self._watchdog_check()
+    def wait_for_next_frame(self):
+        """
+        主循环在两次 render 之间调用：阻塞到下一个字出现或字幕到期，
+        有新字幕/样式变化时立即唤醒；空闲时按 idle_wait 间隔醒来处理窗口事件。
+        """
+        timeout = self.idle_wait
+        if self._next_frame_at is not None:
+            timeout = min(max(self._next_frame_at - time.time(), 1.0 / max(self.fps, 1)), timeout)
+        self.queue.wait(timeout)
 
     # ---------- 关闭 ----------
     def close(self):
+        Config.unsubscribe(self._on_config_changed)
         if not self.active:
             return
         self.active = False
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from action_dispatcher import StreamActionParser, strip_commands
+
+
+@pytest.fixture
+def commands():
+    return []
+
+
+@pytest.fixture
+def parser(commands):
+    def on_command(line):
+        commands.append(line)
+        return f"done: {line}"
+    return StreamActionParser(on_command)
+
+
+def feed_all(parser, chunks):
+    visible = "".join(parser.feed(chunk) for chunk in chunks)
+    return visible + parser.finish()
+
+
+def test_command_split_across_chunks(parser, commands):
+    visible = feed_all(parser, ["好的\n/ac", "tion open_pro", "gram 记", "事本\n马上就好"])
+    assert commands == ["/action open_program 记事本"]
+    assert visible == "好的\n马上就好"
+    assert parser.results == ["done: /action open_program 记事本"]
+
+
+def test_command_in_the_middle_of_a_line(parser, commands):
+    visible = feed_all(parser, ["没问题 /action open_browser b站\n", "已经帮你打开"])
+    assert commands == ["/action open_browser b站"]
+    assert visible == "没问题 已经帮你打开"
+
+
+def test_urls_with_slashes_stay_visible(parser, commands):
+    text = "可以看看 https://example.com/docs/a/b 这个页面"
+    assert feed_all(parser, [text[:12], text[12:]]) == text
+    assert commands == []
+
+
+def test_command_argument_may_contain_a_url(parser, commands):
+    feed_all(parser, ["/action open_browser https://example.com/a/b"])
+    assert commands == ["/action open_browser https://example.com/a/b"]
+
+
+def test_multiple_commands(parser, commands):
+    visible = feed_all(parser, ["/list_status\n/enable_program 记事本\n", "/action open_program 记事本\n好了"])
+    assert commands == ["/list_status", "/enable_program 记事本", "/action open_program 记事本"]
+    assert visible == "好了"
+    assert parser.visible_text() == "好了"
+
+
+def test_invalid_command_is_shown_as_text():
+    parser = StreamActionParser(lambda line: None)
+    assert feed_all(parser, ["/action\n"]) == "/action\n"
+    assert parser.results == []
+
+
+def test_strip_commands_keeps_reply_text():
+    assert strip_commands("好的，马上~\n/action open_program 记事本\n等我一下") == "好的，马上~\n等我一下"
+    assert strip_commands("好的 /action open_browser b站") == "好的"
+    assert strip_commands("/list_status") == ""
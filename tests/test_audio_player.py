@@ -0,0 +1,71 @@
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_player import StreamBuffer, AudioPlayer
+
+
+def test_read_waits_for_data():
+    buffer = StreamBuffer()
+    threading.Timer(0.05, buffer.write, args=(b"abc",)).start()
+    assert buffer.read(10) == b"abc"
+    buffer.finish()
+    assert buffer.read(10) == b""
+
+
+def test_read_times_out_as_eof():
+    buffer = StreamBuffer(read_timeout=0.05)
+    start = time.time()
+    assert buffer.read(10) == b""
+    assert time.time() - start < 1
+
+
+def test_abort_wakes_blocked_reader():
+    buffer = StreamBuffer(read_timeout=30)
+    threading.Timer(0.05, buffer.abort).start()
+    start = time.time()
+    assert buffer.read(10) == b""
+    assert time.time() - start < 5
+
+
+def test_player_stop_aborts_current_stream():
+    player = AudioPlayer()
+    buffer = StreamBuffer(read_timeout=30)
+    player._source = buffer
+    player.stop()
+    assert buffer.read(10) == b""
+
+
+def test_seek_to_end_uses_expected_size():
+    buffer = StreamBuffer()
+    buffer.expected_size = 10000
+    buffer.write(b"x" * 100)
+    assert buffer.seek(0, io.SEEK_END) == 10000
+    # 尾部尚未下载时以零填充
+    assert buffer.seek(-10, io.SEEK_END) == 9990
+    assert buffer.read(10) == bytes(10)
+    assert buffer.seek(5) == 5
+    assert buffer.read(3) == b"xxx"
+    assert buffer.seek(2, io.SEEK_CUR) == 10
+
+
+def test_seek_to_end_without_size_waits_for_download():
+    buffer = StreamBuffer()
+    buffer.write(b"abc")
+    threading.Timer(0.05, buffer.finish).start()
+    assert buffer.seek(0, io.SEEK_END) == 3
+
+
+def test_play_respects_cancel_before_start():
+    player = AudioPlayer()
+    cancel_event = threading.Event()
+    cancel_event.set()
+    events = []
+    player.add_listener(lambda event, text, duration: events.append(event))
+    assert not player.play(StreamBuffer.from_bytes(b"data"), cancel_event=cancel_event)
+    assert events == []
+    assert not player.busy
@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CircuitOpenError, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        "api", slow_call_seconds=5.0, window_size=10, window_seconds=60, min_calls=4,
+        failure_rate=0.5, slow_call_rate=0.8, open_seconds=30, half_open_probes=1
+    )
+
+
+def trip(breaker):
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    assert breaker.state == STATE_OPEN
+
+
+def test_stays_closed_below_min_calls(breaker):
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_opens_on_failure_rate(breaker):
+    breaker.record(True, 0.1)
+    breaker.record(True, 0.1)
+    breaker.record(False, 0.1)
+    assert breaker.state == STATE_CLOSED
+    breaker.record(False, 0.1)
+    assert breaker.state == STATE_OPEN
+    assert breaker.trips == 1
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.check()
+    assert info.value.retry_after == pytest.approx(30)
+    assert breaker.rejected == 2
+
+
+def test_opens_on_slow_calls(breaker):
+    for _ in range(4):
+        breaker.record(True, 6.0)
+    assert breaker.state == STATE_OPEN
+
+
+def test_old_calls_leave_the_window(breaker, clock):
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    clock.now += 61
+    breaker.record(False, 0.1)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_probe_success_closes(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(True, 6.0)
+    assert breaker.state == STATE_OPEN
+    assert breaker.trips == 2
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_status_codes(breaker):
+    breaker.record_status(404, 0.1)
+    breaker.record_status(200, 0.1)
+    breaker.record_status(503, 0.1)
+    assert breaker.state == STATE_CLOSED
+    breaker.record_status(429, 0.1)
+    assert breaker.state == STATE_OPEN
@@ -0,0 +1,94 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import requests
+
+from circuit_breaker import CircuitOpenError
+from config import Config
+from llm import DeepSeekAPIError, DeepSeekAPIModel, HedgeStats
+
+
+@pytest.fixture
+def hedge_config(monkeypatch):
+    monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(Config, "HEDGE_INITIAL_DELAY", 3.0)
+    monkeypatch.setattr(Config, "HEDGE_MIN_DELAY", 0.5)
+    monkeypatch.setattr(Config, "HEDGE_PERCENTILE", 0.8)
+    monkeypatch.setattr(Config, "HEDGE_BUDGET_RATIO", 0.5)
+    monkeypatch.setattr(Config, "HEDGE_BUDGET_BURST", 2.0)
+
+
+def test_deadline_uses_initial_delay_until_enough_samples(hedge_config):
+    stats = HedgeStats()
+    for latency in (1.0, 2.0, 3.0, 4.0):
+        stats.record_latency(latency)
+    assert stats.deadline() == 3.0
+    stats.record_latency(5.0)
+    assert stats.deadline() == 5.0
+
+
+def test_deadline_percentile_and_floor(hedge_config):
+    stats = HedgeStats()
+    for latency in (0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 9.0):
+        stats.record_latency(latency)
+    assert stats.deadline() == 0.5
+    stats = HedgeStats()
+    for latency in range(1, 11):
+        stats.record_latency(float(latency))
+    assert stats.deadline() == 9.0
+
+
+def test_budget(hedge_config):
+    stats = HedgeStats()
+    assert stats.try_spend()
+    assert not stats.try_spend()
+    stats.on_request()
+    assert not stats.try_spend()
+    stats.on_request()
+    assert stats.try_spend()
+    for _ in range(10):
+        stats.on_request()
+    assert stats.tokens == 2.0
+    assert (stats.hedged, stats.budget_denied, stats.requests) == (2, 2, 12)
+
+
+def test_record_win():
+    stats = HedgeStats()
+    stats.record_win(False)
+    stats.record_win(True)
+    assert stats.hedge_wins == 1
+
+
+@pytest.mark.parametrize("error, hedgeable", [
+    (DeepSeekAPIError(500), True),
+    (DeepSeekAPIError(503), True),
+    (DeepSeekAPIError(400), False),
+    (DeepSeekAPIError(429), False),
+    (requests.Timeout(), True),
+    (CircuitOpenError("deepseek", 10), True),
+    (requests.ConnectionError(), False),
+    (ValueError(), False),
+])
+def test_hedgeable(error, hedgeable):
+    assert DeepSeekAPIModel._hedgeable(error) is hedgeable
+
+
+@pytest.mark.parametrize("base_url, model, expected", [
+    ("", "", None),
+    ("https://api.example.com/", "", None),
+    ("https://backup.example.com", "", ("https://backup.example.com", "chat")),
+    ("", "chat-lite", ("https://api.example.com", "chat-lite")),
+])
+def test_hedge_endpoint_requires_a_separate_endpoint(monkeypatch, base_url, model, expected):
+    monkeypatch.setattr(Config, "DEEPSEEK_BASE_URL", "https://api.example.com")
+    monkeypatch.setattr(Config, "DEEPSEEK_MODEL_NAME", "chat")
+    monkeypatch.setattr(Config, "HEDGE_BASE_URL", base_url)
+    monkeypatch.setattr(Config, "HEDGE_MODEL_NAME", model)
+    endpoint = DeepSeekAPIModel._hedge_endpoint()
+    if expected is None:
+        assert endpoint is None
+    else:
+        assert (endpoint.base_url, endpoint.model) == expected
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hewoyi_tts import split_sentences
+
+
+def test_splits_at_sentence_boundaries():
+    assert split_sentences("你好呀，今天过得怎么样？我今天过得很好！") == ["你好呀，今天过得怎么样？", "我今天过得很好！"]
+
+
+def test_short_tail_joins_previous_sentence():
+    assert split_sentences("你好呀，今天过得怎么样？我很好！") == ["你好呀，今天过得怎么样？我很好！"]
+
+
+def test_short_sentences_are_merged():
+    assert split_sentences("嗯。好。那我们开始吧。") == ["嗯。好。那我们开始吧。"]
+
+
+def test_decimal_point_does_not_split():
+    assert split_sentences("价格是3.5元，不贵。Okay. Let us go.", min_chars=2) == [
+        "价格是3.5元，不贵。", "Okay.", "Let us go."
+    ]
+
+
+def test_long_sentence_is_split_at_clauses():
+    text = "第一部分内容比较长，" * 5 + "结束。"
+    chunks = split_sentences(text, max_chars=25)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 25 for chunk in chunks)
+
+
+def test_clause_longer_than_limit_is_cut():
+    chunks = split_sentences("啊" * 50, max_chars=20)
+    assert chunks == ["啊" * 20, "啊" * 20, "啊" * 10]
+
+
+def test_empty_text():
+    assert split_sentences("") == []
+    assert split_sentences("\n\n") == []
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from intent_matcher import IntentMatcher
+
+
+@pytest.fixture
+def matcher():
+    return IntentMatcher(["记事本"], ["b站"])
+
+
+@pytest.mark.parametrize("text", [
+    "打开 readme.txt",
+    "打开 main.py",
+    "运行 setup.exe",
+    "searching for cats",
+    "搜索引擎是什么？",
+    "搜索 猫咪 然后打开记事本",
+    "search cats and open b站",
+    "记事本打开了",
+    "打开了记事本",
+    "打开记事本和b站",
+    "我刚才打开记事本",
+    "打开记事本然后搜索猫咪",
+])
+def test_ordinary_input_is_left_to_llm(matcher, text):
+    assert matcher.match(text) is None
+
+
+@pytest.mark.parametrize("text, query", [
+    ("search cats", "cats"),
+    ("搜索 猫咪", "猫咪"),
+    ("搜索：猫咪", "猫咪"),
+    ("搜一下猫咪", "猫咪"),
+    ("帮我搜索 Python 教程。", "Python 教程"),
+])
+def test_search(matcher, text, query):
+    assert matcher.match(text) == ("search", query)
+
+
+@pytest.mark.parametrize("text, url", [
+    ("打开 github.com/Foo/Bar", "github.com/Foo/Bar"),
+    ("打开 https://Example.org/X", "https://Example.org/X"),
+    ("打开www.Foo.xyz", "www.Foo.xyz"),
+])
+def test_url_keeps_original_case(matcher, text, url):
+    assert matcher.match(text) == ("url", url)
+
+
+def test_configured_names(matcher):
+    assert matcher.match("打开记事本") == ("program", "记事本")
+    assert matcher.match("open b站") == ("website", "b站")
@@ -0,0 +1,98 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+
+VECTORS = {
+    "打开记事本": [1.0, 0.0, 0.0],
+    "帮我打开记事本": [0.99, 0.1, 0.0],
+    "今天天气怎么样": [0.0, 1.0, 0.0],
+    "讲个笑话": [0.0, 0.0, 1.0],
+}
+ACTION_REPLY = "/action open_program 记事本"
+
+
+class FakeEmbeddingModel:
+    def encode(self, texts):
+        return [np.array(VECTORS[text], dtype="float32") for text in texts]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+def make_cache(**kwargs):
+    options = dict(max_entries=2, ttl=60, threshold=0.9, actions_only=True)
+    options.update(kwargs)
+    return ResponseCache(FakeEmbeddingModel(), **options)
+
+
+def store(cache, text, reply=ACTION_REPLY, fingerprint="fp"):
+    _, embedding = cache.lookup(text, fingerprint)
+    cache.store(embedding, fingerprint, reply, 1.5)
+
+
+def test_similar_input_hits(clock):
+    cache = make_cache()
+    store(cache, "打开记事本")
+    reply, _ = cache.lookup("帮我打开记事本", "fp")
+    assert reply == ACTION_REPLY
+    assert cache.hits == 1
+    assert cache.saved_seconds == pytest.approx(1.5)
+
+
+def test_unrelated_input_misses(clock):
+    cache = make_cache()
+    store(cache, "打开记事本")
+    assert cache.lookup("今天天气怎么样", "fp")[0] is None
+
+
+def test_fingerprint_must_match(clock):
+    cache = make_cache()
+    store(cache, "打开记事本", fingerprint="old")
+    assert cache.lookup("打开记事本", "new")[0] is None
+
+
+def test_only_action_replies_are_stored(clock):
+    cache = make_cache()
+    store(cache, "讲个笑话", reply="从前有座山")
+    assert cache.lookup("讲个笑话", "fp")[0] is None
+    cache = make_cache(actions_only=False)
+    store(cache, "讲个笑话", reply="从前有座山")
+    assert cache.lookup("讲个笑话", "fp")[0] == "从前有座山"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache()
+    store(cache, "打开记事本")
+    clock.now += 61
+    assert cache.lookup("打开记事本", "fp")[0] is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = make_cache(actions_only=False)
+    store(cache, "打开记事本", reply="a")
+    store(cache, "今天天气怎么样", reply="b")
+    # 命中后移到队尾，下一次写入淘汰的是另一条
+    assert cache.lookup("打开记事本", "fp")[0] == "a"
+    store(cache, "讲个笑话", reply="c")
+    assert cache.lookup("今天天气怎么样", "fp")[0] is None
+    assert cache.lookup("打开记事本", "fp")[0] == "a"
+    assert cache.lookup("讲个笑话", "fp")[0] == "c"
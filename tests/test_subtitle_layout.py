@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from subtitle_layout import IncrementalWrapper, count_lines, paginate
+
+
+class FixedAdvances:
+    """每个字符宽 10 像素"""
+    def __init__(self):
+        self.measured = []
+
+    def __call__(self, ch):
+        self.measured.append(ch)
+        return 10
+
+    def width(self, text):
+        return 10 * len(text)
+
+
+@pytest.fixture
+def wrapper():
+    wrapper = IncrementalWrapper()
+    wrapper.reset(FixedAdvances(), 30)
+    return wrapper
+
+
+def test_wraps_at_the_limit(wrapper):
+    assert wrapper.layout("abcdefg") == ["abc", "def", "g"]
+
+
+def test_newline_starts_a_new_line(wrapper):
+    assert wrapper.layout("ab\ncd") == ["ab", "cd"]
+
+
+def test_appending_only_processes_new_characters(wrapper):
+    wrapper.layout("abcd")
+    wrapper.advances.measured.clear()
+    assert wrapper.layout("abcdefg") == ["abc", "def", "g"]
+    assert wrapper.advances.measured == ["e", "f", "g"]
+
+
+def test_non_prefix_text_restarts(wrapper):
+    wrapper.layout("abcdef")
+    assert wrapper.layout("xyz1") == ["xyz", "1"]
+
+
+def test_punctuation_does_not_start_a_line(wrapper):
+    assert wrapper.layout("abc，") == ["ab", "c，"]
+
+
+def test_opening_bracket_does_not_end_a_line(wrapper):
+    assert wrapper.layout("ab（cd") == ["ab", "（cd"]
+
+
+def test_count_lines():
+    assert count_lines("abcdefg", FixedAdvances(), 30) == 3
+
+
+def test_paginate_keeps_sentences_together():
+    pages = paginate("一二。三四。五六七八。", FixedAdvances(), 30, 2)
+    assert pages == ["一二。三四。", "五六七八。"]
+
+
+def test_paginate_cuts_sentences_longer_than_a_page():
+    pages = paginate("一二。五六七八九十一二三四。", FixedAdvances(), 30, 2)
+    assert pages[0] == "一二。"
+    assert "".join(pages[1:]) == "五六七八九十一二三四。"
+    assert all(count_lines(page, FixedAdvances(), 30) <= 2 for page in pages)
+
+
+def test_paginate_short_text_is_one_page():
+    assert paginate("你好。", FixedAdvances(), 30, 2) == ["你好。"]
+    assert paginate("", FixedAdvances(), 30, 2) == []
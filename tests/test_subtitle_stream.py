@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from subtitle_stream import SubtitleChannel, SubtitleStream, SubtitleEntry, SpeechEntry
+
+
+@pytest.fixture
+def channel():
+    return SubtitleChannel()
+
+
+def test_take_in_order(channel):
+    channel.put("a")
+    channel.put("b")
+    assert len(channel) == 2
+    assert channel.take(busy=False) == (False, "a")
+    assert channel.take(busy=False) == (False, "b")
+    assert channel.take(busy=False) == (False, None)
+
+
+def test_busy_renderer_only_takes_replacements(channel):
+    channel.put("a")
+    assert channel.take(busy=True) == (False, None)
+    channel.put("b", replace=True)
+    assert channel.take(busy=True) == (True, "b")
+    assert len(channel) == 0
+
+
+def test_speech_replaces_only_queued_speech(channel):
+    result = SubtitleEntry("已打开程序: 记事本", 2.0, 0.05)
+    page = SubtitleEntry("第二页", 1.0, 0.05)
+    old_speech = SpeechEntry("上一句", 1.0, 0.1)
+    channel.put(result)
+    channel.put_front([page])
+    channel.put(old_speech)
+    new_speech = SpeechEntry("下一句", 1.0, 0.1)
+    channel.put(new_speech, replace=True)
+    assert channel.take(busy=True) == (True, new_speech)
+    assert channel.drain() == [page, result]
+
+
+def test_speech_pages_keep_their_kind():
+    entry = SpeechEntry("一句很长的话", 2.0, 0.1)
+    assert isinstance(entry._replace(text="一句", duration=1.0), SpeechEntry)
+
+
+def test_replacement_flag_is_reported_once(channel):
+    channel.put("a", replace=True)
+    assert channel.take(busy=False) == (True, "a")
+    channel.put("b")
+    assert channel.take(busy=False) == (False, "b")
+
+
+def test_put_front_and_drain(channel):
+    channel.put("c")
+    channel.put_front(["a", "b"])
+    assert channel.drain() == ["a", "b", "c"]
+    assert len(channel) == 0
+
+
+def test_wait(channel):
+    assert not channel.wait(0.01)
+    channel.put("a")
+    assert channel.wait(0.01)
+    threading.Timer(0.05, channel.notify).start()
+    assert channel.wait(5)
+
+
+def test_stream_append_and_close(channel):
+    stream = SubtitleStream(channel, typing_speed=0.05)
+    stream.append("你好")
+    stream.append("")
+    stream.append("呀")
+    assert stream.text == "你好呀"
+    assert channel.wait(0)
+    stream.close()
+    assert stream.closed and stream.closed_at is not None
+    stream.append("忽略")
+    assert stream.text == "你好呀"
+
+
+def test_close_completes_text_that_extends_the_stream(channel):
+    stream = SubtitleStream(channel, typing_speed=0.05)
+    stream.append("好的，马上打开")
+    stream.close("好的，马上打开\n已打开程序: 记事本")
+    assert stream.text == "好的，马上打开\n已打开程序: 记事本"
+    assert stream.revision == 0
+
+
+def test_close_compares_stripped_text(channel):
+    stream = SubtitleStream(channel, typing_speed=0.05)
+    stream.append("\n好的 ")
+    stream.close("好的\n已打开")
+    # 已显示的文本保持为前缀，只补上剩余部分
+    assert stream.text.startswith("\n好的 ")
+    assert stream.text.strip().endswith("已打开")
+    assert stream.revision == 0
+
+
+def test_close_replaces_diverging_text(channel):
+    stream = SubtitleStream(channel, typing_speed=0.05)
+    stream.append("我想想")
+    stream.close("缓存的回复")
+    assert stream.text == "缓存的回复"
+    assert stream.revision == 1
+
+
+def test_close_with_empty_stream_shows_final_text(channel):
+    stream = SubtitleStream(channel, typing_speed=0.05)
+    stream.close("缓存的回复")
+    assert stream.text == "缓存的回复"
+
+
+def test_close_twice_keeps_first_result(channel):
+    stream = SubtitleStream(channel, typing_speed=0.05)
+    stream.close("第一次")
+    stream.close("第二次")
+    assert stream.text == "第一次"
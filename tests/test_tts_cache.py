@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from tts_cache import AudioCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AudioCache(str(tmp_path), max_bytes=10)
+
+
+def test_key_depends_on_every_parameter():
+    key = AudioCache.make_key("你好", "voice", 1.0, 0, "mp3")
+    assert key == AudioCache.make_key("你好", "voice", 1.0, 0, "mp3")
+    assert key != AudioCache.make_key("你好", "voice", 1.2, 0, "mp3")
+    assert key != AudioCache.make_key("你好", "other", 1.0, 0, "mp3")
+
+
+def test_put_then_get(cache):
+    path = cache.put("a", "mp3", b"1234")
+    assert os.path.isfile(path)
+    assert cache.contains("a", "mp3")
+    assert cache.get("a", "mp3") == b"1234"
+    assert cache.get("b", "mp3") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_file_is_evicted(cache):
+    cache.put("a", "mp3", b"1234")
+    cache.put("b", "mp3", b"1234")
+    cache.get("a", "mp3")
+    cache.put("c", "mp3", b"1234")
+    assert cache.contains("a", "mp3")
+    assert not cache.contains("b", "mp3")
+    assert not os.path.exists(cache.path_for("b", "mp3"))
+    assert cache.contains("c", "mp3")
+
+
+def test_missing_file_counts_as_miss(cache):
+    cache.put("a", "mp3", b"1234")
+    os.remove(cache.path_for("a", "mp3"))
+    assert cache.get("a", "mp3") is None
+    assert not cache.contains("a", "mp3")
+
+
+def test_index_is_restored_and_temp_files_removed(tmp_path):
+    AudioCache(str(tmp_path), max_bytes=10).put("a", "mp3", b"1234")
+    (tmp_path / "b.mp3.1234abcd.tmp").write_bytes(b"x")
+    cache = AudioCache(str(tmp_path), max_bytes=10)
+    assert cache.get("a", "mp3") == b"1234"
+    assert not (tmp_path / "b.mp3.1234abcd.tmp").exists()
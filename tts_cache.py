@@ -0,0 +1,138 @@
+import os
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from config import Config
+from utils.logger import logger
+
+
+class AudioCache:
+    """
+    内容寻址的TTS音频缓存：按 (文本, 语音, 语速, 音调, 格式) 的哈希命名文件，
+    总大小超过上限时按最近使用时间淘汰，写入先写临时文件再原子替换。
+    """
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = os.path.abspath(cache_dir or Config.TTS_CACHE_DIR)
+        self.max_bytes = max_bytes or Config.TTS_CACHE_MAX_MB * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # 文件名 -> 字节数，按最近使用排序
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+        logger.info(
+            f"TTS音频缓存: {self.cache_dir}, {len(self._index)} 个文件, "
+            f"{self._total_bytes / 1024 / 1024:.1f}/{self.max_bytes / 1024 / 1024:.0f}MB"
+        )
+
+    @staticmethod
+    def make_key(text: str, voice: str, speed, tone, fmt: str) -> str:
+        raw = "\x1f".join(str(part) for part in (text, voice, speed, tone, fmt))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _filename(self, key: str, fmt: str) -> str:
+        return f"{key}.{fmt or 'mp3'}"
+
+    def path_for(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, self._filename(key, fmt))
+
+    def _load_index(self):
+        """启动时扫描缓存目录，按访问时间恢复LRU顺序"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".tmp"):
+                # 上次异常退出留下的临时文件
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((max(st.st_atime, st.st_mtime), name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def contains(self, key: str, fmt: str) -> bool:
+        with self._lock:
+            return self._filename(key, fmt) in self._index
+
+    def get(self, key: str, fmt: str):
+        """读取缓存，命中返回音频数据，未命中返回 None"""
+        name = self._filename(key, fmt)
+        with self._lock:
+            if name not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(name)
+        path = os.path.join(self.cache_dir, name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 持久化最近使用时间
+        except OSError as e:
+            logger.warning(f"读取TTS缓存失败，已移除: {name} - {e}")
+            with self._lock:
+                self._total_bytes -= self._index.pop(name, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, fmt: str, data: bytes) -> str:
+        """原子写入缓存，返回缓存文件路径"""
+        name = self._filename(key, fmt)
+        path = os.path.join(self.cache_dir, name)
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"写入TTS缓存失败: {name} - {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            self._total_bytes -= self._index.pop(name, 0)
+            self._index[name] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        """超过容量上限时淘汰最久未使用的文件（调用方持有锁或处于初始化阶段）"""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                # 文件可能正被播放器占用，下次再淘汰
+                logger.debug(f"淘汰TTS缓存失败: {name} - {e}")
+                self._index[name] = size
+                self._index.move_to_end(name, last=False)
+                break
+            self._total_bytes -= size
+            logger.debug(f"淘汰TTS缓存: {name} ({size}字节)")
+
+    def report(self) -> str:
+        with self._lock:
+            hits, misses, files, total = self.hits, self.misses, len(self._index), self._total_bytes
+        lookups = hits + misses
+        hit_rate = hits / lookups if lookups else 0.0
+        return (
+            "TTS音频缓存统计:\n"
+            f"  文件数: {files}, 占用: {total / 1024 / 1024:.1f}/{self.max_bytes / 1024 / 1024:.0f}MB\n"
+            f"  命中率: {hit_rate:.1%} ({hits}/{lookups})"
+        )
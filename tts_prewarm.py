@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import threading
+from collections import Counter
+from config import Config
+from hewoyi_tts import clean_text
+from utils.logger import logger
+
+# 记忆库中宠物回复的前缀（与 main.py 写入记忆时一致）
+RESPONSE_PREFIX = "Neuro-Sama 说: "
+
+
+def mine_frequent_chunks(tts, memory_path: str, top_n: int, min_count: int) -> list:
+    """从记忆库的历史回复中统计出现次数最多的句子"""
+    counter = Counter()
+    try:
+        with open(memory_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    text = json.loads(line)["text"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+                if not text.startswith(RESPONSE_PREFIX):
+                    continue
+                counter.update(tts.split(clean_text(text[len(RESPONSE_PREFIX):])))
+    except OSError as e:
+        logger.warning(f"读取记忆库失败，跳过高频回复预热: {e}")
+        return []
+    return [chunk for chunk, count in counter.most_common(top_n) if count >= min_count]
+
+
+class TTSPrewarmer(threading.Thread):
+    """
+    TTS预热线程：启动后延迟一段时间，逐句把常用语句合成进音频缓存。
+    每次合成之间留出间隔，正在播放时让路，避免与实时语音争抢接口。
+    """
+    def __init__(self, tts, phrases: list = None):
+        super().__init__(daemon=True, name="tts-prewarm")
+        self.tts = tts
+        self.phrases = phrases if phrases is not None else Config.TTS_PREWARM_PHRASES
+        self._stop_event = threading.Event()
+
+    def collect(self) -> list:
+        """配置的固定语句 + 历史高频回复，按句切分后去重"""
+        chunks = []
+        for phrase in self.phrases:
+            chunks.extend(self.tts.split(clean_text(phrase)))
+        memory_path = f"{Config.MEMORY_DB_PATH}.json"
+        if os.path.exists(memory_path):
+            chunks.extend(mine_frequent_chunks(
+                self.tts, memory_path, Config.TTS_PREWARM_TOP_N, Config.TTS_PREWARM_MIN_COUNT
+            ))
+        return list(dict.fromkeys(chunk for chunk in chunks if chunk.strip()))
+
+    def run(self):
+        if self._stop_event.wait(Config.TTS_PREWARM_DELAY):
+            return
+        start_time = time.time()
+        pending = [chunk for chunk in self.collect() if not self.tts.is_cached(chunk)]
+        if not pending:
+            logger.info("TTS预热: 常用语句均已缓存")
+            return
+        logger.info(f"TTS预热开始: {len(pending)} 句待合成")
+
+        warmed = 0
+        for chunk in pending:
+            # 正在播放时让路
+            while self.tts.busy:
+                if self._stop_event.wait(0.5):
+                    return
+            if self.tts.warm(chunk):
+                warmed += 1
+            if self._stop_event.wait(Config.TTS_PREWARM_INTERVAL):
+                return
+        logger.info(f"TTS预热完成: {warmed}/{len(pending)} 句，耗时 {time.time() - start_time:.1f}秒")
+
+    def stop(self):
+        self._stop_event.set()